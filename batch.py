@@ -0,0 +1,28 @@
+import argparse
+import sys
+from modules.get_config import CONFIG_FILE_PATH
+from modules.settings import load_settings, parse_overrides
+from modules.logging_config import configure_logging
+from modules.batch import read_manifest, run_batch
+
+
+def main(argv: list[str] = None):
+    # Load the settings once, applying any command-line overrides
+    parser = argparse.ArgumentParser(description="Reconcile the source/target pairs listed in a manifest.")
+    parser.add_argument('manifest', help="The CSV, INI or YAML manifest listing the pairs.")
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help="The path to the configuration file shared by every pair.")
+    parser.add_argument('--set', action='append', default=[], metavar='SECTION.OPTION=VALUE',
+                        help="Override a configuration option for every pair, e.g. BATCH.WORKERS=8. Can be repeated.")
+    args = parser.parse_args(argv)
+    settings = load_settings(args.config, overrides=parse_overrides(args.set))
+    configure_logging(settings)
+
+    # Reconcile every pair, and exit with an error if any of them failed
+    pairs = read_manifest(args.manifest)
+    summary = run_batch(settings, pairs, settings.batch.workers, settings.batch.output_directory)
+    if (summary['status'] == 'failed').any():
+        sys.exit(1)
+
+
+if __name__ == ("__main__"):
+    main()
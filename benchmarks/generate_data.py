@@ -0,0 +1,119 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+
+# The columns of the FDIC failed banks inputs
+FDIC_COLUMNS = ['Bank Name', 'City', 'State', 'Cert', 'Acquiring Institution', 'Closing Date', 'Fund']
+
+STATES = ['AL', 'AZ', 'CA', 'CO', 'FL', 'GA', 'IA', 'IL', 'KS', 'MI', 'MN', 'MO', 'NJ', 'NY', 'OH', 'PA', 'TX', 'WA', 'WI', 'WV']
+CITIES = ['Philadelphia', 'Sac City', 'Elkhart', 'San Francisco', 'New York', 'Santa Clara', 'Almena',
+          'Fort Walton Beach', 'Barboursville', 'Chicago', 'Atlanta', 'Dallas', 'Phoenix', 'Denver', 'Seattle']
+BANK_WORDS = ['First', 'Citizens', 'Heartland', 'Republic', 'Signature', 'Valley', 'State', 'Community',
+              'National', 'Savings', 'Trust', 'Security', 'Farmers', 'Merchants', 'Pacific', 'Atlantic']
+
+
+def generate_source(rows: int, extra_columns: int = 0, string_ratio: float = 0.5, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a source DataFrame with the FDIC failed banks schema and unique 'Cert' keys.
+
+    Args:
+        rows (int): The number of rows.
+        extra_columns (int, optional): The number of columns added after the FDIC columns. Defaults to 0.
+        string_ratio (float, optional): The share of extra columns holding strings instead of floats. Defaults to 0.5.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: The generated DataFrame.
+    """
+
+    rng = np.random.default_rng(seed)
+    words = np.array(BANK_WORDS)
+
+    df = pd.DataFrame({
+        'Bank Name': np.char.add(np.char.add(rng.choice(words, rows), ' '), rng.choice(words, rows)),
+        'City': rng.choice(CITIES, rows),
+        'State': rng.choice(STATES, rows),
+        'Cert': rng.permutation(rows) + 1,
+        'Acquiring Institution': np.char.add(rng.choice(words, rows), ' Bank, N.A.'),
+        'Closing Date': (pd.Timestamp('2000-01-01') + pd.to_timedelta(rng.integers(0, 9000, rows), unit='D'))
+        .strftime('%d-%b-%y').str.lstrip('0'),
+        'Fund': rng.integers(10000, 11000, rows),
+    })
+
+    # Add the extra columns with the requested dtype mix
+    string_columns = int(round(extra_columns * string_ratio))
+    for i in range(extra_columns):
+        if i < string_columns:
+            df[f'Extra {i}'] = np.char.add('value ', rng.integers(0, 1000, rows).astype(str))
+        else:
+            df[f'Extra {i}'] = rng.normal(1000, 250, rows).round(2)
+    return df
+
+
+def generate_target(source: pd.DataFrame, diff_rate: float = 0.01, insert_rate: float = 0.0,
+                    delete_rate: float = 0.0, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a target DataFrame from a source DataFrame by changing, inserting and deleting rows.
+
+    Args:
+        source (pd.DataFrame): The source DataFrame.
+        diff_rate (float, optional): The share of rows with one changed cell. Defaults to 0.01.
+        insert_rate (float, optional): The share of rows inserted with new keys. Defaults to 0.0.
+        delete_rate (float, optional): The share of rows deleted. Defaults to 0.0.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: The generated DataFrame.
+    """
+
+    rng = np.random.default_rng(seed + 1)
+    target = source.copy()
+    value_columns = [col for col in target.columns if col != 'Cert']
+
+    # Change one random cell in the sampled rows
+    changed_rows = rng.choice(len(target), int(len(target) * diff_rate), replace=False)
+    changed_columns = rng.choice(value_columns, len(changed_rows))
+    for col in np.unique(changed_columns):
+        rows = changed_rows[changed_columns == col]
+        if pd.api.types.is_numeric_dtype(target[col]):
+            target.loc[rows, col] = target.loc[rows, col] + 1
+        elif col == 'Closing Date':
+            closing_dates = pd.to_datetime(target.loc[rows, col], format='%d-%b-%y') + pd.Timedelta(days=1)
+            target.loc[rows, col] = closing_dates.dt.strftime('%d-%b-%y').str.lstrip('0')
+        else:
+            target.loc[rows, col] = target.loc[rows, col] + ' (changed)'
+
+    # Delete rows, then insert copies of random rows under new keys
+    deleted_rows = rng.choice(len(target), int(len(target) * delete_rate), replace=False)
+    target = target.drop(index=target.index[deleted_rows])
+    inserted = source.sample(int(len(source) * insert_rate), random_state=seed, replace=True)
+    inserted['Cert'] = np.arange(len(inserted)) + source['Cert'].max() + 1
+
+    return pd.concat([target, inserted], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded source/target pair with the FDIC failed banks schema.")
+    parser.add_argument('--rows', type=int, default=100000, help="The number of source rows.")
+    parser.add_argument('--extra-columns', type=int, default=0, help="The number of columns added to the FDIC schema.")
+    parser.add_argument('--string-ratio', type=float, default=0.5, help="The share of extra columns holding strings.")
+    parser.add_argument('--diff-rate', type=float, default=0.01, help="The share of rows with one changed cell.")
+    parser.add_argument('--insert-rate', type=float, default=0.0, help="The share of rows inserted in the target.")
+    parser.add_argument('--delete-rate', type=float, default=0.0, help="The share of rows deleted from the target.")
+    parser.add_argument('--seed', type=int, default=0, help="The random seed.")
+    parser.add_argument('--output-dir', default='assets/benchmarks', help="The directory to save the files in.")
+    args = parser.parse_args()
+
+    source = generate_source(args.rows, args.extra_columns, args.string_ratio, args.seed)
+    target = generate_target(source, args.diff_rate, args.insert_rate, args.delete_rate, args.seed)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    source.to_csv(os.path.join(args.output_dir, 'source.csv'), index=False)
+    target.to_csv(os.path.join(args.output_dir, 'target.csv'), index=False)
+    print(f"Saved {len(source)} source rows and {len(target)} target rows to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from benchmarks.generate_data import generate_source, generate_target
+from modules.dataframe_validator import DataFrameValidator
+from modules.instrumentation import peak_rss_mb
+from modules.readers import read_input
+from modules.settings import apply_overrides, get_settings
+
+
+def timed(stages: list[dict], name: str, func, *args, **kwargs):
+    """
+    Runs a function and records its wall time and the peak RSS after it.
+
+    Args:
+        stages (list[dict]): The stage records to append to.
+        name (str): The name of the stage.
+        func (callable): The function to run.
+        *args: The positional arguments of the function.
+        **kwargs: The keyword arguments of the function.
+
+    Returns:
+        The result of the function.
+    """
+
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    peak = peak_rss_mb()
+    stages.append({'stage': name, 'seconds': round(time.perf_counter() - start, 4),
+                   'peak_rss_mb': round(peak, 1) if peak is not None else None})
+    return result
+
+
+def run_benchmark(source_path: str, target_path: str, key_columns: list[str], workers: int, output_dir: str) -> list[dict]:
+    """
+    Times each stage of the reconciliation pipeline on a source/target pair.
+
+    Args:
+        source_path (str): The path to the source file.
+        target_path (str): The path to the target file.
+        key_columns (list[str]): The columns to join on. Rows are compared by position if empty.
+        workers (int): The number of worker processes.
+        output_dir (str): The directory to save the diff report in.
+
+    Returns:
+        list[dict]: The wall time and peak RSS of each stage, and the 'parent' of the stages run inside another one.
+    """
+
+    stages = []
+    load_options = dict(date_columns=['Closing Date'], date_format='%d-%b-%y')
+    source_df = timed(stages, 'load_source', read_input, source_path, **load_options)
+    target_df = timed(stages, 'load_target', read_input, target_path, **load_options)
+
+    # Keep the run report of the benchmark in memory instead of overwriting the configured one
+    settings = apply_overrides(get_settings(), {('INSTRUMENTATION', 'REPORT_PATH'): '',
+                                                ('INSTRUMENTATION', 'PROMETHEUS_PATH'): ''})
+    validator = DataFrameValidator(source_df, target_df, key_columns=key_columns, settings=settings)
+    validator.validate(workers=workers, output_path=os.path.join(output_dir, 'diff.html'))
+
+    # Take the validation stages from the run report, including the report write recorded inside the data validation
+    for stage in validator.run_report.stages:
+        stages.append({'stage': stage['stage'], 'seconds': round(stage['wall_seconds'], 4),
+                       'peak_rss_mb': round(stage['peak_rss_mb'], 1) if stage['peak_rss_mb'] is not None else None,
+                       **({'parent': stage['parent']} if 'parent' in stage else {})})
+    return stages
+
+
+def current_commit() -> str:
+    """Returns the current git commit, or None outside of a git checkout."""
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the reconciliation pipeline on generated FDIC-schema data.")
+    parser.add_argument('--rows', type=int, default=100000, help="The number of source rows.")
+    parser.add_argument('--extra-columns', type=int, default=0, help="The number of columns added to the FDIC schema.")
+    parser.add_argument('--string-ratio', type=float, default=0.5, help="The share of extra columns holding strings.")
+    parser.add_argument('--diff-rate', type=float, default=0.01, help="The share of rows with one changed cell.")
+    parser.add_argument('--insert-rate', type=float, default=0.0, help="The share of rows inserted in the target.")
+    parser.add_argument('--delete-rate', type=float, default=0.0, help="The share of rows deleted from the target.")
+    parser.add_argument('--seed', type=int, default=0, help="The random seed.")
+    parser.add_argument('--key-columns', default='Cert', help="Comma-separated key columns. Empty compares rows by position.")
+    parser.add_argument('--workers', type=int, default=1, help="The number of worker processes.")
+    parser.add_argument('--output-dir', default='assets/benchmarks', help="The directory for the generated files.")
+    parser.add_argument('--results', default='benchmarks/results.json', help="The JSON file the results are appended to.")
+    args = parser.parse_args()
+
+    # Generate the inputs, so that loading is measured from files like in production
+    os.makedirs(args.output_dir, exist_ok=True)
+    source_path = os.path.join(args.output_dir, 'source.csv')
+    target_path = os.path.join(args.output_dir, 'target.csv')
+    source = generate_source(args.rows, args.extra_columns, args.string_ratio, args.seed)
+    generate_target(source, args.diff_rate, args.insert_rate, args.delete_rate, args.seed).to_csv(target_path, index=False)
+    source.to_csv(source_path, index=False)
+    del source
+
+    key_columns = [item.strip() for item in args.key_columns.split(',') if item.strip()]
+    stages = run_benchmark(source_path, target_path, key_columns, args.workers, args.output_dir)
+
+    result = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('output_dir', 'results')},
+        'total_seconds': round(sum(stage['seconds'] for stage in stages if 'parent' not in stage), 4),
+        'peak_rss_mb': max((stage['peak_rss_mb'] for stage in stages if stage['peak_rss_mb'] is not None), default=None),
+        'stages': stages,
+    }
+
+    # Append to the previous results so runs can be compared across commits
+    results = []
+    if os.path.exists(args.results):
+        with open(args.results) as results_file:
+            results = json.load(results_file)
+    results.append(result)
+    with open(args.results, 'w') as results_file:
+        json.dump(results, results_file, indent=2)
+
+    for stage in stages:
+        peak = f"{stage['peak_rss_mb']:>10.1f} MB" if stage['peak_rss_mb'] is not None else ''
+        print(f"{stage['stage']:<34} {stage['seconds']:>10.4f} s {peak}")
+    print(f"Results appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,29 @@
-import pandas as pd
-from modules.get_config import get_config
-from modules.dataframe_validator import DataFrameValidator
+import argparse
+import sys
+from modules.get_config import CONFIG_FILE_PATH
+from modules.settings import load_settings, parse_overrides
+from modules.logging_config import configure_logging
+from modules.pipeline import reconcile
 
 
-def main():
-    # Initialize files
-    source_file = get_config('INPUTS', 'SOURCE_FILE')
-    target_file = get_config('INPUTS', 'TARGET_FILE')
+def main(argv: list[str] = None):
+    # Load the settings once, applying any command-line overrides
+    parser = argparse.ArgumentParser(description="Reconcile a source and a target dataset.")
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help="The path to the configuration file.")
+    parser.add_argument('--set', action='append', default=[], metavar='SECTION.OPTION=VALUE',
+                        help="Override a configuration option, e.g. PERFORMANCE.WORKERS=4. Can be repeated.")
+    parser.add_argument('--fail-fast', action='store_true', help="Stop at the first failed check.")
+    args = parser.parse_args(argv)
+    overrides = parse_overrides(args.set)
+    if args.fail_fast:
+        overrides[('RECONCILIATION', 'FAIL_FAST')] = '1'
+    settings = load_settings(args.config, overrides=overrides)
+    configure_logging(settings)
 
-    # Create dataframes
-    source_df = pd.read_csv(source_file)
-    target_df = pd.read_csv(target_file)
-
-    # Validate the data between the DataFrames
-    validator = DataFrameValidator(source_df, target_df)
-    validator.validate()
+    # Validate the data between the source and target files, and exit with an error if a check failed
+    result = reconcile(settings)
+    if not result.passed:
+        sys.exit(1)
 
 
 if __name__ == ("__main__"):
@@ -0,0 +1,235 @@
+import pandas as pd
+import importlib.util
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from configparser import ConfigParser
+from modules.logging_config import Logger, configure_logging
+from modules.pipeline import reconcile
+from modules.result import ReconciliationResult
+from modules.settings import Settings, apply_overrides
+
+
+logger = Logger()
+
+# The manifest fields that set the files of a pair, as (section, option) overrides
+PAIR_FIELDS = {'source_file': ('INPUTS', 'SOURCE_FILE'), 'target_file': ('INPUTS', 'TARGET_FILE')}
+
+# The columns of the consolidated summary
+SUMMARY_COLUMNS = ['name', 'source_file', 'target_file', 'status', 'changed', 'source_only', 'target_only',
+                   'failed_checks', 'seconds', 'output_path', 'error']
+
+
+def read_manifest(path: str) -> list[dict]:
+    """
+    Reads the source/target pairs of a batch from a CSV, INI or YAML manifest.
+
+    Every pair has a 'source_file' and a 'target_file', an optional 'name', and optional configuration
+    overrides written as 'SECTION.OPTION', e.g. 'RECONCILIATION.KEY_COLUMNS'. In a CSV manifest these are
+    columns with one row per pair, in an INI manifest each section is a pair named after the section, and
+    a YAML manifest is a list of pairs or a mapping of names to pairs.
+
+    Args:
+        path (str): The path to the manifest.
+
+    Returns:
+        list[dict]: The 'name' and the (section, option) 'overrides' of each pair.
+
+    Raises:
+        ValueError: If the manifest format is not supported or a pair has an unknown field.
+        ImportError: If the manifest is YAML and PyYAML is not installed.
+    """
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        entries = pd.read_csv(path, dtype=str, keep_default_na=False).to_dict('records')
+    elif extension in ('.ini', '.cfg'):
+        manifest = ConfigParser(interpolation=None)
+        manifest.optionxform = str
+        manifest.read(path)
+        entries = [{'name': section, **manifest[section]} for section in manifest.sections()]
+    elif extension in ('.yaml', '.yml'):
+        if importlib.util.find_spec('yaml') is None:
+            raise ImportError("Reading a YAML manifest requires PyYAML: pip install pyyaml")
+        import yaml
+
+        with open(path) as manifest_file:
+            manifest = yaml.safe_load(manifest_file) or []
+        if isinstance(manifest, dict):
+            manifest = [{'name': name, **entry} for name, entry in manifest.items()]
+        entries = manifest
+    else:
+        raise ValueError(f"Unsupported manifest format: {path}")
+
+    pairs = []
+    for number, entry in enumerate(entries, start=1):
+        overrides = {}
+        for field, value in entry.items():
+            if field == 'name' or value is None or str(value).strip() == '':
+                continue
+            if field.lower() in PAIR_FIELDS:
+                overrides[PAIR_FIELDS[field.lower()]] = str(value)
+            elif '.' in field:
+                section, option = field.split('.', 1)
+                overrides[(section.strip().upper(), option.strip().upper())] = str(value)
+            else:
+                raise ValueError(f"Unknown field in pair {number} of {path}: {field}")
+
+        name = str(entry.get('name') or '').strip() or f'pair_{number}'
+        pairs.append({'name': name, 'overrides': overrides})
+    return pairs
+
+
+def run_batch(settings: Settings, pairs: list[dict], workers: int, output_dir: str) -> pd.DataFrame:
+    """
+    Reconciles many source/target pairs on a bounded pool of worker processes and saves a consolidated summary.
+
+    Each worker imports pandas once and reconciles pairs back to back, and while one worker is loading
+    its files the others keep comparing theirs. A pair that fails is recorded in the summary without
+    stopping the other pairs.
+
+    Args:
+        settings (Settings): The settings shared by every pair.
+        pairs (list[dict]): The 'name' and (section, option) 'overrides' of each pair, as read by read_manifest.
+        workers (int): The number of worker processes. Runs in-process if 1 or less.
+        output_dir (str): The directory the differences of each pair and the summary are saved to.
+
+    Returns:
+        pd.DataFrame: The summary, with one row per pair.
+    """
+
+    # Name each pair's output directory uniquely
+    names = {}
+    for pair in pairs:
+        name = re.sub(r'[^\w.-]+', '_', pair['name'])
+        names[name] = names.get(name, 0) + 1
+        pair['directory'] = os.path.join(output_dir, name if names[name] == 1 else f'{name}_{names[name]}')
+
+    # The summary rows, keyed by the position of each pair in the manifest
+    rows = {}
+    jobs = {}
+    for position, pair in enumerate(pairs):
+        try:
+            jobs[position] = (pair, _pair_settings(settings, pair, workers))
+        except (KeyError, ValueError) as e:
+            logger.error(f"Invalid configuration for pair {pair['name']}: {e}")
+            rows[position] = _summary_row(pair, settings, 'failed', error=str(e))
+
+    logger.info(f"Reconciling {len(jobs)} pairs with {max(workers, 1)} workers.")
+    if workers <= 1:
+        for position, (pair, pair_settings) in jobs.items():
+            rows[position] = _reconcile_pair(pair, pair_settings)
+    else:
+        # Workers started with 'spawn' import the modules again, so set their logging up like this process
+        with ProcessPoolExecutor(max_workers=workers, initializer=configure_logging, initargs=(settings,)) as executor:
+            futures = {executor.submit(_reconcile_pair, pair, pair_settings): position
+                       for position, (pair, pair_settings) in jobs.items()}
+            for future in as_completed(futures):
+                position = futures[future]
+                try:
+                    rows[position] = future.result()
+                except Exception as e:
+                    # The worker process died, e.g. it ran out of memory
+                    pair, pair_settings = jobs[position]
+                    logger.error(f"Pair {pair['name']} failed: {e!r}")
+                    rows[position] = _summary_row(pair, pair_settings, 'failed', error=repr(e))
+
+    summary = pd.DataFrame([rows[position] for position in sorted(rows)], columns=SUMMARY_COLUMNS)
+    summary = summary.astype({'changed': 'Int64', 'source_only': 'Int64', 'target_only': 'Int64'})
+
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, 'summary.csv')
+    summary.to_csv(summary_path, index=False)
+
+    counts = summary['status'].value_counts()
+    logger.info(f"Batch finished: {counts.get('passed', 0)} passed, {counts.get('differences', 0)} with differences, "
+                f"{counts.get('failed', 0)} failed. Summary saved to {summary_path}")
+    return summary
+
+
+def _pair_settings(settings: Settings, pair: dict, workers: int) -> Settings:
+    """
+    Returns the settings of a pair, saving its run reports in its output directory.
+
+    Args:
+        settings (Settings): The settings shared by every pair.
+        pair (dict): The pair, with its output 'directory'.
+        workers (int): The number of batch worker processes.
+
+    Returns:
+        Settings: The settings of the pair.
+    """
+
+    overrides = {}
+
+    # The pairs already run in parallel, so each pair runs its checks serially unless the manifest says otherwise
+    if workers > 1:
+        overrides[('PERFORMANCE', 'WORKERS')] = '1'
+    for option in ('REPORT_PATH', 'PROMETHEUS_PATH'):
+        path = getattr(settings.instrumentation, option.lower())
+        if path:
+            overrides[('INSTRUMENTATION', option)] = os.path.join(pair['directory'], os.path.basename(path))
+
+    return apply_overrides(settings, {**overrides, **pair['overrides']})
+
+
+def _reconcile_pair(pair: dict, settings: Settings) -> dict:
+    """
+    Reconciles one pair, catching any failure so that the other pairs keep running.
+
+    Args:
+        pair (dict): The pair, with its output 'directory'.
+        settings (Settings): The settings of the pair.
+
+    Returns:
+        dict: The summary row of the pair.
+    """
+
+    start = time.perf_counter()
+    output_path = os.path.join(pair['directory'], 'diff.html')
+    logger.info(f"Reconciling pair {pair['name']}: {settings.inputs.source_file} -> {settings.inputs.target_file}")
+    try:
+        result = reconcile(settings, output_path=output_path)
+    except Exception as e:
+        logger.error(f"Pair {pair['name']} failed: {e!r}")
+        return _summary_row(pair, settings, 'failed', seconds=time.perf_counter() - start, error=repr(e))
+
+    # Checks that could not run fail the pair, while failed checks are differences between the files
+    errors = [f"{check.name}: {check.message}" for check in result.checks if check.status == 'error']
+    status = 'failed' if errors else 'passed' if result.passed else 'differences'
+    return _summary_row(pair, settings, status, result, time.perf_counter() - start, '; '.join(errors) or None)
+
+
+def _summary_row(pair: dict, settings: Settings, status: str, result: ReconciliationResult = None, seconds: float = None,
+                 error: str = None) -> dict:
+    """
+    Returns the summary row of a pair.
+
+    Args:
+        pair (dict): The pair.
+        settings (Settings): The settings of the pair.
+        status (str): 'passed', 'differences' or 'failed'.
+        result (ReconciliationResult, optional): The result of the pair, unless it raised. Defaults to None.
+        seconds (float, optional): The time taken to reconcile the pair. Defaults to None.
+        error (str, optional): The error of a failed pair. Defaults to None.
+
+    Returns:
+        dict: The summary row.
+    """
+
+    source_file, target_file = (pair['overrides'].get(PAIR_FIELDS[field]) for field in ('source_file', 'target_file'))
+    diff_counts = result.diff_counts if result is not None else {}
+    return {
+        'name': pair['name'],
+        'source_file': source_file or settings.inputs.source_file,
+        'target_file': target_file or settings.inputs.target_file,
+        'status': status,
+        'changed': diff_counts.get('changed', 0) if result is not None else None,
+        'source_only': diff_counts.get('source_only', 0) if result is not None else None,
+        'target_only': diff_counts.get('target_only', 0) if result is not None else None,
+        'failed_checks': ', '.join(check.name for check in result.checks if check.status == 'failed') if result is not None else None,
+        'seconds': round(seconds, 3) if seconds is not None else None,
+        'output_path': result.outputs.get('html') if result is not None else None,
+        'error': error,
+    }
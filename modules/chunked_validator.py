@@ -0,0 +1,405 @@
+import pandas as pd
+import numpy as np
+import math
+import os
+from pandas.api.types import is_numeric_dtype
+from modules.logging_config import Logger
+from modules.settings import Settings, get_settings
+from modules.comparison import compare_positional, compare_on_keys, keys_before
+from modules.report_writer import DiffReportWriter
+from modules.profiler import FLOAT_REL_TOL
+from modules.result import ReconciliationResult
+
+
+logger = Logger()
+
+
+class UnsortedInputError(ValueError):
+    """Raised when a file compared by key range is not sorted on the key columns."""
+
+
+class ChunkedValidator:
+    """
+    A class to compare two CSV files in chunks, so that peak memory is bounded by the chunk size instead of the file size.
+
+    Rows are aligned by row range, or by key range when both files are sorted on the key columns.
+    Differences are appended to files chunk by chunk, and the statistics are accumulated incrementally.
+
+    Attr:
+        source_file (str): The path to the source CSV file.
+        target_file (str): The path to the target CSV file.
+        chunk_size (int): The number of rows read from each file per chunk.
+        key_columns (list[str]): The columns the files are sorted on. Rows are aligned by position if empty.
+        settings (Settings): The settings of the run.
+        columns (list[str]): The columns of the source file, read by the column validation.
+        row_counts (dict): The number of rows read from each file.
+        diff_counts (dict): The number of changed, source-only and target-only rows.
+        stats (dict): The running min, max, null count and sum of the checked columns for each file.
+        result (ReconciliationResult): The status of each check of the last run.
+
+    Methods:
+        __init__(source_file: str, target_file: str, chunk_size: int, key_columns: list[str] = None, settings: Settings = None): Initializes the ChunkedValidator.
+        validate(output_path: str = 'assets/outputs/diff.html', fail_fast: bool = None): Runs all validation checks on the files.
+        column_validation(): Validates that both files have the same columns, including the configured key and statistics columns.
+        data_validation(output_path: str): Compares the files chunk by chunk and saves the differences.
+        _row_range_chunks(): Yields aligned source and target chunks by row range.
+        _key_range_chunks(): Yields aligned source and target chunks by key range.
+        _check_sorted(side: str, chunk: pd.DataFrame, previous_key: tuple): Raises if a chunk is not sorted on the key columns.
+        _update_stats(side: str, chunk: pd.DataFrame): Accumulates the statistics of a chunk.
+        stats_validation(): Compares the accumulated statistics of both files.
+    """
+
+    def __init__(self, source_file: str, target_file: str, chunk_size: int, key_columns: list[str] = None,
+                 settings: Settings = None) -> None:
+        """
+        Initializes the ChunkedValidator class with two CSV files.
+
+        Args:
+            source_file (str): The path to the source CSV file.
+            target_file (str): The path to the target CSV file.
+            chunk_size (int): The number of rows read from each file per chunk.
+            key_columns (list[str], optional): The columns both files are sorted on. Defaults to None (align by position).
+            settings (Settings, optional): The settings of the run. Defaults to the settings of 'config.ini'.
+        """
+
+        self.source_file = source_file
+        self.target_file = target_file
+        self.chunk_size = chunk_size
+        self.key_columns = list(key_columns) if key_columns else []
+        self.settings = settings or get_settings()
+        self.columns = None
+        self.row_counts = {'source': 0, 'target': 0}
+        self.diff_counts = {'changed': 0, 'source_only': 0, 'target_only': 0}
+        self.stats = {'source': {}, 'target': {}}
+        self._stat_columns = None
+        self.result = ReconciliationResult()
+
+    def validate(self, output_path: str = 'assets/outputs/diff.html', fail_fast: bool = None) -> ReconciliationResult:
+        """
+        Runs all validation checks on the files. The files are only compared if their columns match.
+
+        Args:
+            output_path (str): The path to save the HTML summary of the differences.
+            fail_fast (bool, optional): Whether to skip the statistics check after a failed data check.
+                Defaults to the 'FAIL_FAST' setting.
+
+        Returns:
+            ReconciliationResult: The status, metrics and saved differences of each check.
+        """
+
+        fail_fast = self.settings.reconciliation.fail_fast if fail_fast is None else fail_fast
+        self.result = ReconciliationResult()
+
+        self.column_validation()
+        if not self.result.passed:
+            self.result.stopped_early = True
+            return self.result
+
+        try:
+            self.data_validation(output_path)
+        except UnsortedInputError as e:
+            # The files are not sorted on the key columns, so the statistics are incomplete
+            self.result.add('data', 'error', str(e))
+            self.result.stopped_early = True
+            return self.result
+        self.result.diff_counts = dict(self.diff_counts)
+
+        if fail_fast and not self.result.passed:
+            logger.error("Stopping after data_validation, since a check failed.")
+            self.result.stopped_early = True
+            return self.result
+
+        self.stats_validation()
+        return self.result
+
+    def column_validation(self) -> None:
+        """Validates that both files have the same columns, reading only the headers."""
+
+        self.columns = list(pd.read_csv(self.source_file, nrows=0).columns)
+        target_columns = list(pd.read_csv(self.target_file, nrows=0).columns)
+
+        logger.info(f"Source columns: {len(self.columns)}.")
+        logger.info(f"Target columns: {len(target_columns)}.")
+
+        missing_source_columns = set(target_columns) - set(self.columns)
+        missing_target_columns = set(self.columns) - set(target_columns)
+
+        if missing_source_columns:
+            logger.error(f"Columns missing in the source file: {missing_source_columns}.")
+        if missing_target_columns:
+            logger.error(f"Columns missing in the target file: {missing_target_columns}.")
+
+        missing_key_columns = [col for col in self.key_columns if col not in self.columns]
+        if missing_key_columns:
+            logger.error(f"Key columns missing in the files: {missing_key_columns}.")
+
+        # The statistics are accumulated while streaming, so the configured columns must exist up front
+        column_types = self.settings.column_types
+        stat_columns = list(column_types.date) + ([] if column_types.auto_numeric_discover else list(column_types.numeric))
+        missing_stat_columns = [col for col in stat_columns if col not in self.columns or col not in target_columns]
+        if missing_stat_columns:
+            logger.error(f"Configured NUMERIC/DATE columns missing in the files: {missing_stat_columns}.")
+
+        metrics = {'source_columns': len(self.columns), 'target_columns': len(target_columns),
+                   'missing_source_columns': sorted(missing_source_columns),
+                   'missing_target_columns': sorted(missing_target_columns),
+                   'missing_key_columns': missing_key_columns,
+                   'missing_stat_columns': missing_stat_columns}
+        if missing_source_columns or missing_target_columns or missing_key_columns or missing_stat_columns:
+            self.result.add('columns', 'failed', "Columns are missing.", **metrics)
+            return
+
+        logger.info("All column names match and there are no missing columns.")
+        self.result.add('columns', 'passed', "All column names match.", **metrics)
+
+    def data_validation(self, output_path: str) -> None:
+        """
+        Compare the files chunk by chunk and append the differences to files.
+        Differing cells are streamed to a long-format file summarized in the HTML file at the output path,
+        and unmatched rows are saved to CSV files next to it.
+
+        Args:
+            output_path (str): The path to save the HTML summary of the differences.
+        """
+
+        writer = DiffReportWriter(output_path, file_format=self.settings.report.format, top_n=self.settings.report.top_n)
+        output_root = os.path.splitext(output_path)[0]
+        unmatched_paths = {'source_only': f'{output_root}_source_only.csv',
+                           'target_only': f'{output_root}_target_only.csv'}
+
+        # Remove the results of any previous run, since the files are appended to
+        for path in unmatched_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+        use_row_hash = self.settings.reconciliation.row_hash_prepass
+        rules = dict(self.settings.comparison.rules)
+        null_equals_null = self.settings.comparison.null_equals_null
+        chunks = self._key_range_chunks() if self.key_columns else self._row_range_chunks()
+        for source_chunk, target_chunk in chunks:
+            self._update_stats('source', source_chunk)
+            self._update_stats('target', target_chunk)
+
+            if self.key_columns:
+                comparison = compare_on_keys(source_chunk, target_chunk, self.key_columns, use_row_hash=use_row_hash,
+                                             rules=rules, null_equals_null=null_equals_null)
+                changed = comparison.compared.loc[comparison.rows_with_differences]
+                value_columns = comparison.value_columns
+                writer.write(changed[self.key_columns],
+                             changed[[f'{col}_source' for col in value_columns]].set_axis(value_columns, axis=1),
+                             changed[[f'{col}_target' for col in value_columns]].set_axis(value_columns, axis=1),
+                             comparison.differences.loc[comparison.rows_with_differences])
+                unmatched = {'source_only': comparison.source_only, 'target_only': comparison.target_only}
+            else:
+                # Rows past the end of the shorter file only exist on one side
+                overlap = min(len(source_chunk), len(target_chunk))
+                source_rows, target_rows = source_chunk.iloc[:overlap], target_chunk.iloc[:overlap]
+                differences, rows_with_differences = compare_positional(source_rows, target_rows, use_row_hash=use_row_hash,
+                                                                        rules=rules, null_equals_null=null_equals_null)
+
+                rows = rows_with_differences.index[rows_with_differences]
+                writer.write(pd.DataFrame({'row': rows}, index=rows), source_rows.loc[rows], target_rows.loc[rows],
+                             differences.loc[rows])
+                unmatched = {'source_only': source_chunk.iloc[overlap:], 'target_only': target_chunk.iloc[overlap:]}
+
+            # Append the unmatched rows of this chunk
+            for name, rows in unmatched.items():
+                if not rows.empty:
+                    rows.to_csv(unmatched_paths[name], mode='a', header=not os.path.exists(unmatched_paths[name]),
+                                index=not self.key_columns)
+                    self.diff_counts[name] += len(rows)
+
+        self.diff_counts['changed'] = writer.row_count
+        writer.close()
+
+        logger.info(f"Source record count: {self.row_counts['source']}")
+        logger.info(f"Target record count: {self.row_counts['target']}")
+        logger.info(f"Changed rows: {self.diff_counts['changed']}.")
+        logger.info(f"Source-only rows: {self.diff_counts['source_only']}.")
+        logger.info(f"Target-only rows: {self.diff_counts['target_only']}.")
+
+        metrics = {**self.diff_counts, 'source_rows': self.row_counts['source'], 'target_rows': self.row_counts['target']}
+        if not any(self.diff_counts.values()):
+            logger.info("There are no differences between the datasets.")
+            self.result.add('data', 'passed', "There are no differences between the datasets.", **metrics)
+            return
+        else:
+            logger.warning("There are differences between the datasets.")
+            self.result.add('data', 'failed', "There are differences between the datasets.", **metrics)
+
+        if self.diff_counts['changed']:
+            self.result.outputs.update({'cells': writer.cells_path, 'html': output_path})
+            logger.info(f"{sum(writer.cell_counts.values())} differing cells saved to {writer.cells_path}, "
+                        f"and summarized in {output_path}")
+        for name, path in unmatched_paths.items():
+            if self.diff_counts[name]:
+                self.result.outputs[name] = path
+                logger.info(f"{self.diff_counts[name]} {name.replace('_', '-')} rows saved to {path}")
+
+    def _row_range_chunks(self):
+        """
+        Yields aligned source and target chunks by row range.
+
+        Yields:
+            tuple[pd.DataFrame, pd.DataFrame]: The source and target rows of the same row range.
+        """
+
+        empty = pd.DataFrame(columns=self.columns)
+        with pd.read_csv(self.source_file, chunksize=self.chunk_size) as source_reader, \
+                pd.read_csv(self.target_file, chunksize=self.chunk_size) as target_reader:
+            while True:
+                source_chunk = next(source_reader, None)
+                target_chunk = next(target_reader, None)
+                if source_chunk is None and target_chunk is None:
+                    return
+
+                source_chunk = empty if source_chunk is None else source_chunk
+                target_chunk = empty if target_chunk is None else target_chunk[self.columns]
+                yield source_chunk, target_chunk
+
+    def _key_range_chunks(self):
+        """
+        Yields aligned source and target chunks by key range. Both files must be sorted on the key columns.
+
+        Rows are held back until the other file has been read past their key, so every key
+        is compared within a single chunk pair.
+
+        Yields:
+            tuple[pd.DataFrame, pd.DataFrame]: The source and target rows of the same key range.
+        """
+
+        with pd.read_csv(self.source_file, chunksize=self.chunk_size) as source_reader, \
+                pd.read_csv(self.target_file, chunksize=self.chunk_size) as target_reader:
+            readers = {'source': source_reader, 'target': target_reader}
+            buffers = {side: pd.DataFrame(columns=self.columns) for side in readers}
+            exhausted = {side: False for side in readers}
+            last_keys = {side: None for side in readers}
+            grow = False
+
+            while True:
+                # Top up each buffer to at least one chunk, or read one more if the last range was empty
+                for side, reader in readers.items():
+                    target_size = len(buffers[side]) + self.chunk_size if grow else self.chunk_size
+                    while not exhausted[side] and len(buffers[side]) < target_size:
+                        chunk = next(reader, None)
+                        if chunk is None:
+                            exhausted[side] = True
+                            break
+                        self._check_sorted(side, chunk, last_keys[side])
+                        last_keys[side] = tuple(chunk[self.key_columns].iloc[-1])
+                        buffers[side] = chunk if buffers[side].empty else pd.concat([buffers[side], chunk])
+                grow = False
+
+                if all(exhausted.values()):
+                    if not (buffers['source'].empty and buffers['target'].empty):
+                        yield buffers['source'], buffers['target'][self.columns]
+                    return
+
+                # Every key before the smallest last key read so far has been fully read on both sides
+                bound = min(last_keys[side] for side in readers if not exhausted[side])
+                taken = {side: keys_before(buffer, self.key_columns, bound) for side, buffer in buffers.items()}
+
+                if not any(mask.any() for mask in taken.values()):
+                    grow = True
+                    continue
+
+                yield buffers['source'].loc[taken['source']], buffers['target'].loc[taken['target'], self.columns]
+                buffers = {side: buffer.loc[~taken[side]] for side, buffer in buffers.items()}
+
+    def _check_sorted(self, side: str, chunk: pd.DataFrame, previous_key: tuple) -> None:
+        """
+        Raises if a chunk is not sorted on the key columns.
+
+        Args:
+            side (str): The side the chunk was read from.
+            chunk (pd.DataFrame): The chunk to check.
+            previous_key (tuple): The last key of the previous chunk, or None for the first chunk.
+
+        Raises:
+            UnsortedInputError: If the chunk is not sorted on the key columns.
+        """
+
+        previous = chunk[self.key_columns].shift(1)
+        if previous_key is not None:
+            previous.iloc[0] = previous_key
+
+        # A row is out of order if its key sorts before the key of the previous row
+        out_of_order = keys_before(chunk, self.key_columns, [previous[col] for col in self.key_columns])
+        if out_of_order.any():
+            logger.error(f"The {side} file is not sorted on the key columns {self.key_columns}.")
+            raise UnsortedInputError(f"The {side} file is not sorted on the key columns {self.key_columns}.")
+
+    def _update_stats(self, side: str, chunk: pd.DataFrame) -> None:
+        """
+        Accumulates the row count, min, max, null count and sum of the checked columns in a chunk.
+        Date columns are parsed with the configured DATE_FORMAT first, unless PARSE_DATES is disabled.
+
+        Args:
+            side (str): The side the chunk was read from.
+            chunk (pd.DataFrame): The chunk to accumulate.
+        """
+
+        self.row_counts[side] += len(chunk)
+        if chunk.empty:
+            return
+
+        # Resolve the checked columns from the first chunk
+        if self._stat_columns is None:
+            if self.settings.column_types.auto_numeric_discover:
+                numeric_columns = list(chunk.select_dtypes(include=[np.number]).columns)
+            else:
+                numeric_columns = list(self.settings.column_types.numeric)
+            date_columns = list(self.settings.column_types.date)
+            self._stat_columns = {'Numeric': numeric_columns, 'Date': date_columns}
+
+        # Each chunk infers its own dtypes, so stop accumulating a discovered column once a chunk holds non-numbers
+        if self.settings.column_types.auto_numeric_discover:
+            for col in [col for col in self._stat_columns['Numeric'] if not is_numeric_dtype(chunk[col])]:
+                logger.warning(f"Column {col} is not numeric in every chunk; skipping its statistics.")
+                self._stat_columns['Numeric'].remove(col)
+                for side_stats in self.stats.values():
+                    side_stats.pop(col, None)
+
+        for datatype, columns in self._stat_columns.items():
+            for col in columns:
+                values = chunk[col]
+                stats = self.stats[side].setdefault(col, {'datatype': datatype, 'min': None, 'max': None,
+                                                          'nulls': 0, 'sum': 0})
+                stats['nulls'] += int(values.isna().sum())
+
+                # Parse the dates, so that their min and max are chronological instead of lexicographic
+                if datatype == 'Date' and self.settings.inputs.parse_dates:
+                    values = pd.to_datetime(values, format=self.settings.inputs.date_format or 'mixed', errors='coerce')
+                chunk_min, chunk_max = values.min(), values.max()
+                if pd.notna(chunk_min):
+                    stats['min'] = chunk_min if stats['min'] is None else min(stats['min'], chunk_min)
+                    stats['max'] = chunk_max if stats['max'] is None else max(stats['max'], chunk_max)
+                if datatype == 'Numeric':
+                    stats['sum'] += values.sum()
+
+    def stats_validation(self) -> None:
+        """Compares the accumulated statistics of both files and logs any discrepancies."""
+
+        logger.info("Median checks are skipped in streaming mode, since they need the full column.")
+        mismatched_columns = []
+        for col, source_stats in self.stats['source'].items():
+            target_stats = self.stats['target'].get(col)
+            if target_stats is None:
+                continue
+
+            # The sums are accumulated in different chunk groupings on each side, so rounding alone can differ
+            mismatches = [stat for stat in ('min', 'max', 'nulls') if source_stats[stat] != target_stats[stat]]
+            if not math.isclose(source_stats['sum'], target_stats['sum'], rel_tol=FLOAT_REL_TOL):
+                mismatches.append('sum')
+            summary = ", ".join(f"{stat}: {source_stats[stat]} / {target_stats[stat]}" for stat in ('min', 'max', 'nulls', 'sum'))
+            if mismatches:
+                logger.warning(f"{source_stats['datatype']} column {col} mismatch in {mismatches} (Source / Target): {summary}")
+                mismatched_columns.append(str(col))
+            else:
+                logger.info(f"{source_stats['datatype']} column {col} statistics match (Source / Target): {summary}")
+
+        if mismatched_columns:
+            self.result.add('stats', 'failed', f"Mismatches in columns: {mismatched_columns}.",
+                            mismatched_columns=mismatched_columns)
+        else:
+            self.result.add('stats', 'passed', "All columns match.", mismatched_columns=mismatched_columns)
@@ -0,0 +1,332 @@
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, replace
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype, is_object_dtype, is_string_dtype
+
+
+@dataclass(frozen=True)
+class ColumnRule:
+    """
+    How the values of a column are compared.
+
+    Attr:
+        abs_tol (float): The absolute difference under which numbers are equal.
+        rel_tol (float): The difference, relative to the larger magnitude, under which numbers are equal.
+        ignore_case (bool): Whether strings are compared case-insensitively.
+        ignore_whitespace (bool): Whether leading, trailing and repeated whitespace in strings is ignored.
+        date_format (str): The strftime format strings are parsed with before comparing them as dates,
+            '' to infer it, or None to compare the values as they are. Values that do not parse as
+            dates are compared as they are.
+    """
+
+    abs_tol: float = 0.0
+    rel_tol: float = 0.0
+    ignore_case: bool = False
+    ignore_whitespace: bool = False
+    date_format: str = None
+
+
+@dataclass
+class KeyComparison:
+    """
+    The result of joining two DataFrames on their key columns.
+
+    Attr:
+        key_columns (list[str]): The columns the DataFrames were joined on.
+        value_columns (list[str]): The compared, non-key columns.
+        source_only (pd.DataFrame): Rows whose keys only exist in the first DataFrame.
+        target_only (pd.DataFrame): Rows whose keys only exist in the second DataFrame.
+        matched_count (int): The number of rows whose keys exist in both DataFrames.
+        compared (pd.DataFrame): The matched rows compared cell by cell, with '_source' and '_target' value columns.
+        differences (pd.DataFrame): DataFrame of boolean values indicating differences in the compared rows.
+        rows_with_differences (pd.Series): Series indicating compared rows with differences.
+    """
+
+    key_columns: list[str]
+    value_columns: list[str]
+    source_only: pd.DataFrame
+    target_only: pd.DataFrame
+    matched_count: int
+    compared: pd.DataFrame
+    differences: pd.DataFrame
+    rows_with_differences: pd.Series
+
+    @property
+    def changed(self) -> pd.DataFrame:
+        """Returns the matched rows with differences, with the key columns in front of the side-by-side values."""
+
+        columns = self.key_columns + [f'{col}_{side}' for col in self.value_columns for side in ('source', 'target')]
+        return self.compared.loc[self.rows_with_differences, columns]
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Compute a vectorized 64-bit hash of every row, ignoring the index.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to hash.
+
+    Returns:
+        np.ndarray: One uint64 hash per row.
+    """
+
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def parse_rules(value: str) -> dict:
+    """
+    Parses comparison rules written as 'column: rule, rule' and separated by semicolons,
+    e.g. 'Fund: abs=0.01, rel=1e-9; Bank Name: ignore_case, ignore_whitespace; Closing Date: date=%d-%b-%y'.
+
+    The rules of the column '*' apply to every column without rules of its own.
+
+    Args:
+        value (str): The rules to parse.
+
+    Returns:
+        dict: The ColumnRule of each column.
+
+    Raises:
+        ValueError: If a rule is not supported.
+    """
+
+    rules = {}
+    for item in filter(None, (item.strip() for item in value.split(';'))):
+        col, separator, tokens = (part.strip() for part in item.partition(':'))
+        if not separator:
+            raise ValueError(f"Invalid comparison rule, expected 'column: rule': {item}")
+
+        options = {}
+        for token in filter(None, (token.strip() for token in tokens.split(','))):
+            name, _, argument = (part.strip() for part in token.partition('='))
+            if name in ('abs', 'rel'):
+                options[f'{name}_tol'] = float(argument)
+            elif name in ('ignore_case', 'ignore_whitespace'):
+                options[name] = True
+            elif name == 'date':
+                options['date_format'] = argument
+            else:
+                raise ValueError(f"Unsupported comparison rule for column {col}: {token}")
+        rules[col] = ColumnRule(**options)
+    return rules
+
+
+def compare_columns(source: pd.Series, target: pd.Series, rule: ColumnRule = None, null_equals_null: bool = True) -> np.ndarray:
+    """
+    Compare two aligned columns value by value, with vectorized operations over the whole columns.
+
+    Args:
+        source (pd.Series): The source values.
+        target (pd.Series): The target values, in the same order as the source values.
+        rule (ColumnRule, optional): How the values are compared. Defaults to None (exact comparison).
+        null_equals_null (bool, optional): Whether two missing values are equal. Defaults to True.
+
+    Returns:
+        np.ndarray: Boolean values indicating differences.
+    """
+
+    rule = rule or ColumnRule()
+    target = target.set_axis(source.index)
+
+    # Categoricals can only be compared with the same categories, so compare their values instead
+    if isinstance(source.dtype, pd.CategoricalDtype) and source.dtype != target.dtype:
+        source = source.astype(source.dtype.categories.dtype)
+    if isinstance(target.dtype, pd.CategoricalDtype) and target.dtype != source.dtype:
+        target = target.astype(target.dtype.categories.dtype)
+
+    # Normalize both sides before comparing them. Values that are not dates are compared as they are.
+    unparsed = None
+    if rule.date_format is not None:
+        raw_source, raw_target = source, target
+        source, target = (_normalize_dates(values, rule.date_format) for values in (source, target))
+        unparsed = ((source.isna() & raw_source.notna()) | (target.isna() & raw_target.notna())).to_numpy()
+    if rule.ignore_case or rule.ignore_whitespace:
+        source, target = (_normalize_strings(values, rule) for values in (source, target))
+
+    if (rule.abs_tol or rule.rel_tol) and is_numeric_dtype(source) and is_numeric_dtype(target):
+        source_values = source.to_numpy(dtype=float, na_value=np.nan)
+        target_values = target.to_numpy(dtype=float, na_value=np.nan)
+        tolerance = rule.abs_tol + rule.rel_tol * np.maximum(np.abs(source_values), np.abs(target_values))
+        different = ~(np.abs(source_values - target_values) <= tolerance)
+    else:
+        different = (source != target).to_numpy(dtype=bool, na_value=True)
+
+    # A missing value differs from any value, and from another missing value unless nulls are equal
+    source_null, target_null = source.isna().to_numpy(), target.isna().to_numpy()
+    either_null = source_null | target_null
+    different[either_null] = (source_null != target_null)[either_null] if null_equals_null else True
+
+    if unparsed is not None and unparsed.any():
+        different[unparsed] = compare_columns(raw_source[unparsed], raw_target[unparsed],
+                                              replace(rule, date_format=None), null_equals_null)
+    return different
+
+
+def compare_frames(df1: pd.DataFrame, df2: pd.DataFrame, rules: dict = None, null_equals_null: bool = True) -> pd.DataFrame:
+    """
+    Compare two aligned DataFrames cell by cell, column by column.
+
+    Args:
+        df1 (pd.DataFrame): The first DataFrame.
+        df2 (pd.DataFrame): The second DataFrame, with the same columns and row order as the first one.
+        rules (dict, optional): The ColumnRule of each column, with '*' for the other columns. Defaults to None.
+        null_equals_null (bool, optional): Whether two missing values are equal. Defaults to True.
+
+    Returns:
+        pd.DataFrame: DataFrame of boolean values indicating differences, indexed like the first DataFrame.
+    """
+
+    rules = rules or {}
+    return pd.DataFrame({col: compare_columns(df1[col], df2[col], rules.get(col, rules.get('*')), null_equals_null)
+                         for col in df1.columns}, index=df1.index, columns=df1.columns)
+
+
+def compare_positional(df1: pd.DataFrame, df2: pd.DataFrame, use_row_hash: bool = True, rules: dict = None,
+                       null_equals_null: bool = True) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Compare two DataFrames cell by cell, matching rows by position.
+
+    With the row hash pre-pass, only rows whose hashes differ are compared cell by cell, and the
+    returned differences only cover those rows.
+
+    Args:
+        df1 (pd.DataFrame): The first DataFrame, aligned to the second one.
+        df2 (pd.DataFrame): The second DataFrame.
+        use_row_hash (bool, optional): Whether to skip rows with identical hashes, unless nulls are not equal. Defaults to True.
+        rules (dict, optional): The ColumnRule of each column, with '*' for the other columns. Defaults to None.
+        null_equals_null (bool, optional): Whether two missing values are equal. Defaults to True.
+
+    Returns:
+        tuple[pd.DataFrame, pd.Series]: The boolean differences and the compared rows with any difference.
+    """
+
+    # Identical rows only compare equal if missing values equal each other
+    if use_row_hash and null_equals_null:
+        candidates = row_hashes(df1) != row_hashes(df2)
+        df1, df2 = df1[candidates], df2[candidates]
+
+    differences = compare_frames(df1, df2, rules, null_equals_null)
+    return differences, differences.any(axis=1)
+
+
+def compare_on_keys(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: list[str], use_row_hash: bool = True,
+                    rules: dict = None, null_equals_null: bool = True) -> KeyComparison:
+    """
+    Hash join two DataFrames on their key columns and compare the matched rows.
+
+    With the row hash pre-pass, only the key columns and a hash of the value columns are joined,
+    and only matched rows whose hashes differ are compared cell by cell.
+
+    Args:
+        df1 (pd.DataFrame): The first DataFrame.
+        df2 (pd.DataFrame): The second DataFrame, with the same columns as the first one.
+        key_columns (list[str]): The columns to join on.
+        use_row_hash (bool, optional): Whether to skip matched rows with identical hashes, unless nulls are not equal. Defaults to True.
+        rules (dict, optional): The ColumnRule of each column, with '*' for the other columns. Defaults to None.
+        null_equals_null (bool, optional): Whether two missing values are equal. Defaults to True.
+
+    Returns:
+        KeyComparison: The source-only, target-only and matched rows with their differences.
+    """
+
+    value_columns = [col for col in df1.columns if col not in key_columns]
+    df2 = df2[df1.columns]
+
+    # Identical rows only compare equal if missing values equal each other
+    use_row_hash = use_row_hash and null_equals_null
+
+    # Keep unmatched rows from either side. The row positions let rows be taken
+    # from the inputs with their original dtypes.
+    if use_row_hash:
+        left = df1[key_columns].assign(_source_row=np.arange(len(df1)), _hash=row_hashes(df1[value_columns]))
+        right = df2[key_columns].assign(_target_row=np.arange(len(df2)), _hash=row_hashes(df2[value_columns]))
+    else:
+        left = df1.assign(_source_row=np.arange(len(df1)))
+        right = df2.assign(_target_row=np.arange(len(df2)))
+    merged = left.merge(right, on=key_columns, how='outer', suffixes=('_source', '_target'), indicator=True, sort=False)
+
+    source_only = df1.iloc[merged.loc[merged['_merge'] == 'left_only', '_source_row'].astype(np.int64)]
+    target_only = df2.iloc[merged.loc[merged['_merge'] == 'right_only', '_target_row'].astype(np.int64)]
+    matched = merged.loc[merged['_merge'] == 'both']
+
+    if use_row_hash:
+        # Fetch the values of the matched rows whose hashes differ
+        matched = matched.loc[matched['_hash_source'] != matched['_hash_target']]
+        compared = matched[key_columns].reset_index(drop=True)
+        for side, df in (('source', df1), ('target', df2)):
+            values = df[value_columns].iloc[matched[f'_{side}_row'].astype(np.int64)].reset_index(drop=True)
+            compared = compared.join(values.add_suffix(f'_{side}'))
+    else:
+        compared = matched
+
+    # Compute the differences between the compared rows
+    differences = compare_frames(compared[[f'{col}_source' for col in value_columns]].set_axis(value_columns, axis=1),
+                                 compared[[f'{col}_target' for col in value_columns]].set_axis(value_columns, axis=1),
+                                 rules, null_equals_null)
+
+    return KeyComparison(key_columns=list(key_columns), value_columns=value_columns, source_only=source_only,
+                         target_only=target_only, matched_count=int((merged['_merge'] == 'both').sum()),
+                         compared=compared, differences=differences, rows_with_differences=differences.any(axis=1))
+
+
+def keys_before(df: pd.DataFrame, key_columns: list[str], bound: tuple) -> pd.Series:
+    """
+    Flag the rows whose key sorts strictly before the given bound, comparing multi-column keys lexicographically.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to check.
+        key_columns (list[str]): The key columns, in sort order.
+        bound (tuple): The key to compare against, one value (or one aligned Series of values) per key column.
+
+    Returns:
+        pd.Series: Series indicating rows whose key is before the bound.
+    """
+
+    before = pd.Series(False, index=df.index)
+    equal = pd.Series(True, index=df.index)
+    for col, value in zip(key_columns, bound):
+        before |= equal & (df[col] < value)
+        equal &= df[col] == value
+    return before
+
+
+def _normalize_dates(values: pd.Series, date_format: str) -> pd.Series:
+    """
+    Parses string dates to datetime64, leaving values that are already dates as they are.
+
+    Args:
+        values (pd.Series): The values to parse.
+        date_format (str): The strftime format of the dates, or '' to infer the format of each value.
+
+    Returns:
+        pd.Series: The parsed dates, with NaT for values that are not dates.
+    """
+
+    if is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format=date_format or 'mixed', errors='coerce')
+
+
+def _normalize_strings(values: pd.Series, rule: ColumnRule) -> pd.Series:
+    """
+    Folds the case and collapses the whitespace of strings, leaving other values as they are.
+
+    Args:
+        values (pd.Series): The values to normalize.
+        rule (ColumnRule): Whether to fold the case and collapse the whitespace.
+
+    Returns:
+        pd.Series: The normalized values.
+    """
+
+    if not (is_object_dtype(values) or is_string_dtype(values)):
+        return values
+
+    normalized = values
+    if rule.ignore_whitespace:
+        normalized = normalized.str.replace(r'\s+', ' ', regex=True).str.strip()
+    if rule.ignore_case:
+        normalized = normalized.str.casefold()
+
+    # Values that are not strings come back missing, so keep them as they were
+    return normalized.where(normalized.notna(), values)
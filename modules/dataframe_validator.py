@@ -1,8 +1,18 @@
 import pandas as pd
 import numpy as np
-import sys
+import os
+from contextlib import nullcontext
 from modules.logging_config import Logger
-from modules.get_config import get_config
+from modules.settings import Settings, get_settings
+from modules.comparison import compare_positional, compare_on_keys
+from modules.parallel import run_partitioned, merge_differences
+from modules.profiler import PROFILE_STATISTICS, profile_pair, profile_mismatches
+from modules.report_writer import DiffReportWriter
+from modules.instrumentation import RunReport
+from modules.result import ReconciliationResult
+from modules.incremental import IncrementalState
+from modules.schema import infer_schema, apply_schema
+from modules.sampling import SAMPLED_QUANTILES, HyperLogLog, sample_mask, proportion_bounds, quantile_bounds, z_score
 
 
 logger = Logger()
@@ -15,18 +25,44 @@ class DataFrameValidator:
     Attr:
         df1 (pd.DataFrame): The first DataFrame.
         df2 (pd.DataFrame): The second DataFrame.
+        key_columns (list[str]): The columns used to join rows between the DataFrames. Rows are compared by position if empty.
+        settings (Settings): The settings of the run.
+        workers (int): The number of worker processes the column checks are split across.
+        source_profile (pd.DataFrame): The statistics of the profiled columns in the first DataFrame.
+        target_profile (pd.DataFrame): The statistics of the profiled columns in the second DataFrame.
+        diff_counts (dict): The number of changed, source-only and target-only rows found by the data validation.
+        run_report (RunReport): The timing and memory metrics of each validation stage of the last run.
+        result (ReconciliationResult): The status of each check of the last run.
+        incremental_state (IncrementalState): The state of the previous run, used to only compare the keys that changed since.
+        schema (dict): The dtypes both DataFrames were converted to by the schema inference, or None before it runs.
+        schema_savings (pd.Series): The bytes saved by converting each column of both DataFrames.
 
     Methods:
-        __init__(df1: pd.DataFrame, df2: pd.DataFrame): Initializes the DataFrameValidator with two DataFrames.
-        validate(): Runs all validation checks on the DataFrames.
+        __init__(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: list[str] = None, source_profile: pd.DataFrame = None, settings: Settings = None, incremental_state: IncrementalState = None): Initializes the DataFrameValidator with two DataFrames.
+        validate(workers: int = None, output_path: str = 'assets/outputs/diff.html', fail_fast: bool = None, snapshot: bool = False): Runs all validation checks on the DataFrames.
+        validate_sample(rate: float = None, confidence: float = None, fail_fast: bool = None): Runs approximate checks on a sample of the DataFrames.
+        _run_stages(stages: list[tuple], fail_fast: bool): Runs validation stages, recording them in the run report.
+        schema_inference(): Converts both DataFrames to one inferred schema and reports the memory saved.
         row_count_validation(): Validates that both DataFrames have the same number of rows.
         column_validation(): Validates that both DataFrames have the same columns and column counts.
         data_validation(output_path: str = 'assets/outputs/diff.html'): Validates that the data in both DataFrames is the same and highlights differences.
+        snapshot_validation(): Records that the second DataFrame holds exactly the rows of the first one.
+        _key_based_data_validation(output_path: str): Joins both DataFrames on the key columns and reports source-only, target-only and changed rows.
+        _save_unmatched(output_path: str, source_only: pd.DataFrame, target_only: pd.DataFrame, index: bool): Saves the rows that only exist on one side.
+        _save_differences(output_path: str, keys: pd.DataFrame, source: pd.DataFrame, target: pd.DataFrame, differences: pd.DataFrame, highlight: callable): Saves the differing cells and an HTML report.
         _create_diff_dataframe(differences: pd.DataFrame, rows_with_differences: pd.Series): Creates a DataFrame to show the differences side by side.
-        _highlight_diffs(diff: pd.DataFrame, differences: pd.DataFrame, rows_with_differences: pd.Series): Applies highlighting to the differences in the DataFrame.
+        _highlight_diffs(diff: pd.DataFrame, differences: pd.DataFrame, rows_with_differences: pd.Series, columns: list[str] = None): Applies highlighting to the differences in the DataFrame.
+        sampled_data_validation(rate: float, confidence: float): Compares the sampled rows and estimates the number of differences.
+        _sampled_column_checks(datatype: str, get_columns: callable, confidence: float): Runs the sampled checks on the columns of a datatype.
+        quantile_check(datatype: str, columns: list[str], confidence: float): Compares the sampled quantiles of columns.
+        distinct_check(datatype: str, columns: list[str], confidence: float): Compares the approximate distinct counts of columns.
+        _numeric_columns(): Returns the numeric-type columns to check.
+        _date_columns(): Returns the date-type columns to check.
     """
 
-    def __init__(self, df1: pd.DataFrame, df2: pd.DataFrame) -> None:
+    def __init__(self, df1: pd.DataFrame, df2: pd.DataFrame, key_columns: list[str] = None,
+                 source_profile: pd.DataFrame = None, settings: Settings = None,
+                 incremental_state: IncrementalState = None) -> None:
         """
 
         Initializes the DataFrameValidator class with two DataFrames.
@@ -34,19 +70,164 @@ class DataFrameValidator:
         Args:
             df1 (pd.DataFrame): The first DataFrame.
             df2 (pd.DataFrame): The second DataFrame.
+            key_columns (list[str], optional): The columns used to join rows between the DataFrames. Defaults to None (compare by position).
+            source_profile (pd.DataFrame, optional): Previously computed statistics of the first DataFrame. Defaults to None.
+            settings (Settings, optional): The settings of the run. Defaults to the settings of 'config.ini'.
+            incremental_state (IncrementalState, optional): The state of the previous run, updated with this run.
+                Only used when comparing on key columns. Defaults to None (compare every row).
         """
 
         self.df1 = df1
         self.df2 = df2
+        self.key_columns = list(key_columns) if key_columns else []
+        self.settings = settings or get_settings()
+        self.workers = 1
+        self.source_profile = pd.DataFrame(columns=PROFILE_STATISTICS, dtype=object) if source_profile is None else source_profile
+        self.target_profile = pd.DataFrame(columns=PROFILE_STATISTICS, dtype=object)
+        self.diff_counts = {}
+        self.run_report = None
+        self.result = ReconciliationResult()
+        self.incremental_state = incremental_state
+        self._sample_masks = None
+        self.schema = None
+        self.schema_savings = None
+
+    def validate(self, workers: int = None, output_path: str = 'assets/outputs/diff.html',
+                 fail_fast: bool = None, snapshot: bool = False) -> ReconciliationResult:
+        """
+        Runs all validation checks on the DataFrames.
+        The time and memory of each check are recorded in the run report, which is saved even if a check raises.
+
+        Args:
+            workers (int, optional): The number of worker processes the column checks are split across.
+                Defaults to the 'WORKERS' setting.
+            output_path (str, optional): The path to save the HTML file with differences. Defaults to 'assets/outputs/diff.html'.
+            fail_fast (bool, optional): Whether to skip the remaining checks after the first failed check.
+                Defaults to the 'FAIL_FAST' setting.
+            snapshot (bool, optional): Whether the second DataFrame is known to hold exactly the rows of the first one,
+                e.g. a cached snapshot of the source, so the rows are not compared again. Defaults to False.
+
+        Returns:
+            ReconciliationResult: The status, metrics and saved differences of each check.
+        """
+
+        self.workers = self.settings.performance.workers if workers is None else workers
+        fail_fast = self.settings.reconciliation.fail_fast if fail_fast is None else fail_fast
+        rows = len(self.df1) + len(self.df2)
+        columns = self.df1.shape[1]
+
+        stages = [
+            ('schema_inference', self.schema_inference, {'rows': rows, 'columns': columns}),
+            ('row_count_validation', self.row_count_validation, {'rows': rows}),
+            ('column_validation', self.column_validation, {'columns': columns}),
+            ('data_validation', self.snapshot_validation if snapshot else lambda: self.data_validation(output_path),
+             {'rows': rows, 'columns': columns}),
+            ('numeric_column_extra_validations', self.numeric_column_extra_validations, {'rows': rows}),
+            ('date_column_extra_validations', self.date_column_extra_validations, {'rows': rows}),
+        ]
+        self._run_stages(stages, fail_fast)
+
+        # Keep the statistics for the next incremental run
+        if self.incremental_state is not None:
+            self.incremental_state.update_profiles(self.source_profile, self.target_profile)
+        return self.result
+
+    def validate_sample(self, rate: float = None, confidence: float = None, fail_fast: bool = None) -> ReconciliationResult:
+        """
+        Runs approximate checks on a deterministic sample of the keys, as a fast pre-check before the exact comparison.
+
+        The same keys are sampled on both sides, so every difference found in the sample is a real difference,
+        and the number of differences in the whole DataFrames is estimated with confidence bounds. The exact
+        min/max and median checks are replaced by sampled quantiles with confidence intervals, and the distinct
+        counts are estimated with HyperLogLog sketches. A check fails only if the difference is significant at
+        the confidence level, so a passing pre-check can skip the exact comparison and a failing one escalates to it.
+
+        Args:
+            rate (float, optional): The fraction of keys to sample. Defaults to the 'RATE' setting.
+            confidence (float, optional): The confidence level of the bounds. Defaults to the 'CONFIDENCE' setting.
+            fail_fast (bool, optional): Whether to skip the remaining checks after the first failed check.
+                Defaults to the 'FAIL_FAST' setting.
+
+        Returns:
+            ReconciliationResult: The status, estimates and confidence bounds of each check.
+        """
+
+        rate = self.settings.sampling.rate if rate is None else rate
+        confidence = self.settings.sampling.confidence if confidence is None else confidence
+        fail_fast = self.settings.reconciliation.fail_fast if fail_fast is None else fail_fast
+        rows = len(self.df1) + len(self.df2)
+        self._sample_masks = None
+
+        stages = [
+            ('schema_inference', self.schema_inference, {'rows': rows, 'columns': self.df1.shape[1]}),
+            ('row_count_validation', self.row_count_validation, {'rows': rows}),
+            ('column_validation', self.column_validation, {'columns': self.df1.shape[1]}),
+            ('sampled_data_validation', lambda: self.sampled_data_validation(rate, confidence), {'rows': rows}),
+            ('sampled_numeric_validations', lambda: self._sampled_column_checks('Numeric', self._numeric_columns, confidence), {'rows': rows}),
+            ('sampled_date_validations', lambda: self._sampled_column_checks('Date', self._date_columns, confidence), {'rows': rows}),
+        ]
+        self._run_stages(stages, fail_fast)
+        return self.result
+
+    def _run_stages(self, stages: list[tuple], fail_fast: bool) -> None:
+        """
+        Runs validation stages in order, recording their time and memory in the run report, which is saved even if a stage raises.
+
+        Args:
+            stages (list[tuple]): The name, check and sizes of each stage.
+            fail_fast (bool): Whether to skip the remaining stages after the first failed check.
+        """
+
+        self.result = ReconciliationResult()
+        self.diff_counts = {}
+        self.run_report = RunReport(profile=self.settings.instrumentation.cprofile,
+                                    trace_memory=self.settings.instrumentation.tracemalloc)
+        try:
+            for name, check, sizes in stages:
+                with self.run_report.stage(name, **sizes) as stage:
+                    check()
+                    if name.endswith('data_validation'):
+                        stage['diff_counts'] = self.diff_counts
+
+                if fail_fast and not self.result.passed:
+                    logger.error(f"Stopping after {name}, since a check failed.")
+                    self.result.stopped_early = True
+                    break
+        finally:
+            self.run_report.save(self.settings.instrumentation)
+            self.run_report.close()
+
+        self.result.diff_counts = self.diff_counts
+        self.result.run_report = self.run_report.to_dict()
+
+    def schema_inference(self) -> None:
+        """
+        Infers one schema for both DataFrames when the [SCHEMA] section is enabled, and converts both in place,
+        so that the checks compare dates, categories and downcast numbers instead of strings and 64-bit values.
+        The schema is only inferred once, so a sampled pre-check and the exact validation share it.
+        """
 
-    def validate(self) -> None:
-        """Runs all validation checks on the DataFrames."""
+        if not self.settings.schema.enabled:
+            return
 
-        self.row_count_validation()
-        self.column_validation()
-        self.data_validation()
-        self.numeric_column_extra_validations()
-        self.date_column_extra_validations()
+        if self.schema is None:
+            schema_settings = self.settings.schema
+            date_format = self.settings.inputs.date_format or None
+            self.schema = infer_schema(self.df1, self.df2, self.key_columns, sample_size=schema_settings.sample_size,
+                                       category_max_ratio=schema_settings.category_max_ratio,
+                                       downcast=schema_settings.downcast, date_format=date_format)
+            self.schema_savings = apply_schema(self.df1, self.schema, date_format).add(
+                apply_schema(self.df2, self.schema, date_format), fill_value=0)
+
+            for col, dtype in self.schema.items():
+                dtype = 'category' if isinstance(dtype, pd.CategoricalDtype) else dtype
+                logger.info(f"Column {col} converted to {dtype}, saving {self.schema_savings[col] / 1024 ** 2:.2f} MB.")
+
+        dtypes = {col: 'category' if isinstance(dtype, pd.CategoricalDtype) else str(dtype) for col, dtype in self.schema.items()}
+        saved_bytes = int(self.schema_savings.sum())
+        logger.info(f"Converted {len(dtypes)} columns to the inferred schema, saving {saved_bytes / 1024 ** 2:.2f} MB.")
+        self.result.add('schema', 'passed', f"Converted {len(dtypes)} columns to the inferred schema.", dtypes=dtypes,
+                        saved_bytes=saved_bytes, saved_bytes_by_column=self.schema_savings.astype(int).to_dict())
 
     def row_count_validation(self):
         """Validates that both DataFrames have the same number of rows."""
@@ -58,11 +239,17 @@ class DataFrameValidator:
         logger.info(f"Source record count: {df1_record_count}")
         logger.info(f"Target record count: {df2_record_count}")
 
+        counts = {'source_rows': df1_record_count, 'target_rows': df2_record_count}
         if df1_record_count == df2_record_count:
             logger.info("Row counts are the same.")
+            self.result.add('row_count', 'passed', "Row counts are the same.", **counts)
+        elif self.key_columns:
+            # Unmatched rows are reported by the key-based data validation
+            logger.warning("Row counts are different.")
+            self.result.add('row_count', 'warning', "Row counts are different.", **counts)
         else:
             logger.error("Row counts are different.")
-            sys.exit(1)
+            self.result.add('row_count', 'failed', "Row counts are different.", **counts)
 
     def column_validation(self) -> None:
         """Validates that both DataFrames have the same columns and column counts."""
@@ -84,58 +271,228 @@ class DataFrameValidator:
             logger.error("Column counts are different.")
 
         # Obtain any missing columns
-        missing_df1_columns = set(df1_columns) - set(df2_columns)
-        missing_df2_columns = set(df2_columns) - set(df1_columns)
+        missing_df1_columns = set(df2_columns) - set(df1_columns)
+        missing_df2_columns = set(df1_columns) - set(df2_columns)
 
         if missing_df1_columns:
-            logger.error(f"columns missing in Dataframe 1: {missing_df1_columns}.")
-            sys.exit(1)
+            logger.error(f"Columns missing in Dataframe 1: {missing_df1_columns}.")
         if missing_df2_columns:
             logger.error(f"Columns missing in Dataframe 2: {missing_df2_columns}.")
-            sys.exit(1)
 
+        metrics = {'source_columns': df1_column_count, 'target_columns': df2_column_count,
+                   'missing_source_columns': sorted(map(str, missing_df1_columns)),
+                   'missing_target_columns': sorted(map(str, missing_df2_columns))}
         if not missing_df1_columns and not missing_df2_columns:
             logger.info("All column names match and there are no missing columns.")
+            self.result.add('columns', 'passed', "All column names match.", **metrics)
+        else:
+            self.result.add('columns', 'failed', "Columns are missing.", **metrics)
 
     def data_validation(self, output_path: str = 'assets/outputs/diff.html') -> None:
         """
         Validate that the data in both DataFrames is the same and highlight differences.
-        Save the differences to an HTML file.
+        Save the differing cells to a long-format file, and the differences to an HTML file.
 
         Args:
             output_path (str): The path to save the HTML file with differences.
         """
 
-        # Check if the columns in both DataFrames are the same, exit if not
+        # Check if the columns in both DataFrames are the same, skip the comparison if not
         if set(self.df1.columns) != set(self.df2.columns):
             logger.warning("DataFrames do not have the same columns.")
+            self.result.add('data', 'error', "DataFrames do not have the same columns.")
             return
 
-        # Align df1 with df2 columns
-        self.df1 = self.df1.reindex_like(self.df2)
-
-        # Compute the differences between the DataFrames
-        differences = self.df1 != self.df2
+        # Join the rows on the key columns instead of comparing by position
+        if self.key_columns:
+            self._key_based_data_validation(output_path)
+            return
 
-        # Identify rows with any differences
-        rows_with_differences = differences.any(axis=1)
+        # Align df1 with df2 columns, and compare the rows both DataFrames have
+        self.df1 = self.df1[self.df2.columns]
+        overlap = min(len(self.df1), len(self.df2))
+        source_only, target_only = self.df1.iloc[overlap:], self.df2.iloc[overlap:]
+
+        # Compute the differences between the DataFrames and identify rows with any differences
+        use_row_hash = self.settings.reconciliation.row_hash_prepass
+        results = run_partitioned(compare_positional, self.df1.iloc[:overlap], self.df2.iloc[:overlap], self.df1.columns,
+                                  self.workers, use_row_hash=use_row_hash, rules=dict(self.settings.comparison.rules),
+                                  null_equals_null=self.settings.comparison.null_equals_null)
+        differences, rows_with_differences = merge_differences(results, self.df1.columns)
+        self.diff_counts = {'changed': int(rows_with_differences.sum()),
+                            'source_only': len(source_only), 'target_only': len(target_only)}
+
+        # Log if there are any differences, return if none
+        if not any(self.diff_counts.values()):
+            logger.info("There are no differences between the datasets.")
+            self.result.add('data', 'passed', "There are no differences between the datasets.", **self.diff_counts)
+            return
+        else:
+            logger.warning("There are differences between the datasets.")
+            self.result.add('data', 'failed', "There are differences between the datasets.", **self.diff_counts)
 
-        # Log if there are any differences, exit the script if none
+        # Rows past the end of the shorter DataFrame only exist on one side
+        self._save_unmatched(output_path, source_only, target_only, index=True)
         if not rows_with_differences.any():
+            return
+
+        # Identify the rows by their position
+        rows = rows_with_differences.index[rows_with_differences]
+        keys = pd.DataFrame({'row': rows}, index=rows)
+
+        # Show small differences side-by-side with highlighting
+        def highlight():
+            diff = self._create_diff_dataframe(differences, rows_with_differences)
+            return self._highlight_diffs(diff, differences, rows_with_differences)
+
+        self._save_differences(output_path, keys, self.df1.loc[rows], self.df2.loc[rows], differences.loc[rows], highlight)
+
+    def snapshot_validation(self) -> None:
+        """Records that the second DataFrame holds exactly the rows of the first one, as found from the cached row hashes."""
+
+        self.diff_counts = {'changed': 0, 'source_only': 0, 'target_only': 0}
+        logger.info("The target matches the cached snapshot of the source; there are no differences between the datasets.")
+        self.result.add('data', 'passed', "The target matches the cached snapshot of the source.", **self.diff_counts)
+
+    def _key_based_data_validation(self, output_path: str) -> None:
+        """
+        Join both DataFrames on the key columns and report source-only, target-only and changed rows.
+        Changed rows are saved like in the positional comparison, and unmatched rows are saved to CSV files next to them.
+
+        Args:
+            output_path (str): The path to save the HTML file with differences.
+        """
+
+        # Check that every key column exists, return if not
+        missing_key_columns = [col for col in self.key_columns if col not in self.df1.columns]
+        if missing_key_columns:
+            logger.error(f"Key columns missing in the DataFrames: {missing_key_columns}.")
+            self.result.add('data', 'error', f"Key columns missing in the DataFrames: {missing_key_columns}.")
+            return
+
+        # Duplicate keys match many-to-many, so flag them up front
+        duplicate_key_counts = {}
+        for name, df in (('Source', self.df1), ('Target', self.df2)):
+            duplicate_key_count = int(df.duplicated(subset=self.key_columns).sum())
+            duplicate_key_counts[f'{name.lower()}_duplicate_keys'] = duplicate_key_count
+            if duplicate_key_count:
+                logger.warning(f"{name} has {duplicate_key_count} rows with duplicate keys on {self.key_columns}.")
+
+        # Only compare the keys that changed on either side or differed in the previous run
+        df1, df2 = self.df1, self.df2
+        plan = self.incremental_state.plan(df1, df2, self.key_columns) if self.incremental_state is not None else None
+        incremental_metrics = {}
+        if plan is not None:
+            df1, df2 = df1[plan['source_rows']], df2[plan['target_rows']]
+            logger.info(f"Incremental reconciliation: comparing {len(df1)} source and {len(df2)} target rows, "
+                        f"{plan['unchanged']} matched rows are unchanged since the previous run.")
+            incremental_metrics = {'compared_source_rows': len(df1), 'compared_target_rows': len(df2),
+                                   'unchanged_rows': plan['unchanged']}
+
+            # The statistics of a side without changes are those of the previous run
+            for side, changed in (('source', plan['source_changed']), ('target', plan['target_changed'])):
+                previous_profile = getattr(self.incremental_state, f'{side}_profile')
+                if not changed and previous_profile is not None and getattr(self, f'{side}_profile').empty:
+                    setattr(self, f'{side}_profile', previous_profile)
+
+        # Hash join both DataFrames on the key columns, keeping unmatched rows from either side
+        use_row_hash = self.settings.reconciliation.row_hash_prepass
+        comparison = compare_on_keys(df1, df2, self.key_columns, use_row_hash=use_row_hash,
+                                     rules=dict(self.settings.comparison.rules),
+                                     null_equals_null=self.settings.comparison.null_equals_null)
+        if self.incremental_state is not None:
+            self.incremental_state.update(comparison)
+        source_only = comparison.source_only
+        target_only = comparison.target_only
+        rows_with_differences = comparison.rows_with_differences
+        matched_count = comparison.matched_count + (plan['unchanged'] if plan is not None else 0)
+        self.diff_counts = {'changed': int(rows_with_differences.sum()),
+                            'source_only': len(source_only), 'target_only': len(target_only)}
+
+        logger.info(f"Matched rows: {matched_count}.")
+        logger.info(f"Source-only rows: {len(source_only)}.")
+        logger.info(f"Target-only rows: {len(target_only)}.")
+        logger.info(f"Changed rows: {int(rows_with_differences.sum())}.")
+
+        metrics = {**self.diff_counts, 'matched': matched_count, **duplicate_key_counts, **incremental_metrics}
+        if source_only.empty and target_only.empty and not rows_with_differences.any():
             logger.info("There are no differences between the datasets.")
+            self.result.add('data', 'passed', "There are no differences between the datasets.", **metrics)
             return
         else:
             logger.warning("There are differences between the datasets.")
+            self.result.add('data', 'failed', "There are differences between the datasets.", **metrics)
+
+        self._save_unmatched(output_path, source_only, target_only, index=False)
+        if not rows_with_differences.any():
+            return
+
+        # Split the changed rows into their keys and side-by-side values
+        changed = comparison.compared.loc[rows_with_differences]
+        differences = comparison.differences.loc[rows_with_differences]
+        source = changed[[f'{col}_source' for col in comparison.value_columns]].set_axis(comparison.value_columns, axis=1)
+        target = changed[[f'{col}_target' for col in comparison.value_columns]].set_axis(comparison.value_columns, axis=1)
+
+        # Show small differences side-by-side with highlighting
+        def highlight():
+            return self._highlight_diffs(comparison.changed, differences, rows_with_differences.loc[rows_with_differences],
+                                         columns=comparison.value_columns)
+
+        self._save_differences(output_path, changed[self.key_columns], source, target, differences, highlight)
+
+    def _save_unmatched(self, output_path: str, source_only: pd.DataFrame, target_only: pd.DataFrame, index: bool) -> None:
+        """
+        Save the rows that only exist on one side to CSV files next to the HTML file.
+
+        Args:
+            output_path (str): The path to save the HTML file with differences.
+            source_only (pd.DataFrame): The rows that only exist in the first DataFrame.
+            target_only (pd.DataFrame): The rows that only exist in the second DataFrame.
+            index (bool): Whether to save the row positions.
+        """
+
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        output_root = os.path.splitext(output_path)[0]
+
+        # Save the unmatched rows of each side
+        for side, unmatched in (('source', source_only), ('target', target_only)):
+            if not unmatched.empty:
+                unmatched_path = f'{output_root}_{side}_only.csv'
+                unmatched.to_csv(unmatched_path, index=index)
+                self.result.outputs[f'{side}_only'] = unmatched_path
+                logger.info(f"{len(unmatched)} {side}-only rows saved to {unmatched_path}")
+
+    def _save_differences(self, output_path: str, keys: pd.DataFrame, source: pd.DataFrame, target: pd.DataFrame,
+                          differences: pd.DataFrame, highlight) -> None:
+        """
+        Save the differing cells to a long-format file, and the differences to an HTML file.
+        The HTML file highlights the differences side-by-side when few rows differ, and summarizes them otherwise.
+        The write is recorded as the 'report_write' stage of the run report, inside the data validation stage.
+
+        Args:
+            output_path (str): The path to save the HTML file with differences.
+            keys (pd.DataFrame): The key values identifying each row with differences.
+            source (pd.DataFrame): The source values of the rows with differences.
+            target (pd.DataFrame): The target values of the rows with differences.
+            differences (pd.DataFrame): DataFrame of boolean values indicating differences in these rows.
+            highlight (callable): Returns the Styler object with highlighted differences.
+        """
 
-        # Create a DataFrame to show the differences side-by-side
-        diff = self._create_diff_dataframe(differences, rows_with_differences)
+        stage = self.run_report.stage('report_write', rows=len(differences)) if self.run_report is not None else nullcontext()
+        with stage:
+            writer = DiffReportWriter(output_path, file_format=self.settings.report.format, top_n=self.settings.report.top_n)
+            writer.write(keys, source, target, differences)
 
-        # Apply highlighting to the differences
-        styled_diff = self._highlight_diffs(diff, differences, rows_with_differences)
+            highlight_rows = len(differences) <= self.settings.report.html_max_rows
+            writer.close(write_summary=not highlight_rows)
+            self.result.outputs.update({'cells': writer.cells_path, 'html': output_path})
+            logger.info(f"{sum(writer.cell_counts.values())} differing cells saved to {writer.cells_path}")
 
-        # Save the styled DataFrame with differences to an HTML file
-        styled_diff.to_html(output_path)
-        logger.info(f"Differences highlighted and saved to {output_path}")
+            if highlight_rows:
+                highlight().to_html(output_path)
+                logger.info(f"Differences highlighted and saved to {output_path}")
+            else:
+                logger.info(f"A summary of the {len(differences)} rows with differences was saved to {output_path}")
 
     def _create_diff_dataframe(self, differences: pd.DataFrame, rows_with_differences: pd.Series) -> pd.DataFrame:
         """
@@ -143,22 +500,24 @@ class DataFrameValidator:
 
         Args:
             differences (pd.DataFrame): DataFrame of boolean values indicating differences.
-            rows_with_differences (pd.Series): Series indicating rows with differences.
+            rows_with_differences (pd.Series): Series indicating compared rows with differences.
 
         Returns:
             pd.DataFrame: DataFrame with differences side-by-side.
         """
 
         # Initialize an empty DataFrame with the index of rows with differences
-        diff = pd.DataFrame(index=self.df1.index[rows_with_differences])
+        rows = rows_with_differences.index[rows_with_differences]
+        diff = pd.DataFrame(index=rows)
 
         # Populate the DataFrame with the source and target values for each column
         for col in self.df1.columns:
-            diff[f'{col}_source'] = self.df1.loc[rows_with_differences, col]
-            diff[f'{col}_target'] = self.df2.loc[rows_with_differences, col]
+            diff[f'{col}_source'] = self.df1.loc[rows, col]
+            diff[f'{col}_target'] = self.df2.loc[rows, col]
         return diff
 
-    def _highlight_diffs(self, diff: pd.DataFrame, differences: pd.DataFrame, rows_with_differences: pd.Series):
+    def _highlight_diffs(self, diff: pd.DataFrame, differences: pd.DataFrame, rows_with_differences: pd.Series,
+                         columns: list[str] = None):
         """
         Apply highlighting to the differences in the DataFrame.
 
@@ -166,11 +525,15 @@ class DataFrameValidator:
             diff (pd.DataFrame): DataFrame with differences.
             differences (pd.DataFrame): DataFrame of boolean values indicating differences.
             rows_with_differences (pd.Series): Series indicating rows with differences.
+            columns (list[str], optional): The compared columns. Defaults to all columns of the first DataFrame.
 
         Returns:
             pd.io.formats.style.Styler: Styler object with highlighted differences.
         """
 
+        if columns is None:
+            columns = self.df1.columns
+
         def highlight_diffs(data: pd.DataFrame) -> pd.DataFrame:
             # Define the highlight color
             color = 'background-color: yellow'
@@ -179,7 +542,7 @@ class DataFrameValidator:
             df_styler = pd.DataFrame('', index=data.index, columns=data.columns)
 
             # Apply the highlight color to the cells with differences
-            for col in self.df1.columns:
+            for col in columns:
                 df_styler.loc[differences[col] & rows_with_differences, f'{col}_source'] = color
                 df_styler.loc[differences[col] & rows_with_differences, f'{col}_target'] = color
             return df_styler
@@ -191,62 +554,73 @@ class DataFrameValidator:
         """
         Retrieves numeric-type columns based on the configuration settings, and triggers validation checks.
 
-        If 'AUTO_NUMERIC_DISCOVER' is set to '1', it automatically discovers numeric-type columns.
-        If 'AUTO_NUMERIC_DISCOVER' is set to '0', it retrieves numeric-type columns from the configuration.
+        If 'AUTO_NUMERIC_DISCOVER' is enabled, it automatically discovers numeric-type columns.
+        Otherwise, it retrieves numeric-type columns from the settings.
         Logs an error if there is an issue with retrieving the numeric-type columns.
         """
 
-        # Initialize 'numeric_columns' as an empty list
-        numeric_columns = []
-
         try:
-            # Retrieve the 'AUTO_NUMERIC_DISCOVER' configuration value
-            auto_numeric_discover = get_config('COLUMN_TYPES', 'AUTO_NUMERIC_DISCOVER')
-
-            if auto_numeric_discover == '1':
-                numeric_columns = self.df1.select_dtypes(include=[np.number]).columns
-            elif auto_numeric_discover == '0':
-                numeric_columns = [item.strip() for item in get_config('COLUMN_TYPES', 'NUMERIC').split(',')]
-            else:
-                raise ValueError(f"Invalid value for 'AUTO_NUMERIC_DISCOVER' in 'config.ini' file: {auto_numeric_discover}")
+            numeric_columns = self._numeric_columns()
 
             # Perform validation checks with the discovered numeric-type columns
             self.min_max_check(datatype='Numeric', columns=numeric_columns)
             self.median_check(datatype='Numeric', columns=numeric_columns)
-            # self.mode_check(datatype='Numeric', columns=numeric_columns)
+            self.mode_check(datatype='Numeric', columns=numeric_columns)
+            self.profile_check(datatype='Numeric', columns=numeric_columns)
         except Exception as e:
             logger.error(f"Error while retrieving the numeric-type columns: {e}")
+            self.result.add('numeric_columns', 'error', f"Error while retrieving the numeric-type columns: {e}")
 
     def date_column_extra_validations(self) -> None:
         """
         Retrieves date-type columns based on the configuration settings, and triggers validation checks.
 
-        If 'AUTO_DATE_DISCOVER' is set to '1', it automatically discovers date-type columns.
-        If 'AUTO_DATE_DISCOVER' is set to '0', it retrieves date-type columns from the configuration.
+        If 'AUTO_DATE_DISCOVER' is enabled, it automatically discovers date-type columns.
+        Otherwise, it retrieves date-type columns from the settings.
         Logs an error if there is an issue with retrieving the date-type columns.
         """
 
-        # Initialize 'date_columns' as an empty list
-        date_columns = []
-
         try:
-            # Retrieve the 'AUTO_DATE_DISCOVER' configuration value
-            auto_date_discover = get_config('COLUMN_TYPES', 'AUTO_DATE_DISCOVER')
-
-            # TODO: Enable the AUTO_DATE_DISCOVER feature
-            if auto_date_discover == '1':
-                date_columns = self.df1.select_dtypes(include=[np.number]).columns
-            elif auto_date_discover == '0':
-                date_columns = [item.strip() for item in get_config('COLUMN_TYPES', 'DATE').split(',')]
-            else:
-                raise ValueError(f"Invalid value for 'AUTO_DATE_DISCOVER' in 'config.ini' file: {auto_date_discover}")
+            date_columns = self._date_columns()
 
             # Perform validation checks with the discovered date-type columns
             self.min_max_check(datatype='Date', columns=date_columns)
             # self.median_check(datatype='Date', columns=date_columns)
-            # self.mode_check(datatype='Date', columns=date_columns)
+            self.mode_check(datatype='Date', columns=date_columns)
         except Exception as e:
             logger.error(f"Error while retrieving the date-type columns: {e}")
+            self.result.add('date_columns', 'error', f"Error while retrieving the date-type columns: {e}")
+
+    def profile(self, columns: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Returns the statistics profiles of the given columns in both DataFrames.
+
+        Each column is profiled once, in a single batched pass split across the workers, and the
+        profiles are kept for later checks. Columns already in a cached source profile are not profiled again.
+
+        Args:
+            columns (list): The list of columns to profile.
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame]: The profiles of the columns in the first and second DataFrames.
+        """
+
+        columns = list(columns)
+        missing_source_columns = [col for col in columns if col not in self.source_profile.index]
+        missing_target_columns = [col for col in columns if col not in self.target_profile.index]
+        missing_columns = [col for col in columns if col in missing_source_columns or col in missing_target_columns]
+        if missing_columns:
+            results = run_partitioned(profile_pair, self.df1, self.df2, missing_columns, self.workers,
+                                      profile_source=bool(missing_source_columns),
+                                      profile_target=bool(missing_target_columns))
+            self.source_profile = pd.concat([self.source_profile] + [profile1 for profile1, _ in results])
+            self.target_profile = pd.concat([self.target_profile] + [profile2 for _, profile2 in results])
+
+            # Keep the first profile of columns that were only missing on the other side
+            self.source_profile = self.source_profile[~self.source_profile.index.duplicated()]
+            self.target_profile = self.target_profile[~self.target_profile.index.duplicated()]
+
+        return self.source_profile.loc[columns], self.target_profile.loc[columns]
 
     def min_max_check(self, datatype: str, columns: list[str]) -> None:
         """
@@ -259,16 +633,15 @@ class DataFrameValidator:
 
         # Check for min and max values for each column
         logger.info(f"Checking the MIN and MAX values for these {datatype} columns: {list(columns)}")
-        for col in columns:
-            # Calculate the min and max values
-            min1 = self.df1[col].min()
-            max1 = self.df1[col].max()
+        profile1, profile2 = self.profile(columns)
+        mismatches = profile_mismatches(profile1, profile2, 'min') | profile_mismatches(profile1, profile2, 'max')
 
-            min2 = self.df2[col].min()
-            max2 = self.df2[col].max()
+        for col in profile1.index:
+            min1, max1 = profile1.at[col, 'min'], profile1.at[col, 'max']
+            min2, max2 = profile2.at[col, 'min'], profile2.at[col, 'max']
 
             # Check if the min and max values match between the two DataFrames
-            if min1 != min2 or max1 != max2:
+            if mismatches[col]:
                 logger.warning(f"Value range mismatch in column {col}: "
                                f"Source: (min: {min1}, max: {max1}), "
                                f"Target: (min: {min2}, max: {max2})")
@@ -277,6 +650,8 @@ class DataFrameValidator:
                             f"Source: (min: {min1}, max: {max1}), "
                             f"Target: (min: {min2}, max: {max2})")
 
+        self.result.add_mismatches(f'{datatype.lower()}_min_max', mismatches)
+
     def median_check(self, datatype: str, columns: list[str]) -> None:
         """
         Checks the median values for specified columns in two DataFrames and logs any discrepancies.
@@ -288,14 +663,15 @@ class DataFrameValidator:
 
         try:
             # Check for median values for each column
-            logger.info(f"Checking the median values for these columns: {columns}")
-            for col in columns:
-                # Calculate the median value
-                med1 = self.df1[col].median()
-                med2 = self.df2[col].median()
+            logger.info(f"Checking the median values for these columns: {list(columns)}")
+            profile1, profile2 = self.profile(columns)
+            mismatches = profile_mismatches(profile1, profile2, 'median')
+
+            for col in profile1.index:
+                med1, med2 = profile1.at[col, 'median'], profile2.at[col, 'median']
 
                 # Check if the median values match between the two DataFrames
-                if med1 != med2:
+                if mismatches[col]:
                     logger.warning(f"Median mismatch in column {col}: "
                                    f"Dataset1 (median: {med1}), "
                                    f"Dataset2 (median: {med2})")
@@ -303,36 +679,240 @@ class DataFrameValidator:
                     logger.info(f"The median values matched between both datasets for the column: {col}: "
                                 f"Dataset1 (median: {med1}), "
                                 f"Dataset2 (median: {med2})")
+
+            self.result.add_mismatches(f'{datatype.lower()}_median', mismatches)
         except Exception as e:
             logger.error(f"Error during median check: {e}")
-            sys.exit(1)
-
-    # def mode_check(self, datatype: str, columns: list[str]) -> None:
-    #     """
-    #     Checks the mode values for specified columns in two DataFrames and logs any discrepancies.
-
-    #     Args:
-    #         datatype (str): The datatype of the columns being checked.
-    #         columns (list): The list of columns to check for the mode value.
-    #     """
-
-    #     try:
-    #         # Check for mode values for each column
-    #         logger.info(f"Checking the mode values for these columns: {columns}")
-    #         for col in columns:
-    #             # Calculate the mode value
-    #             mode1 = self.df1[col].mode()
-    #             mode2 = self.df2[col].mode()
-
-    #             # Check if the mode values match between the two DataFrames
-    #             if mode1 != mode2:
-    #                 logger.warning(f"Mode mismatch in column {col}: "
-    #                                f"Dataset1 (mode: {mode1}), "
-    #                                f"Dataset2 (mode: {mode2})")
-    #             else:
-    #                 logger.info(f"The mode values matched between both datasets for the column: {col}: "
-    #                             f"Dataset1 (mode: {mode1}), "
-    #                             f"Dataset2 (mode: {mode2})")
-    #     except Exception as e:
-    #         logger.error(f"Error during mode check: {e}")
-    #         sys.exit(1)
+            self.result.add(f'{datatype.lower()}_median', 'error', f"Error during median check: {e}")
+
+    def mode_check(self, datatype: str, columns: list[str]) -> None:
+        """
+        Checks the mode values for specified columns in two DataFrames and logs any discrepancies.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            columns (list): The list of columns to check for the mode value.
+        """
+
+        try:
+            # Check for mode values for each column
+            logger.info(f"Checking the mode values for these columns: {list(columns)}")
+            profile1, profile2 = self.profile(columns)
+            mismatches = profile_mismatches(profile1, profile2, 'mode')
+
+            for col in profile1.index:
+                mode1, mode2 = profile1.at[col, 'mode'], profile2.at[col, 'mode']
+
+                # Check if the mode values match between the two DataFrames
+                if mismatches[col]:
+                    logger.warning(f"Mode mismatch in column {col}: "
+                                   f"Dataset1 (mode: {mode1}), "
+                                   f"Dataset2 (mode: {mode2})")
+                else:
+                    logger.info(f"The mode values matched between both datasets for the column: {col}: "
+                                f"Dataset1 (mode: {mode1}), "
+                                f"Dataset2 (mode: {mode2})")
+
+            self.result.add_mismatches(f'{datatype.lower()}_mode', mismatches)
+        except Exception as e:
+            logger.error(f"Error during mode check: {e}")
+            self.result.add(f'{datatype.lower()}_mode', 'error', f"Error during mode check: {e}")
+
+    def profile_check(self, datatype: str, columns: list[str]) -> None:
+        """
+        Checks the null count, distinct count, sum and mean of specified columns in two DataFrames and logs any discrepancies.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            columns (list): The list of columns to check.
+        """
+
+        logger.info(f"Checking the null count, distinct count, sum and mean for these {datatype} columns: {list(columns)}")
+        profile1, profile2 = self.profile(columns)
+        statistics = ['nulls', 'distinct', 'sum', 'mean']
+        mismatches = pd.DataFrame({statistic: profile_mismatches(profile1, profile2, statistic) for statistic in statistics})
+
+        for col in profile1.index:
+            summary = ", ".join(f"{statistic}: {profile1.at[col, statistic]} / {profile2.at[col, statistic]}"
+                                for statistic in statistics)
+            if mismatches.loc[col].any():
+                logger.warning(f"Profile mismatch in column {col} (Source / Target): {summary}")
+            else:
+                logger.info(f"The profile matched between both datasets for the column: {col} (Source / Target): {summary}")
+
+        self.result.add_mismatches(f'{datatype.lower()}_profile', mismatches.any(axis=1))
+
+    def sampled_data_validation(self, rate: float, confidence: float) -> None:
+        """
+        Compares the rows of a deterministic sample of the keys, or of the row positions, and estimates the
+        number of changed, source-only and target-only rows with Wilson confidence bounds.
+
+        Args:
+            rate (float): The fraction of keys to sample.
+            confidence (float): The confidence level of the bounds.
+        """
+
+        # Check if the columns in both DataFrames are the same, skip the comparison if not
+        if set(self.df1.columns) != set(self.df2.columns):
+            logger.warning("DataFrames do not have the same columns.")
+            self.result.add('sampled_data', 'error', "DataFrames do not have the same columns.")
+            return
+
+        missing_key_columns = [col for col in self.key_columns if col not in self.df1.columns]
+        if missing_key_columns:
+            logger.error(f"Key columns missing in the DataFrames: {missing_key_columns}.")
+            self.result.add('sampled_data', 'error', f"Key columns missing in the DataFrames: {missing_key_columns}.")
+            return
+
+        self._sample_masks = (sample_mask(self.df1, self.key_columns, rate), sample_mask(self.df2, self.key_columns, rate))
+        source, target = self.df1[self._sample_masks[0]], self.df2[self._sample_masks[1]][self.df1.columns]
+        use_row_hash = self.settings.reconciliation.row_hash_prepass
+        rules = dict(self.settings.comparison.rules)
+        null_equals_null = self.settings.comparison.null_equals_null
+
+        if self.key_columns:
+            comparison = compare_on_keys(source, target, self.key_columns, use_row_hash=use_row_hash, rules=rules,
+                                         null_equals_null=null_equals_null)
+            sample_counts = {'changed': int(comparison.rows_with_differences.sum()),
+                             'source_only': len(comparison.source_only), 'target_only': len(comparison.target_only)}
+        else:
+            # The same positions are sampled on both sides, so compare the positions both DataFrames have
+            overlap = min(len(self.df1), len(self.df2))
+            source, target = source.loc[source.index < overlap], target.loc[target.index < overlap]
+            _, rows_with_differences = compare_positional(source, target, use_row_hash=use_row_hash, rules=rules,
+                                                          null_equals_null=null_equals_null)
+            sample_counts = {'changed': int(rows_with_differences.sum()), 'source_only': 0, 'target_only': 0}
+
+        # Scale the sampled counts to the source rows, or to the target rows for target-only rows
+        estimates, bounds = {}, {}
+        sizes = {'changed': (len(source), len(self.df1)), 'source_only': (len(source), len(self.df1)),
+                 'target_only': (len(target), len(self.df2))}
+        for kind, (sample_size, population) in sizes.items():
+            if not self.key_columns and kind != 'changed':
+                # Rows past the end of the shorter DataFrame are counted exactly
+                exact = max(len(self.df1) - len(self.df2), 0) if kind == 'source_only' else max(len(self.df2) - len(self.df1), 0)
+                estimates[kind], bounds[kind] = exact, [exact, exact]
+                continue
+            lower, upper = proportion_bounds(sample_counts[kind], sample_size, confidence)
+            estimates[kind] = round(sample_counts[kind] / sample_size * population) if sample_size else 0
+            bounds[kind] = [int(np.floor(lower * population)), int(np.ceil(upper * population))]
+            logger.info(f"Estimated {kind.replace('_', '-')} rows: {estimates[kind]} "
+                        f"({sample_counts[kind]} in the sample, {confidence:.0%} bounds: {bounds[kind]}).")
+        self.diff_counts = estimates
+
+        metrics = {'sample_rate': rate, 'confidence': confidence, 'sampled_source_rows': len(source),
+                   'sampled_target_rows': len(target), 'sample_counts': sample_counts, 'bounds': bounds}
+        if any(sample_counts.values()) or any(estimates.values()):
+            logger.warning("The sample has differences between the datasets.")
+            self.result.add('sampled_data', 'failed', "The sample has differences between the datasets.", **metrics)
+        else:
+            logger.info(f"There are no differences in the sample of {len(source)} rows.")
+            self.result.add('sampled_data', 'passed', "There are no differences in the sample.", **metrics)
+
+    def _sampled_column_checks(self, datatype: str, get_columns: callable, confidence: float) -> None:
+        """
+        Retrieves the columns of a datatype and runs the sampled quantile and approximate distinct checks on them.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            get_columns (callable): Returns the columns to check.
+            confidence (float): The confidence level of the bounds.
+        """
+
+        try:
+            columns = get_columns()
+            self.quantile_check(datatype, columns, confidence)
+            self.distinct_check(datatype, columns, confidence)
+        except Exception as e:
+            logger.error(f"Error while retrieving the {datatype.lower()}-type columns: {e}")
+            self.result.add(f'{datatype.lower()}_columns', 'error', f"Error while retrieving the {datatype.lower()}-type columns: {e}")
+
+    def quantile_check(self, datatype: str, columns: list[str], confidence: float) -> None:
+        """
+        Compares the 1st, 50th and 99th percentiles of the sampled rows, in place of the exact min/max and median checks.
+        A column mismatches if the confidence intervals of a percentile do not overlap between the DataFrames.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            columns (list): The list of columns to check.
+            confidence (float): The confidence level of the intervals.
+        """
+
+        logger.info(f"Checking the sampled quantiles {list(SAMPLED_QUANTILES)} of these {datatype} columns: {list(columns)}")
+        if self._sample_masks is None:
+            self._sample_masks = (sample_mask(self.df1, self.key_columns, self.settings.sampling.rate),
+                                  sample_mask(self.df2, self.key_columns, self.settings.sampling.rate))
+
+        mismatches = pd.Series(False, index=list(columns))
+        for col in columns:
+            for quantile in SAMPLED_QUANTILES:
+                estimate1, lower1, upper1 = quantile_bounds(self.df1.loc[self._sample_masks[0], col], quantile, confidence)
+                estimate2, lower2, upper2 = quantile_bounds(self.df2.loc[self._sample_masks[1], col], quantile, confidence)
+                if estimate1 is None or estimate2 is None:
+                    continue
+
+                # The quantiles differ significantly if their intervals are disjoint
+                summary = (f"Source: {estimate1} [{lower1}, {upper1}], Target: {estimate2} [{lower2}, {upper2}]")
+                if upper1 < lower2 or upper2 < lower1:
+                    mismatches[col] = True
+                    logger.warning(f"Quantile {quantile} mismatch in column {col}: {summary}")
+                else:
+                    logger.info(f"The quantile {quantile} matched between both datasets for the column: {col}: {summary}")
+
+        self.result.add_mismatches(f'{datatype.lower()}_quantiles', mismatches)
+
+    def distinct_check(self, datatype: str, columns: list[str], confidence: float) -> None:
+        """
+        Compares the distinct counts of columns estimated with HyperLogLog sketches over every row.
+        A column mismatches if the estimates differ by more than their combined error at the confidence level.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            columns (list): The list of columns to check.
+            confidence (float): The confidence level of the comparison.
+        """
+
+        logger.info(f"Checking the approximate distinct counts of these {datatype} columns: {list(columns)}")
+        mismatches = pd.Series(False, index=list(columns))
+        for col in columns:
+            sketches = [HyperLogLog(self.settings.sampling.hll_precision) for _ in range(2)]
+            sketches[0].add(self.df1[col])
+            sketches[1].add(self.df2[col])
+            count1, count2 = (sketch.count() for sketch in sketches)
+
+            # The difference of two estimates has a standard error of the relative error times their root sum of squares
+            tolerance = z_score(confidence) * sketches[0].relative_error() * np.hypot(count1, count2)
+            summary = f"Source: ~{count1:.0f}, Target: ~{count2:.0f} (tolerance {tolerance:.0f})"
+            if abs(count1 - count2) > tolerance:
+                mismatches[col] = True
+                logger.warning(f"Distinct count mismatch in column {col}: {summary}")
+            else:
+                logger.info(f"The distinct counts matched between both datasets for the column: {col}: {summary}")
+
+        self.result.add_mismatches(f'{datatype.lower()}_distinct', mismatches)
+
+    def _numeric_columns(self) -> list[str]:
+        """
+        Returns the numeric-type columns to check: discovered from the dtypes if 'AUTO_NUMERIC_DISCOVER' is enabled,
+        otherwise from the settings.
+
+        Returns:
+            list[str]: The numeric-type columns.
+        """
+
+        if self.settings.column_types.auto_numeric_discover:
+            return list(self.df1.select_dtypes(include=[np.number]).columns)
+        return list(self.settings.column_types.numeric)
+
+    def _date_columns(self) -> list[str]:
+        """
+        Returns the date-type columns to check: every date column of the first DataFrame if 'AUTO_DATE_DISCOVER' is enabled,
+        including the columns parsed while loading and the ones found by the schema inference, otherwise from the settings.
+
+        Returns:
+            list[str]: The date-type columns.
+        """
+
+        if self.settings.column_types.auto_date_discover:
+            return list(self.df1.select_dtypes(include=['datetime', 'datetimetz']).columns)
+        return list(self.settings.column_types.date)
@@ -1,4 +1,4 @@
-from configparser import ConfigParser
+from configparser import ConfigParser, NoOptionError, NoSectionError
 import os
 
 
@@ -48,12 +48,10 @@ def get_config(section: str, option: str, config_file: str = CONFIG_FILE_PATH) -
     config = read_config(config_file)
     try:
         value = config.get(section, option)
-    except ConfigParser.NoSectionError:
-        raise KeyError(f"The section, '{
-                       section}', does not exist in the config file.")
-    except ConfigParser.NoOptionError:
-        raise KeyError(f"The option, '{
-                       option}', does not exist in the section, '{section}'.")
+    except NoSectionError:
+        raise KeyError(f"The section, '{section}', does not exist in the config file.")
+    except NoOptionError:
+        raise KeyError(f"The option, '{option}', does not exist in the section, '{section}'.")
     return value
 
 
@@ -0,0 +1,211 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import os
+import pickle
+from modules.comparison import KeyComparison, row_hashes
+
+
+def key_hashes(df: pd.DataFrame, key_columns: list[str]) -> np.ndarray:
+    """
+    Hashes the key of every row of a DataFrame.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to hash.
+        key_columns (list[str]): The key columns.
+
+    Returns:
+        np.ndarray: The uint64 hash of each row's key.
+    """
+
+    return pd.util.hash_pandas_object(df[key_columns], index=False).to_numpy()
+
+
+def state_path(directory: str, source_file: str, target_file: str, options: str = '') -> str:
+    """
+    Returns the path of the incremental state of a source/target pair.
+
+    Args:
+        directory (str): The directory the states are stored in.
+        source_file (str): The path to the source file.
+        target_file (str): The path to the target file.
+        options (str, optional): The options the files are loaded and compared with. Defaults to ''.
+
+    Returns:
+        str: The path of the state.
+    """
+
+    pair_key = hashlib.sha256(f'{os.path.abspath(source_file)}|{os.path.abspath(target_file)}|{options}'.encode())
+    return os.path.join(directory, f'{pair_key.hexdigest()}.state')
+
+
+class IncrementalState:
+    """
+    The per-key row hashes and differences of the last key-based reconciliation of a source/target pair.
+
+    A key whose row hash is unchanged on both sides since the last run, and which did not differ then,
+    cannot differ now, so only the keys that changed on either side or differed before are compared again.
+    The statistics of a side are carried forward while none of its rows change.
+
+    Attr:
+        path (str): The path the state is persisted to.
+        key_columns (list[str]): The key columns of the last run.
+        columns (list[str]): The columns of the last run.
+        source_hashes (pd.Series): The row hash of each source row, indexed by the hash of its key.
+        target_hashes (pd.Series): The row hash of each target row, indexed by the hash of its key.
+        diff_keys (np.ndarray): The key hashes of the changed, source-only and target-only rows of the last run.
+        source_profile (pd.DataFrame): The statistics of the source columns profiled in the last run.
+        target_profile (pd.DataFrame): The statistics of the target columns profiled in the last run.
+
+    Methods:
+        __init__(path: str): Initializes an empty IncrementalState.
+        load(path: str): Loads the state persisted at a path, or returns an empty state.
+        save(): Persists the state.
+        plan(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: list[str]): Selects the rows to compare again.
+        update(comparison: KeyComparison): Records the hashes and differences of the run.
+        update_profiles(source_profile: pd.DataFrame, target_profile: pd.DataFrame): Records the statistics of the run.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes an empty IncrementalState.
+
+        Args:
+            path (str): The path the state is persisted to.
+        """
+
+        self.path = path
+        self.key_columns = None
+        self.columns = None
+        self.source_hashes = None
+        self.target_hashes = None
+        self.diff_keys = None
+        self.source_profile = None
+        self.target_profile = None
+        self._pending = None
+        self._updated = False
+
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalState':
+        """
+        Loads the state persisted at a path, or returns an empty state if there is none.
+
+        Args:
+            path (str): The path the state is persisted to.
+
+        Returns:
+            IncrementalState: The loaded state.
+        """
+
+        state = cls(path)
+        if os.path.exists(path):
+            with open(path, 'rb') as state_file:
+                state.__dict__.update(pickle.load(state_file))
+            state.path = path
+        return state
+
+    def save(self) -> None:
+        """Persists the state, replacing the previous one atomically."""
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fields = {name: value for name, value in vars(self).items() if name not in ('path', '_pending', '_updated')}
+
+        # Write to a temporary file first so a concurrent reader never sees a partial state
+        temporary_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as state_file:
+            pickle.dump(fields, state_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.path)
+
+    def plan(self, df1: pd.DataFrame, df2: pd.DataFrame, key_columns: list[str]) -> dict:
+        """
+        Hashes both DataFrames and selects the rows whose keys must be compared again.
+
+        Args:
+            df1 (pd.DataFrame): The first DataFrame.
+            df2 (pd.DataFrame): The second DataFrame.
+            key_columns (list[str]): The key columns.
+
+        Returns:
+            dict: The boolean 'source_rows' and 'target_rows' to compare, whether each side changed
+                ('source_changed', 'target_changed') and the number of 'unchanged' matched rows,
+                or None if the whole DataFrames must be compared.
+        """
+
+        value_columns = [col for col in df1.columns if col not in key_columns]
+        source = pd.Series(row_hashes(df1[value_columns]), index=key_hashes(df1, key_columns))
+        target = pd.Series(row_hashes(df2[value_columns]), index=key_hashes(df2, key_columns))
+        self._updated = False
+        self._pending = {'key_columns': list(key_columns), 'columns': list(df1.columns),
+                         'source_hashes': source, 'target_hashes': target}
+
+        # Compare everything on the first run, after a schema change, or if keys are duplicated
+        if (self.source_hashes is None or self.key_columns != list(key_columns) or self.columns != list(df1.columns)
+                or not source.index.is_unique or not target.index.is_unique):
+            return None
+
+        source_changed = _changed_keys(self.source_hashes, source)
+        target_changed = _changed_keys(self.target_hashes, target)
+        touched = source_changed.union(target_changed).union(pd.Index(self.diff_keys))
+
+        source_rows = source.index.isin(touched)
+        target_rows = target.index.isin(touched)
+        return {'source_rows': source_rows, 'target_rows': target_rows,
+                'source_changed': not source_changed.empty, 'target_changed': not target_changed.empty,
+                'unchanged': int((~source_rows).sum())}
+
+    def update(self, comparison: KeyComparison) -> None:
+        """
+        Records the hashes of the planned DataFrames and the differences of the run, to be persisted with save().
+
+        Args:
+            comparison (KeyComparison): The comparison of the rows compared in this run.
+        """
+
+        if self._pending is None:
+            return
+
+        # Record the keys of every difference, so that they are compared again next time even if unchanged
+        key_columns = self._pending['key_columns']
+        changed = comparison.compared.loc[comparison.rows_with_differences, key_columns]
+        changed = changed.astype(comparison.source_only[key_columns].dtypes.to_dict())
+        diff_keys = [key_hashes(rows, key_columns) for rows in (changed, comparison.source_only, comparison.target_only)]
+
+        self.__dict__.update(self._pending)
+        self.diff_keys = np.unique(np.concatenate(diff_keys))
+        self.source_profile = None
+        self.target_profile = None
+        self._pending = None
+        self._updated = True
+
+    def update_profiles(self, source_profile: pd.DataFrame, target_profile: pd.DataFrame) -> None:
+        """
+        Records the statistics of the run, if its hashes were recorded with update().
+
+        Args:
+            source_profile (pd.DataFrame): The statistics of the profiled source columns.
+            target_profile (pd.DataFrame): The statistics of the profiled target columns.
+        """
+
+        if self._updated:
+            self.source_profile = source_profile
+            self.target_profile = target_profile
+
+
+def _changed_keys(previous: pd.Series, current: pd.Series) -> pd.Index:
+    """
+    Returns the keys that were added, removed or whose row hash changed.
+
+    Args:
+        previous (pd.Series): The previous row hashes, indexed by key hash.
+        current (pd.Series): The current row hashes, indexed by key hash.
+
+    Returns:
+        pd.Index: The hashes of the changed keys.
+    """
+
+    positions = previous.index.get_indexer(current.index)
+    found = positions >= 0
+    modified = current.index[found][previous.to_numpy()[positions[found]] != current.to_numpy()[found]]
+    added = current.index[~found]
+    removed = previous.index.difference(current.index)
+    return modified.append(added).append(removed)
@@ -0,0 +1,265 @@
+import cProfile
+import importlib.util
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from modules.logging_config import Logger
+from modules.settings import InstrumentationSettings
+
+# The resource module only exists on POSIX, psutil is used instead where it is installed
+if importlib.util.find_spec('resource') is not None:
+    import resource
+else:
+    resource = None
+    if importlib.util.find_spec('psutil') is not None:
+        import psutil
+    else:
+        psutil = None
+
+
+logger = Logger()
+
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of the process so far, in MB, or None if it cannot be measured."""
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+    # The peak working set on Windows, the current resident set size elsewhere
+    if psutil is not None:
+        memory = psutil.Process().memory_info()
+        return getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024)
+    return None
+
+
+def children_cpu_seconds() -> float:
+    """
+    Returns the CPU time of the finished child processes, such as the workers of a closed process pool,
+    or None where it cannot be measured. Workers that are still running are not included.
+    """
+
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class RunReport:
+    """
+    A class to record the wall time, CPU time, memory and processed sizes of each validation stage.
+
+    The CPU time of a stage is split between the main process ('cpu_seconds') and the worker processes
+    that finished during the stage ('children_cpu_seconds', POSIX only). When the peak resident set size
+    cannot be measured, because neither the resource module nor psutil is available, the memory metrics
+    are None and the tracemalloc peak is the only memory metric.
+
+    Attr:
+        stages (list[dict]): The metrics of each stage, in the order they ran.
+        profiler (cProfile.Profile): The profiler enabled during the stages, if profiling is on.
+        trace_memory (bool): Whether the peak Python memory of each stage is traced with tracemalloc.
+
+    Methods:
+        __init__(profile: bool = False, trace_memory: bool = False): Initializes the RunReport.
+        stage(name: str, rows: int = None, columns: int = None): Context manager recording the metrics of a stage.
+        to_dict(): Returns the report as a dictionary.
+        write_json(path: str): Saves the report as JSON.
+        write_prometheus(path: str): Saves the report in the Prometheus textfile format.
+        write_profile(path: str): Saves the cProfile statistics.
+        save(instrumentation: InstrumentationSettings): Saves the report in every configured format and logs its summary.
+        summary(): Returns a one-line summary of the report.
+        close(): Stops the memory tracing started by the report.
+    """
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False) -> None:
+        """
+        Initializes the RunReport class.
+
+        Args:
+            profile (bool, optional): Whether to run cProfile during the stages. Defaults to False.
+            trace_memory (bool, optional): Whether to trace the peak Python memory of each stage. Defaults to False.
+        """
+
+        self.stages = []
+        self.profiler = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+        self._started_tracing = False
+        self._open_stages = []
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None, columns: int = None):
+        """
+        Context manager recording the metrics of a stage. Metrics are recorded even if the stage raises or exits.
+        A stage opened inside another one, such as the report write of the data validation, is recorded with
+        the name of its 'parent' and is not counted again in the totals.
+
+        Args:
+            name (str): The name of the stage.
+            rows (int, optional): The number of rows processed by the stage. Defaults to None.
+            columns (int, optional): The number of columns processed by the stage. Defaults to None.
+
+        Yields:
+            dict: The record of the stage, to which the stage can add its own metrics such as diff counts.
+        """
+
+        record = {'stage': name, 'rows': rows, 'columns': columns}
+        if self._open_stages:
+            record['parent'] = self._open_stages[-1][0]['stage']
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+
+            # Keep the peak the enclosing stages reached so far, since resetting it for this stage loses it
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            for open_stage in self._open_stages:
+                open_stage[1] = max(open_stage[1], traced_peak)
+            tracemalloc.reset_peak()
+        if self.profiler is not None and not self._open_stages:
+            self.profiler.enable()
+        self._open_stages.append([record, 0])
+
+        peak_before = peak_rss_mb()
+        wall_start, cpu_start, children_cpu_start = time.perf_counter(), time.process_time(), children_cpu_seconds()
+        try:
+            yield record
+        finally:
+            _, earlier_traced_peak = self._open_stages.pop()
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 6)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 6)
+            if children_cpu_start is not None:
+                record['children_cpu_seconds'] = round(children_cpu_seconds() - children_cpu_start, 6)
+            peak_after = peak_rss_mb()
+            record['peak_rss_mb'] = round(peak_after, 3) if peak_after is not None else None
+            record['peak_rss_delta_mb'] = round(peak_after - peak_before, 3) if peak_before is not None else None
+
+            if self.profiler is not None and not self._open_stages:
+                self.profiler.disable()
+            if self.trace_memory:
+                traced_peak = max(earlier_traced_peak, tracemalloc.get_traced_memory()[1])
+                record['traced_peak_mb'] = round(traced_peak / (1024 * 1024), 3)
+            self.stages.append(record)
+
+    def to_dict(self) -> dict:
+        """Returns the report as a dictionary."""
+
+        peak = peak_rss_mb()
+        stages = [stage for stage in self.stages if 'parent' not in stage]
+        return {
+            'wall_seconds': round(sum(stage['wall_seconds'] for stage in stages), 6),
+            'cpu_seconds': round(sum(stage['cpu_seconds'] for stage in stages), 6),
+            'children_cpu_seconds': round(sum(stage.get('children_cpu_seconds', 0) for stage in stages), 6)
+            if resource is not None else None,
+            'peak_rss_mb': round(peak, 3) if peak is not None else None,
+            'stages': self.stages,
+        }
+
+    def write_json(self, path: str) -> None:
+        """
+        Saves the report as JSON.
+
+        Args:
+            path (str): The path to save the report.
+        """
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as report_file:
+            json.dump(self.to_dict(), report_file, indent=2, default=str)
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Saves the report in the Prometheus textfile format, replacing the file atomically for the textfile collector.
+
+        Args:
+            path (str): The path to save the report, usually ending in '.prom'.
+        """
+
+        metrics = [
+            ('wall_seconds', 'Wall time of each validation stage in seconds.'),
+            ('cpu_seconds', 'CPU time of the main process in each validation stage in seconds.'),
+            ('children_cpu_seconds', 'CPU time of the worker processes that finished in each validation stage in seconds.'),
+            ('peak_rss_delta_mb', 'Growth of the peak resident set size during each validation stage in MB.'),
+            ('rows', 'Rows processed by each validation stage.'),
+            ('columns', 'Columns processed by each validation stage.'),
+        ]
+
+        lines = []
+        for metric, description in metrics:
+            name = f'reconciliation_stage_{metric}'
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} gauge']
+            lines += [f'{name}{{stage="{stage["stage"]}"}} {stage[metric]}'
+                      for stage in self.stages if stage.get(metric) is not None]
+
+        # Diff counts are labelled by kind, e.g. changed, source_only and target_only
+        name = 'reconciliation_stage_diff_rows'
+        lines += [f'# HELP {name} Rows with differences found by each validation stage.', f'# TYPE {name} gauge']
+        for stage in self.stages:
+            for kind, count in stage.get('diff_counts', {}).items():
+                lines.append(f'{name}{{stage="{stage["stage"]}",kind="{kind}"}} {count}')
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as report_file:
+            report_file.write('\n'.join(lines) + '\n')
+        os.replace(temporary_path, path)
+
+    def write_profile(self, path: str) -> None:
+        """
+        Saves the cProfile statistics, readable with pstats or snakeviz.
+
+        Args:
+            path (str): The path to save the statistics.
+        """
+
+        if self.profiler is not None:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.profiler.dump_stats(path)
+
+    def save(self, instrumentation: InstrumentationSettings) -> None:
+        """
+        Saves the report in every format configured in the [INSTRUMENTATION] section and logs its summary.
+
+        Args:
+            instrumentation (InstrumentationSettings): The report paths and whether cProfile ran.
+        """
+
+        report_path = instrumentation.report_path
+        if report_path:
+            self.write_json(report_path)
+            logger.info(f"Run report saved to {report_path}")
+
+        prometheus_path = instrumentation.prometheus_path
+        if prometheus_path:
+            self.write_prometheus(prometheus_path)
+            logger.info(f"Run metrics saved to {prometheus_path}")
+
+        if self.profiler is not None:
+            profile_path = f'{os.path.splitext(report_path or "assets/outputs/run_report")[0]}.prof'
+            self.write_profile(profile_path)
+            logger.info(f"cProfile statistics saved to {profile_path}")
+
+        logger.info(self.summary())
+
+    def summary(self) -> str:
+        """Returns a one-line summary of the report."""
+
+        report = self.to_dict()
+        stages = ', '.join(f"{stage['stage']} {stage['wall_seconds']:.3f}s" for stage in self.stages)
+        cpu = f"CPU {report['cpu_seconds']:.3f}s"
+        if report['children_cpu_seconds']:
+            cpu += f" + {report['children_cpu_seconds']:.3f}s in workers"
+        memory = f", peak RSS {report['peak_rss_mb']:.1f} MB" if report['peak_rss_mb'] is not None else ''
+        return f"Validation finished in {report['wall_seconds']:.3f}s ({cpu}{memory}): {stages}"
+
+    def close(self) -> None:
+        """Stops the memory tracing started by the report, so a long-running process does not keep paying for it."""
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
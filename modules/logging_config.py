@@ -1,12 +1,43 @@
+import atexit
+import json
 import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import queue
+import sys
+import threading
+import time
 import coloredlogs
-from modules.get_config import get_config
+from logging.handlers import QueueHandler, QueueListener
+from modules.settings import LoggingSettings, Settings
+
+
+# The format of the text log lines
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# The handlers, filter and options of each logger, keyed by logger name, so that each logger is only set up once
+_INSTALLED = {}
+
+# The background listeners writing the queued records, keyed by logger name
+_LISTENERS = {}
+
+# The [LOGGING] settings the loggers are set up with, replaced by configure_logging
+_SETTINGS = {'logging': LoggingSettings()}
+
+# Guards the handler setup, since loggers may be created from several threads
+_SETUP_LOCK = threading.Lock()
 
 
 class Logger:
     """
     Custom Logger class that supports both console and file logging with colored output.
 
+    The handlers of a logger are only set up by its first Logger instance, so creating a Logger in every module
+    neither duplicates the log lines nor truncates the log file again. They follow the [LOGGING] defaults until
+    the entry point calls configure_logging with the settings it loaded. With the 'QUEUE' setting, records are
+    put on a queue and written by a background thread, so that logging never blocks on the console or the disk.
+
     Attr:
         logger (logging.Logger): The logger instance.
 
@@ -25,47 +56,292 @@ class Logger:
 
         Args:
             name (str, optional): The name of the logger. Defaults to None.
-            level (str, optional): The logging level. Defaults to None.
+            level (str, optional): The logging level. Defaults to None (the 'LOG_LEVEL' setting).
             log_to_file (bool, optional): Whether to log to a file. Defaults to False.
-            overwrite (bool, optional): Whether to overwrite the log file. Defaults to False.
+            overwrite (bool, optional): Whether to overwrite the log file when the logger is first set up. Defaults to False.
             log_filename (str, optional): The filename for the log file. Defaults to 'app.log'.
         """
 
-        if level is None:
-            level = get_config('LOGGING', 'LOG_LEVEL')
-
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(level)  # Set the minimum logging level
 
-        coloredlogs_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        coloredlogs.install(level=level, logger=self.logger, fmt=coloredlogs_format)
+        with _SETUP_LOCK:
+            if self.logger.name in _INSTALLED:
+                if level is not None:
+                    self.logger.setLevel(level)
+                return
 
-        if log_to_file:
-            file_mode = 'w' if overwrite else 'a'  # 'w' for overwrite mode, 'a' for append mode
-            file_handler = logging.FileHandler(log_filename, mode=file_mode)
-            file_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(file_format)
-            self.logger.addHandler(file_handler)
+            options = {'level': level, 'log_to_file': log_to_file, 'overwrite': overwrite, 'log_filename': log_filename}
+            _install(self.logger, options)
 
     def debug(self, message: str) -> None:
         """Logs a debug message."""
-        self.logger.debug(message)
+        self.logger.debug(message, stacklevel=2)
 
     def info(self, message: str) -> None:
         """Logs an info message."""
-        self.logger.info(message)
+        self.logger.info(message, stacklevel=2)
 
     def warning(self, message: str) -> None:
         """Logs a warning message."""
-        self.logger.warning(message)
+        self.logger.warning(message, stacklevel=2)
 
     def error(self, message: str) -> None:
         """Logs an error message."""
-        self.logger.error(message)
+        self.logger.error(message, stacklevel=2)
 
     def critical(self, message: str) -> None:
         """Logs a critical message."""
-        self.logger.critical(message)
+        self.logger.critical(message, stacklevel=2)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats log records as one JSON object per line, for log collectors.
+
+    Methods:
+        format(record: logging.LogRecord): Returns the record as a JSON object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Returns the record as a JSON object with its time, logger, level, location and message.
+
+        Args:
+            record (logging.LogRecord): The record to format.
+
+        Returns:
+            str: The JSON object.
+        """
+
+        entry = {
+            'time': self.formatTime(record),
+            'name': record.name,
+            'level': record.levelname,
+            'module': record.module,
+            'line': record.lineno,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limits the records logged from each line of code, so that a message repeated for thousands of columns or rows
+    costs a constant number of log lines. Errors and critical messages are never dropped.
+
+    The first records from a line within each interval are logged. The next record logged after the interval
+    ends reports how many were dropped, and the remaining counts are logged at exit.
+
+    Attr:
+        limit (int): The number of records logged from each line per interval.
+        interval (float): The length of an interval, in seconds.
+        windows (dict): The start, logged count and dropped count of the current interval of each line.
+
+    Methods:
+        __init__(limit: int, interval: float): Initializes the filter.
+        filter(record: logging.LogRecord): Returns whether the record is logged.
+        flush(): Logs the number of records dropped from each line since its last logged record.
+    """
+
+    def __init__(self, limit: int, interval: float) -> None:
+        """
+        Initializes the filter.
+
+        Args:
+            limit (int): The number of records logged from each line per interval.
+            interval (float): The length of an interval, in seconds.
+        """
+
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Returns whether the record is logged, appending the number of dropped records to the first record of an interval.
+
+        Args:
+            record (logging.LogRecord): The record to check.
+
+        Returns:
+            bool: True if the record is logged.
+        """
+
+        if record.levelno >= logging.ERROR:
+            return True
+
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            start, logged, dropped = self.windows.get(site, (now, 0, 0))
+            if now - start >= self.interval:
+                start, logged = now, 0
+            if logged >= self.limit:
+                self.windows[site] = (start, logged, dropped + 1)
+                return False
+            self.windows[site] = (start, logged + 1, 0)
+
+        if dropped:
+            record.msg = f"{record.getMessage()} ({dropped} similar messages suppressed)"
+            record.args = None
+        return True
+
+    def flush(self) -> None:
+        """Logs the number of records dropped from each line since its last logged record."""
+
+        with self._lock:
+            dropped_by_site = {site: dropped for site, (_, _, dropped) in self.windows.items() if dropped}
+            self.windows.clear()
+
+        for (pathname, lineno), dropped in dropped_by_site.items():
+            logging.getLogger().warning(f"{dropped} similar messages suppressed from {os.path.basename(pathname)}:{lineno}.")
+
+
+def configure_logging(settings: Settings) -> None:
+    """
+    Sets the loggers up again with the [LOGGING] section of loaded settings, such as the configuration file passed
+    with '--config', instead of the defaults the module-level loggers were created with.
+    The log files are appended to, so the lines already logged are kept.
+
+    Args:
+        settings (Settings): The settings of the run.
+    """
+
+    with _SETUP_LOCK:
+        if settings.logging == _SETTINGS['logging']:
+            return
+        _SETTINGS['logging'] = settings.logging
+
+        for name, installed in list(_INSTALLED.items()):
+            logger = logging.getLogger(name)
+            _uninstall(logger, installed)
+            _install(logger, {**installed['options'], 'overwrite': False})
+
+
+def _install(logger: logging.Logger, options: dict) -> None:
+    """
+    Sets up the handlers and the rate limit of a logger with the current [LOGGING] settings.
+
+    Args:
+        logger (logging.Logger): The logger to set up.
+        options (dict): The 'level', 'log_to_file', 'overwrite' and 'log_filename' options of its Logger.
+    """
+
+    settings = _SETTINGS['logging']
+    logger.setLevel(options['level'] or settings.log_level)  # Set the minimum logging level
+
+    # Format the lines as text, in color on terminals, or as one JSON object per line
+    if settings.format == 'json':
+        console_format = file_format = JsonFormatter()
+    else:
+        file_format = logging.Formatter(LOG_FORMAT)
+        console_format = coloredlogs.ColoredFormatter(LOG_FORMAT) if coloredlogs.terminal_supports_colors(sys.stderr) else file_format
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(console_format)
+    handlers = [console_handler]
+
+    if options['log_to_file']:
+        # 'w' for overwrite mode, 'a' for append mode. Spawned worker processes append to the file of the main process
+        file_mode = 'w' if options['overwrite'] and multiprocessing.parent_process() is None else 'a'
+        file_handler = logging.FileHandler(options['log_filename'], mode=file_mode)
+        file_handler.setFormatter(file_format)
+        handlers.append(file_handler)
+
+    # Write the records from a background thread, the logging call only puts them on the queue
+    attached = handlers
+    if settings.queue:
+        queue_handler = QueueHandler(queue.SimpleQueue())
+        _start_listener(logger.name, queue_handler, handlers)
+        attached = [queue_handler]
+    for handler in attached:
+        logger.addHandler(handler)
+
+    rate_filter = None
+    if settings.rate_limit:
+        rate_filter = RateLimitFilter(settings.rate_limit, settings.rate_interval)
+        logger.addFilter(rate_filter)
+    _INSTALLED[logger.name] = {'options': options, 'handlers': handlers, 'attached': attached, 'filter': rate_filter}
+
+
+def _uninstall(logger: logging.Logger, installed: dict) -> None:
+    """
+    Removes the handlers and the rate limit set up by _install, writing the queued records first.
+
+    Args:
+        logger (logging.Logger): The logger to clean up.
+        installed (dict): The handlers and filter set up for the logger.
+    """
+
+    if installed['filter'] is not None:
+        installed['filter'].flush()
+        logger.removeFilter(installed['filter'])
+
+    listener = _LISTENERS.pop(logger.name, None)
+    if listener is not None:
+        listener[0].stop()
+    for handler in installed['attached']:
+        logger.removeHandler(handler)
+    for handler in installed['handlers']:
+        handler.close()
+    del _INSTALLED[logger.name]
+
+
+def _start_listener(name: str, queue_handler: QueueHandler, handlers: list[logging.Handler]) -> None:
+    """
+    Starts the background thread writing the queued records of a logger to its handlers, stopped at exit.
+
+    Args:
+        name (str): The name of the logger.
+        queue_handler (QueueHandler): The handler putting the records on the queue.
+        handlers (list[logging.Handler]): The handlers the records are written to.
+    """
+
+    listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _LISTENERS[name] = (listener, queue_handler, handlers)
+
+
+def _stop_listeners() -> None:
+    """Writes the remaining queued records and stops the background threads."""
+
+    while _LISTENERS:
+        _, (listener, _, _) = _LISTENERS.popitem()
+        listener.stop()
+
+
+def _flush_rate_limits() -> None:
+    """Logs the records dropped by the rate limits of the installed loggers. Replaced filters are flushed when removed."""
+
+    for installed in list(_INSTALLED.values()):
+        if installed['filter'] is not None:
+            installed['filter'].flush()
+
+
+def _restart_listeners() -> None:
+    """
+    Gives a forked process its own queues and background threads, since the threads of the parent are not copied
+    and its queues may have been locked at the time of the fork.
+    """
+
+    for name, (_, queue_handler, handlers) in list(_LISTENERS.items()):
+        queue_handler.queue = queue.SimpleQueue()
+        _start_listener(name, queue_handler, handlers)
+
+    # Worker processes exit without running the atexit functions, but run the multiprocessing finalizers
+    if _LISTENERS:
+        multiprocessing.util.Finalize(None, _stop_listeners, exitpriority=10)
+
+
+# Functions registered last run first at exit, so the dropped counts are logged before the listeners stop
+atexit.register(_stop_listeners)
+atexit.register(_flush_rate_limits)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listeners)
 
 
 if __name__ == "__main__":
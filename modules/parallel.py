@@ -0,0 +1,95 @@
+import multiprocessing
+import threading
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+
+# The DataFrames shared with forked workers, which inherit them copy-on-write instead of unpickling them
+_shared_frames = None
+
+
+def partition_columns(columns: list, partitions: int) -> list[list]:
+    """
+    Split the columns round-robin into the given number of partitions.
+
+    Args:
+        columns (list): The columns to split.
+        partitions (int): The number of partitions.
+
+    Returns:
+        list[list]: The non-empty column partitions.
+    """
+
+    return [columns[i::partitions] for i in range(partitions) if columns[i::partitions]]
+
+
+def run_partitioned(func, df1: pd.DataFrame, df2: pd.DataFrame, columns: list, workers: int, **kwargs) -> list:
+    """
+    Run a function on column partitions of two DataFrames, across a process pool when more than one worker is requested.
+
+    On platforms that support 'fork', a single-threaded process forks the workers, which inherit both DataFrames
+    and only receive their column names, so the partitions are not pickled. A process running other threads, such as
+    the service dispatcher or a logging queue listener, starts them with 'forkserver' (or 'spawn') instead, since a
+    forked worker can inherit a lock held by another thread and deadlock. Each partition is then pickled to its worker.
+
+    Args:
+        func (callable): A module-level function called as func(df1_partition, df2_partition, **kwargs).
+        df1 (pd.DataFrame): The first DataFrame.
+        df2 (pd.DataFrame): The second DataFrame.
+        columns (list): The columns to partition.
+        workers (int): The number of worker processes. Runs in-process if 1 or less.
+        **kwargs: Extra keyword arguments passed to the function.
+
+    Returns:
+        list: The result of the function for each partition.
+    """
+
+    global _shared_frames
+
+    columns = list(columns)
+    if workers <= 1 or len(columns) <= 1:
+        return [func(df1[columns], df2[columns], **kwargs)]
+
+    partitions = partition_columns(columns, min(workers, len(columns)))
+
+    start_methods = multiprocessing.get_all_start_methods()
+    if 'fork' in start_methods and threading.active_count() == 1:
+        _shared_frames = (df1, df2)
+        try:
+            with ProcessPoolExecutor(max_workers=len(partitions), mp_context=multiprocessing.get_context('fork')) as executor:
+                futures = [executor.submit(_run_on_shared_frames, func, partition, kwargs) for partition in partitions]
+                return [future.result() for future in futures]
+        finally:
+            _shared_frames = None
+
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in start_methods else 'spawn')
+    with ProcessPoolExecutor(max_workers=len(partitions), mp_context=context) as executor:
+        futures = [executor.submit(func, df1[partition], df2[partition], **kwargs) for partition in partitions]
+        return [future.result() for future in futures]
+
+
+def merge_differences(results: list[tuple[pd.DataFrame, pd.Series]], columns: list) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Merge the differences computed on column partitions into one result.
+
+    Args:
+        results (list[tuple[pd.DataFrame, pd.Series]]): The differences and rows with differences of each partition.
+        columns (list): The columns in their original order.
+
+    Returns:
+        tuple[pd.DataFrame, pd.Series]: The boolean differences and the compared rows with any difference.
+    """
+
+    if len(results) == 1:
+        return results[0]
+
+    # Rows only compared in some partitions have no differences in the others
+    differences = pd.concat([differences for differences, _ in results], axis=1).reindex(columns=columns).eq(True).sort_index()
+    return differences, differences.any(axis=1)
+
+
+def _run_on_shared_frames(func, columns: list, kwargs: dict):
+    """Runs a function on a column partition of the DataFrames inherited from the parent process."""
+
+    df1, df2 = _shared_frames
+    return func(df1[columns], df2[columns], **kwargs)
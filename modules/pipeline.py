@@ -0,0 +1,144 @@
+from functools import partial
+from modules.logging_config import Logger
+from modules.settings import Settings
+from modules.dataframe_validator import DataFrameValidator
+from modules.chunked_validator import ChunkedValidator
+from modules.sql_validator import SqlValidator
+from modules.comparison import row_hashes
+from modules.profile_cache import ProfileCache, snapshot_matches
+from modules.incremental import IncrementalState, state_path
+from modules.readers import read_input, unify_categories
+from modules.result import ReconciliationResult
+
+
+logger = Logger()
+
+
+def reconcile(settings: Settings, output_path: str = 'assets/outputs/diff.html') -> ReconciliationResult:
+    """
+    Reconciles the source and target files of the settings, in chunks when streaming is enabled.
+
+    Args:
+        settings (Settings): The settings of the run, including the files to compare.
+        output_path (str, optional): The path to save the HTML file with differences. Defaults to 'assets/outputs/diff.html'.
+
+    Returns:
+        ReconciliationResult: The status, metrics and saved differences of each check.
+    """
+
+    # Initialize files
+    source_file = settings.inputs.source_file
+    target_file = settings.inputs.target_file
+
+    # Retrieve the key columns used to join the rows, if any
+    key_columns = list(settings.reconciliation.key_columns)
+
+    # Compare the files in chunks when streaming is enabled
+    if settings.streaming.enabled:
+        # Chunks can only be aligned by key when both files are sorted on it
+        if not settings.streaming.sorted_on_key:
+            key_columns = []
+        validator = ChunkedValidator(source_file, target_file, settings.streaming.chunk_size,
+                                     key_columns=key_columns, settings=settings)
+        if settings.incremental.enabled:
+            logger.warning("Incremental reconciliation is not supported when streaming; comparing every row.")
+        if settings.sampling.enabled:
+            logger.warning("The sampled pre-check is not supported when streaming; comparing every row.")
+        if settings.schema.enabled:
+            logger.warning("Schema inference is not supported when streaming; keeping the loaded dtypes.")
+        return validator.validate(output_path)
+
+    # Retrieve the loading options, keeping the key and checked columns in any column selection
+    date_columns = list(settings.column_types.date)
+    columns = list(settings.inputs.columns) or None
+    if columns:
+        checked_columns = key_columns + date_columns
+        if not settings.column_types.auto_numeric_discover:
+            checked_columns += list(settings.column_types.numeric)
+        columns += [col for col in dict.fromkeys(checked_columns) if col not in columns]
+    dtypes = dict(settings.inputs.dtypes)
+    if not settings.inputs.parse_dates:
+        date_columns = []
+    load_options = dict(file_format=settings.inputs.format or None, columns=columns, date_columns=date_columns,
+                        date_format=settings.inputs.date_format or None, filters=list(settings.inputs.filters))
+    load = partial(read_input, **load_options)
+
+    # Run the checks as SQL when an embedded database is configured
+    if settings.engine.backend != 'pandas':
+        if settings.incremental.enabled or settings.cache.enabled:
+            logger.warning(f"The cache and incremental reconciliation are not supported by the {settings.engine.backend} backend.")
+        if settings.sampling.enabled:
+            logger.warning(f"The sampled pre-check is not supported by the {settings.engine.backend} backend; comparing every row.")
+        if settings.schema.enabled:
+            logger.warning(f"Schema inference is not supported by the {settings.engine.backend} backend; keeping the loaded dtypes.")
+        validator = SqlValidator(source_file, target_file, key_columns=key_columns, settings=settings,
+                                 load_options={**load_options, 'dtypes': dtypes})
+        return validator.validate(output_path)
+
+    # Retrieve the cached dtypes, row hashes and statistics of the source snapshot, if any
+    cache = None
+    source_entry = None
+    # The cached profile is computed after the schema inference converts the source, so it depends on the [SCHEMA] section
+    cache_options = repr(sorted({**load_options, 'dtypes': dtypes, 'schema': settings.schema}.items()))
+    if settings.cache.enabled:
+        cache = ProfileCache(settings.cache.directory, settings.cache.max_size_mb * 1024 * 1024,
+                             verify_content=settings.cache.verify_content)
+        source_entry = cache.get(source_file, cache_options)
+
+    # Create dataframes, skipping the comparison of the rows when the target holds exactly the cached snapshot
+    target_df = load(target_file, dtypes=dtypes)
+    snapshot = source_entry is not None and snapshot_matches(source_entry, target_df)
+
+    # Take the parsed source from the cache instead of parsing the file again
+    source_df = cache.get_frame(source_file, cache_options) if source_entry is not None else None
+    if source_df is not None:
+        logger.info(f"Loaded the parsed {source_file} from the cache.")
+    else:
+        source_df = load(source_file, dtypes={**source_entry['dtypes'], **dtypes} if source_entry else dtypes)
+        if cache is not None:
+            cache.put_frame(source_file, source_df, cache_options)
+
+    # Cache the dtypes and row hashes as loaded, since the checks may convert the source to the inferred schema
+    source_dtypes = source_df.dtypes.to_dict()
+    source_hashes = None
+    if cache is not None:
+        source_hashes = source_entry['row_hashes'] if source_entry is not None else row_hashes(source_df)
+
+    # Share the categories of the columns loaded with a 'category' dtype, so both sides can be compared
+    unify_categories(source_df, target_df)
+
+    # Retrieve the state of the previous run, which is only meaningful when rows are matched on keys
+    incremental_state = None
+    if settings.incremental.enabled:
+        if key_columns:
+            state_options = repr((cache_options, key_columns, settings.comparison))
+            incremental_state = IncrementalState.load(state_path(settings.incremental.directory, source_file,
+                                                                 target_file, state_options))
+        else:
+            logger.warning("Incremental reconciliation requires KEY_COLUMNS; comparing every row.")
+
+    validator = DataFrameValidator(source_df, target_df, key_columns=key_columns,
+                                   source_profile=source_entry['profile'] if source_entry else None, settings=settings,
+                                   incremental_state=incremental_state)
+
+    # Run the sampled pre-check, escalating to the exact comparison only if it finds differences
+    if settings.sampling.enabled and not snapshot:
+        sample_result = validator.validate_sample()
+        if sample_result.passed or not settings.sampling.escalate:
+            return sample_result
+        logger.warning("The sampled pre-check found differences; running the exact comparison.")
+
+    # Validate the data between the DataFrames
+    result = validator.validate(output_path=output_path, snapshot=snapshot)
+
+    # Save the row hashes and differences of this run for the next one
+    if incremental_state is not None:
+        incremental_state.save()
+
+    # Cache the source snapshot, or refresh it if more columns were profiled
+    if cache is not None and (source_entry is None or len(validator.source_profile) > len(source_entry['profile'])):
+        cache.put(source_file, {'dtypes': source_dtypes,
+                                'row_hashes': source_hashes,
+                                'profile': validator.source_profile}, cache_options)
+
+    return result
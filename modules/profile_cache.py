@@ -0,0 +1,200 @@
+import pandas as pd
+import hashlib
+import os
+import pickle
+from modules.comparison import row_hashes
+
+
+class ProfileCache:
+    """
+    An on-disk, size-bounded LRU cache of the parsed DataFrame, dtypes, row hashes and statistics of input files.
+
+    Entries are keyed on the file path, size and modification time, so a cache hit only costs a stat of the file,
+    and any rewrite of the file misses the cache. With 'verify_content', the key also includes a hash of the file
+    contents, which reads the whole file once per process but catches files rewritten with the same size and
+    modification time. Reading an entry marks it as recently used, and the least recently used entries are
+    evicted once the cache grows past its maximum size.
+
+    The parsed DataFrame is stored apart from the dtypes, row hashes and statistics, so checking a target
+    against the cached snapshot does not load it.
+
+    Attr:
+        directory (str): The directory the cache entries are stored in.
+        max_bytes (int): The maximum total size of the cache entries.
+        verify_content (bool): Whether the entries are also keyed on a hash of the file contents.
+
+    Methods:
+        __init__(directory: str, max_bytes: int, verify_content: bool = False): Initializes the ProfileCache.
+        get(path: str, options: str = ''): Returns the cached entry of a file, if any.
+        put(path: str, entry: dict, options: str = ''): Stores the entry of a file and evicts the least recently used entries.
+        get_frame(path: str, options: str = ''): Returns the cached parsed DataFrame of a file, if any.
+        put_frame(path: str, df: pd.DataFrame, options: str = ''): Stores the parsed DataFrame of a file.
+        _read(entry_path: str): Returns the object stored at an entry path, if any.
+        _write(entry_path: str, value): Stores an object at an entry path and evicts the least recently used entries.
+        _entry_path(path: str, options: str, suffix: str = ''): Returns the path of the cache entry of a file.
+        _evict(): Removes the least recently used entries until the cache fits its maximum size.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, verify_content: bool = False) -> None:
+        """
+        Initializes the ProfileCache class.
+
+        Args:
+            directory (str): The directory the cache entries are stored in.
+            max_bytes (int): The maximum total size of the cache entries.
+            verify_content (bool, optional): Whether the entries are also keyed on a hash of the file contents. Defaults to False.
+        """
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.verify_content = verify_content
+        self._keys = {}
+
+    def get(self, path: str, options: str = '') -> dict:
+        """
+        Returns the cached entry of a file, if any.
+
+        Args:
+            path (str): The path to the input file.
+            options (str, optional): The options the file was loaded with, such as the selected columns. Defaults to ''.
+
+        Returns:
+            dict: The cached 'dtypes', 'row_hashes' and 'profile' of the file, or None if it is not cached.
+        """
+
+        return self._read(self._entry_path(path, options))
+
+    def put(self, path: str, entry: dict, options: str = '') -> None:
+        """
+        Stores the entry of a file and evicts the least recently used entries.
+
+        Args:
+            path (str): The path to the input file.
+            entry (dict): The 'dtypes', 'row_hashes' and 'profile' of the file.
+            options (str, optional): The options the file was loaded with, such as the selected columns. Defaults to ''.
+        """
+
+        self._write(self._entry_path(path, options), entry)
+
+    def get_frame(self, path: str, options: str = '') -> pd.DataFrame:
+        """
+        Returns the cached parsed DataFrame of a file, if any.
+
+        Args:
+            path (str): The path to the input file.
+            options (str, optional): The options the file was loaded with, such as the selected columns. Defaults to ''.
+
+        Returns:
+            pd.DataFrame: The DataFrame as loaded, or None if it is not cached.
+        """
+
+        return self._read(self._entry_path(path, options, suffix='.frame'))
+
+    def put_frame(self, path: str, df: pd.DataFrame, options: str = '') -> None:
+        """
+        Stores the parsed DataFrame of a file and evicts the least recently used entries.
+
+        Args:
+            path (str): The path to the input file.
+            df (pd.DataFrame): The DataFrame as loaded, before any check converts it.
+            options (str, optional): The options the file was loaded with, such as the selected columns. Defaults to ''.
+        """
+
+        self._write(self._entry_path(path, options, suffix='.frame'), df)
+
+    def _read(self, entry_path: str):
+        """
+        Returns the object stored at an entry path, marking it as recently used.
+
+        Args:
+            entry_path (str): The path of the cache entry.
+
+        Returns:
+            The stored object, or None if there is no entry.
+        """
+
+        if not os.path.exists(entry_path):
+            return None
+
+        # Mark the entry as recently used
+        os.utime(entry_path)
+        with open(entry_path, 'rb') as entry_file:
+            return pickle.load(entry_file)
+
+    def _write(self, entry_path: str, value) -> None:
+        """
+        Stores an object at an entry path and evicts the least recently used entries.
+
+        Args:
+            entry_path (str): The path of the cache entry.
+            value: The object to store.
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Write to a temporary file first so a concurrent reader never sees a partial entry
+        temporary_path = f'{entry_path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as entry_file:
+            pickle.dump(value, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, entry_path)
+
+        self._evict()
+
+    def _entry_path(self, path: str, options: str, suffix: str = '') -> str:
+        """
+        Returns the path of the cache entry of a file.
+
+        Args:
+            path (str): The path to the input file.
+            options (str): The options the file was loaded with.
+            suffix (str, optional): The suffix of the entry, e.g. '.frame' for the parsed DataFrame. Defaults to ''.
+
+        Returns:
+            str: The path of the cache entry.
+        """
+
+        stat = os.stat(path)
+        file_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+        # Hash the contents once per file version, only when asked to
+        content_key = ''
+        if self.verify_content:
+            if file_key not in self._keys:
+                content_hash = hashlib.blake2b(digest_size=16)
+                with open(path, 'rb') as input_file:
+                    for block in iter(lambda: input_file.read(1 << 20), b''):
+                        content_hash.update(block)
+                self._keys[file_key] = content_hash.hexdigest()
+            content_key = self._keys[file_key]
+
+        entry_key = hashlib.sha256(f'{file_key}|{content_key}|{options}'.encode()).hexdigest()
+        return os.path.join(self.directory, f'{entry_key}{suffix}.pkl')
+
+    def _evict(self) -> None:
+        """Removes the least recently used entries until the cache fits its maximum size."""
+
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.pkl')]
+        entries.sort(key=os.path.getmtime)
+
+        total_bytes = sum(os.path.getsize(entry) for entry in entries)
+        while entries and total_bytes > self.max_bytes:
+            entry = entries.pop(0)
+            total_bytes -= os.path.getsize(entry)
+            os.remove(entry)
+
+
+def snapshot_matches(entry: dict, df: pd.DataFrame) -> bool:
+    """
+    Checks whether a DataFrame holds exactly the data of a cached snapshot, using the cached row hashes.
+
+    Args:
+        entry (dict): The cached entry of the snapshot.
+        df (pd.DataFrame): The DataFrame to check.
+
+    Returns:
+        bool: True if the columns, dtypes and every row hash match.
+    """
+
+    if df.dtypes.to_dict() != entry['dtypes'] or list(df.columns) != list(entry['dtypes']):
+        return False
+    return len(df) == len(entry['row_hashes']) and bool((row_hashes(df) == entry['row_hashes']).all())
@@ -0,0 +1,107 @@
+import pandas as pd
+import numpy as np
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_float_dtype, is_numeric_dtype
+
+
+# The statistics computed for every profiled column
+PROFILE_STATISTICS = ['min', 'max', 'median', 'mode', 'nulls', 'distinct', 'sum', 'mean']
+
+# The statistics accumulated with float additions, whose rounding depends on the order of the rows
+FLOAT_STATISTICS = ('sum', 'mean')
+
+# The relative difference under which two float statistics are equal
+FLOAT_REL_TOL = 1e-9
+
+
+def profile_columns(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """
+    Compute the min, max, median, mode, null count, distinct count, sum and mean of the given columns.
+
+    Columns are grouped by dtype and every statistic is reduced over each group as one block,
+    instead of scanning the columns one at a time. The distinct count and the mode share a
+    single value count per column. Statistics that do not apply to a dtype are left as NaN.
+    Float columns downcast by the schema inference are reduced in float64, so their statistics match
+    those of the loaded values.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to profile.
+        columns (list[str]): The columns to profile.
+
+    Returns:
+        pd.DataFrame: The statistics (columns) of each profiled column (index).
+    """
+
+    columns = list(columns)
+    frame = df[columns]
+    profile = pd.DataFrame(np.nan, index=pd.Index(columns), columns=PROFILE_STATISTICS, dtype=object)
+
+    # Reduce the columns of each dtype as one block, like pandas stores them
+    for dtype in frame.dtypes.unique():
+        group = [col for col in columns if frame[col].dtype == dtype]
+        if is_numeric_dtype(dtype) and not is_bool_dtype(dtype):
+            statistics = ('min', 'max', 'median', 'sum', 'mean')
+        elif is_datetime64_any_dtype(dtype):
+            statistics = ('min', 'max', 'median')
+        else:
+            statistics = ('min', 'max')
+
+        block = frame[group]
+        if is_float_dtype(dtype) and dtype.itemsize < 8:
+            block = block.astype('float64')
+        for statistic in statistics:
+            profile.loc[group, statistic] = getattr(block, statistic)()
+
+    profile['nulls'] = frame.isna().sum()
+
+    # Count the distinct values once per column, and take the smallest of the most frequent values as the mode
+    for col in columns:
+        counts = frame[col].value_counts()
+        profile.at[col, 'distinct'] = len(counts)
+        if len(counts):
+            profile.at[col, 'mode'] = counts.index[counts == counts.iloc[0]].min()
+
+    return profile
+
+
+def profile_pair(df1: pd.DataFrame, df2: pd.DataFrame, profile_source: bool = True,
+                 profile_target: bool = True) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Profile every column of two DataFrames.
+
+    Args:
+        df1 (pd.DataFrame): The first DataFrame.
+        df2 (pd.DataFrame): The second DataFrame.
+        profile_source (bool, optional): Whether to profile the first DataFrame. Defaults to True.
+        profile_target (bool, optional): Whether to profile the second DataFrame. Defaults to True.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: The profiles of the first and second DataFrames, empty if skipped.
+    """
+
+    empty = pd.DataFrame(columns=PROFILE_STATISTICS, dtype=object)
+    return (profile_columns(df1, df1.columns) if profile_source else empty,
+            profile_columns(df2, df2.columns) if profile_target else empty)
+
+
+def profile_mismatches(profile1: pd.DataFrame, profile2: pd.DataFrame, statistic: str) -> pd.Series:
+    """
+    Compare a statistic between two profiles, treating missing values on both sides as equal.
+    The sum and mean are equal within a relative tolerance of FLOAT_REL_TOL, since their rounding depends on the row order.
+
+    Args:
+        profile1 (pd.DataFrame): The first profile.
+        profile2 (pd.DataFrame): The second profile, with the same columns as the first one.
+        statistic (str): The statistic to compare.
+
+    Returns:
+        pd.Series: Series indicating the columns whose statistic differs.
+    """
+
+    values1, values2 = profile1[statistic], profile2[statistic]
+    mismatches = (values1 != values2) & ~(values1.isna() & values2.isna())
+    if statistic in FLOAT_STATISTICS:
+        numbers1 = pd.to_numeric(values1, errors='coerce').astype(float)
+        numbers2 = pd.to_numeric(values2, errors='coerce').astype(float)
+        both = numbers1.notna() & numbers2.notna()
+        mismatches[both] = ~np.isclose(numbers1[both], numbers2[both], rtol=FLOAT_REL_TOL, atol=0)
+    return mismatches
@@ -0,0 +1,167 @@
+import pandas as pd
+import importlib.util
+import operator
+import os
+from pandas.api.types import is_datetime64_any_dtype
+
+
+# The input formats selected by file extension
+FORMATS_BY_EXTENSION = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+}
+
+# The comparison operators supported in filters
+FILTER_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+
+
+def read_input(path: str, file_format: str = None, columns: list[str] = None, dtypes: dict = None,
+               date_columns: list[str] = None, date_format: str = None, filters: list[tuple] = None) -> pd.DataFrame:
+    """
+    Reads an input file into a DataFrame, loading only the requested columns and rows.
+
+    Parquet and Feather files are read with pyarrow, and Parquet filters are pushed down to skip row groups.
+    CSV files are read with the pyarrow engine when it is installed, with explicit dtypes and the
+    date columns parsed at load time. The columns of the filters that are applied after loading are
+    loaded too, and dropped once the rows are filtered.
+
+    Args:
+        path (str): The path to the input file.
+        file_format (str, optional): 'csv', 'parquet' or 'feather'. Defaults to None (select by file extension).
+        columns (list[str], optional): The columns to load. Defaults to None (all columns).
+        dtypes (dict, optional): The dtypes of the columns, keyed by column. Defaults to None (inferred).
+        date_columns (list[str], optional): The columns to parse as dates. Defaults to None.
+        date_format (str, optional): The strftime format of the date columns. Defaults to None (inferred).
+        filters (list[tuple], optional): (column, operator, value) filters the rows must match. Defaults to None.
+
+    Returns:
+        pd.DataFrame: The loaded DataFrame.
+
+    Raises:
+        ValueError: If the file format is not supported.
+    """
+
+    if not file_format:
+        file_format = FORMATS_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+    if file_format not in FORMATS_BY_EXTENSION.values():
+        raise ValueError(f"Unsupported input format for {path}: {file_format}")
+
+    # Dates are parsed separately, so only pass the other dtypes to the reader
+    dtypes = {col: dtype for col, dtype in (dtypes or {}).items()
+              if (columns is None or col in columns) and not is_datetime64_any_dtype(dtype)}
+    date_columns = [col for col in (date_columns or []) if columns is None or col in columns]
+
+    # Load the columns the filters need, even when they are not selected
+    filter_columns = []
+    if filters and columns is not None and file_format != 'parquet':
+        filter_columns = [col for col in dict.fromkeys(col for col, _, _ in filters) if col not in columns]
+
+    if file_format == 'parquet':
+        df = pd.read_parquet(path, engine='pyarrow', columns=columns, filters=filters or None)
+        filters = None
+    elif file_format == 'feather':
+        df = pd.read_feather(path, columns=columns + filter_columns if columns is not None else None)
+    else:
+        engine = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+        df = pd.read_csv(path, engine=engine, usecols=columns + filter_columns if columns is not None else None,
+                         dtype=dtypes or None)
+
+    if dtypes and file_format != 'csv':
+        df = df.astype(dtypes)
+
+    for col in date_columns:
+        if not is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format=date_format)
+
+    # Apply the filters that could not be pushed down to the reader
+    if filters:
+        mask = pd.Series(True, index=df.index)
+        for col, op, value in filters:
+            mask &= FILTER_OPERATORS[op](df[col], value)
+        df = df.loc[mask].reset_index(drop=True)
+    if filter_columns:
+        df = df.drop(columns=filter_columns)
+
+    return df
+
+
+def unify_categories(df1: pd.DataFrame, df2: pd.DataFrame) -> None:
+    """
+    Converts the categorical columns of both DataFrames in place to the union of their categories,
+    since each file loaded with a 'category' dtype has its own categories, and categoricals with
+    different categories cannot be compared.
+
+    Args:
+        df1 (pd.DataFrame): The first DataFrame.
+        df2 (pd.DataFrame): The second DataFrame.
+    """
+
+    for col in df1.columns.intersection(df2.columns):
+        dtype1, dtype2 = df1[col].dtype, df2[col].dtype
+        if isinstance(dtype1, pd.CategoricalDtype) and isinstance(dtype2, pd.CategoricalDtype) and dtype1 != dtype2:
+            categories = dtype1.categories.append(dtype2.categories.difference(dtype1.categories, sort=False))
+            dtype = pd.CategoricalDtype(categories, ordered=dtype1.ordered and dtype2.ordered)
+            df1[col] = df1[col].astype(dtype)
+            df2[col] = df2[col].astype(dtype)
+
+
+def parse_filters(value: str) -> list[tuple]:
+    """
+    Parses filters written as 'column operator value' and separated by semicolons, e.g. 'Fund >= 10540; State == CA'.
+
+    Values are converted to int or float when possible.
+
+    Args:
+        value (str): The filters to parse.
+
+    Returns:
+        list[tuple]: The (column, operator, value) filters.
+
+    Raises:
+        ValueError: If a filter has no supported operator.
+    """
+
+    filters = []
+    for expression in filter(None, (item.strip() for item in value.split(';'))):
+        # Match the two-character operators before their one-character prefixes
+        op = next((op for op in FILTER_OPERATORS if op in expression), None)
+        if op is None:
+            raise ValueError(f"Invalid filter: {expression}")
+
+        col, operand = (part.strip() for part in expression.split(op, 1))
+        for convert in (int, float):
+            try:
+                operand = convert(operand)
+                break
+            except ValueError:
+                continue
+        filters.append((col, op, operand))
+    return filters
+
+
+def parse_dtypes(value: str) -> dict:
+    """
+    Parses dtypes written as 'column: dtype' and separated by commas, e.g. 'Cert: int64, State: category'.
+
+    Args:
+        value (str): The dtypes to parse.
+
+    Returns:
+        dict: The dtypes keyed by column.
+    """
+
+    dtypes = {}
+    for item in filter(None, (item.strip() for item in value.split(','))):
+        col, dtype = (part.strip() for part in item.rsplit(':', 1))
+        dtypes[col] = dtype
+    return dtypes
@@ -0,0 +1,144 @@
+import pandas as pd
+import html
+import os
+
+
+class DiffReportWriter:
+    """
+    A class to stream differing cells to a long-format file and summarize them in a truncated HTML report.
+
+    Every differing cell is written as one (key columns, column, source, target) row, so the cost of the
+    report is linear in the number of differing cells. The HTML summary shows the difference count of
+    each column and only the first differences of each column.
+
+    Attr:
+        output_path (str): The path to save the HTML summary.
+        cells_path (str): The path to save the differing cells.
+        file_format (str): The format of the differing cells file: 'csv' or 'parquet'.
+        top_n (int): The number of differences shown per column in the HTML summary.
+        cell_counts (dict): The number of differing cells per column.
+        row_count (int): The number of rows with differences.
+
+    Methods:
+        __init__(output_path: str, file_format: str = 'csv', top_n: int = 20): Initializes the DiffReportWriter.
+        write(keys: pd.DataFrame, source: pd.DataFrame, target: pd.DataFrame, differences: pd.DataFrame): Appends the differing cells of a batch of rows.
+        close(write_summary: bool = True): Closes the differing cells file and saves the HTML summary.
+        _write_cells(cells: pd.DataFrame): Appends rows to the differing cells file.
+    """
+
+    def __init__(self, output_path: str, file_format: str = 'csv', top_n: int = 20) -> None:
+        """
+        Initializes the DiffReportWriter class.
+
+        Args:
+            output_path (str): The path to save the HTML summary. The differing cells are saved next to it.
+            file_format (str, optional): The format of the differing cells file: 'csv' or 'parquet'. Defaults to 'csv'.
+            top_n (int, optional): The number of differences shown per column in the HTML summary. Defaults to 20.
+
+        Raises:
+            ValueError: If the file format is not supported.
+        """
+
+        if file_format not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported diff report format: {file_format}")
+
+        self.output_path = output_path
+        self.cells_path = f'{os.path.splitext(output_path)[0]}_cells.{file_format}'
+        self.file_format = file_format
+        self.top_n = top_n
+        self.cell_counts = {}
+        self.row_count = 0
+        self._samples = {}
+        self._parquet_writer = None
+
+        # Start from an empty file, since batches are appended to it
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        if os.path.exists(self.cells_path):
+            os.remove(self.cells_path)
+
+    def write(self, keys: pd.DataFrame, source: pd.DataFrame, target: pd.DataFrame, differences: pd.DataFrame) -> None:
+        """
+        Appends the differing cells of a batch of rows.
+
+        Args:
+            keys (pd.DataFrame): The key values identifying each row.
+            source (pd.DataFrame): The source values of the compared columns.
+            target (pd.DataFrame): The target values of the compared columns.
+            differences (pd.DataFrame): DataFrame of boolean values indicating differences.
+        """
+
+        self.row_count += int(differences.any(axis=1).sum())
+
+        # Build the long-format rows of each column with differences
+        parts = []
+        for col in differences.columns:
+            rows = differences.index[differences[col].to_numpy()]
+            if rows.empty:
+                continue
+
+            part = keys.loc[rows].reset_index(drop=True)
+            part['column'] = str(col)
+            part['source'] = source.loc[rows, col].astype(str).to_numpy()
+            part['target'] = target.loc[rows, col].astype(str).to_numpy()
+            parts.append(part)
+
+            # Keep the first differences of each column for the summary
+            self.cell_counts[col] = self.cell_counts.get(col, 0) + len(part)
+            sample_count = sum(len(sample) for sample in self._samples.get(col, []))
+            if sample_count < self.top_n:
+                self._samples.setdefault(col, []).append(part.head(self.top_n - sample_count))
+
+        if parts:
+            self._write_cells(pd.concat(parts, ignore_index=True))
+
+    def close(self, write_summary: bool = True) -> None:
+        """
+        Closes the differing cells file and saves the HTML summary.
+
+        Args:
+            write_summary (bool, optional): Whether to save the HTML summary. Defaults to True.
+        """
+
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+        if not write_summary:
+            return
+
+        counts = pd.DataFrame({'column': [str(col) for col in self.cell_counts],
+                               'differences': list(self.cell_counts.values())})
+        sections = [
+            '<h1>Differences</h1>',
+            f'<p>{sum(self.cell_counts.values())} differing cells in {self.row_count} rows. '
+            f'Every differing cell is saved to {html.escape(self.cells_path)}.</p>',
+            counts.to_html(index=False),
+        ]
+        for col, samples in self._samples.items():
+            shown = pd.concat(samples, ignore_index=True)
+            sections.append(f'<h2>{html.escape(str(col))}: first {len(shown)} of {self.cell_counts[col]} differences</h2>')
+            sections.append(shown.to_html(index=False))
+
+        with open(self.output_path, 'w', encoding='utf-8') as summary_file:
+            summary_file.write('\n'.join(sections))
+
+    def _write_cells(self, cells: pd.DataFrame) -> None:
+        """
+        Appends rows to the differing cells file.
+
+        Args:
+            cells (pd.DataFrame): The long-format rows to append.
+        """
+
+        if self.file_format == 'csv':
+            cells.to_csv(self.cells_path, mode='a', header=not os.path.exists(self.cells_path), index=False)
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Store every value as a string so that batches share one schema
+        table = pa.Table.from_pandas(cells.astype(str), preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.cells_path, table.schema)
+        self._parquet_writer.write_table(table)
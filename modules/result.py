@@ -0,0 +1,109 @@
+import pandas as pd
+from dataclasses import dataclass, field
+
+
+# The statuses of a check, from best to worst
+CHECK_STATUSES = ['passed', 'warning', 'failed', 'error']
+
+
+@dataclass
+class CheckResult:
+    """
+    The outcome of one validation check.
+
+    Attr:
+        name (str): The name of the check, e.g. 'row_count' or 'numeric_min_max'.
+        status (str): 'passed', 'warning' (a difference that does not fail the check), 'failed' or 'error' (the check could not run).
+        message (str): A short description of the outcome.
+        metrics (dict): The values the check measured, e.g. row counts or mismatched columns.
+    """
+
+    name: str
+    status: str
+    message: str = ''
+    metrics: dict = field(default_factory=dict)
+
+
+@dataclass
+class ReconciliationResult:
+    """
+    The outcome of a reconciliation: the status of every check, the diff counts and the paths of the saved differences.
+
+    Attr:
+        checks (list[CheckResult]): The result of each check, in the order they ran.
+        diff_counts (dict): The number of changed, source-only and target-only rows.
+        outputs (dict): The paths of the saved differences, e.g. 'html', 'cells', 'source_only' and 'target_only'.
+        run_report (dict): The timing and memory metrics of each validation stage.
+        stopped_early (bool): Whether the remaining checks were skipped after a failure in fail-fast mode.
+    """
+
+    checks: list[CheckResult] = field(default_factory=list)
+    diff_counts: dict = field(default_factory=dict)
+    outputs: dict = field(default_factory=dict)
+    run_report: dict = field(default_factory=dict)
+    stopped_early: bool = False
+
+    def add(self, name: str, status: str, message: str = '', **metrics) -> CheckResult:
+        """
+        Records the result of a check.
+
+        Args:
+            name (str): The name of the check.
+            status (str): 'passed', 'warning', 'failed' or 'error'.
+            message (str, optional): A short description of the outcome. Defaults to ''.
+            **metrics: The values the check measured.
+
+        Returns:
+            CheckResult: The recorded result.
+
+        Raises:
+            ValueError: If the status is not supported.
+        """
+
+        if status not in CHECK_STATUSES:
+            raise ValueError(f"Unsupported check status: {status}")
+
+        check = CheckResult(name, status, message, metrics)
+        self.checks.append(check)
+        return check
+
+    def add_mismatches(self, name: str, mismatches: pd.Series) -> CheckResult:
+        """
+        Records the result of a statistics check, which fails if any column mismatches.
+
+        Args:
+            name (str): The name of the check.
+            mismatches (pd.Series): Boolean values indicating the columns with mismatching statistics.
+
+        Returns:
+            CheckResult: The recorded result.
+        """
+
+        columns = [str(col) for col in mismatches.index[mismatches.astype(bool)]]
+        if columns:
+            return self.add(name, 'failed', f"Mismatches in columns: {columns}.", mismatched_columns=columns)
+        return self.add(name, 'passed', "All columns match.", mismatched_columns=columns)
+
+    @property
+    def status(self) -> str:
+        """Returns the worst status of the checks, or 'passed' if no check ran."""
+
+        return max((check.status for check in self.checks), key=CHECK_STATUSES.index, default='passed')
+
+    @property
+    def passed(self) -> bool:
+        """Returns whether no check failed or errored."""
+
+        return self.status in ('passed', 'warning')
+
+    def to_dict(self) -> dict:
+        """Returns the result as a dictionary."""
+
+        return {
+            'status': self.status,
+            'checks': [vars(check) for check in self.checks],
+            'diff_counts': self.diff_counts,
+            'outputs': self.outputs,
+            'run_report': self.run_report,
+            'stopped_early': self.stopped_early,
+        }
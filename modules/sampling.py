@@ -0,0 +1,181 @@
+import pandas as pd
+import numpy as np
+from statistics import NormalDist
+
+
+# The quantiles compared by the sampled checks, standing in for the minimum, median and maximum
+SAMPLED_QUANTILES = (0.01, 0.5, 0.99)
+
+
+def sample_mask(df: pd.DataFrame, key_columns: list[str], rate: float) -> np.ndarray:
+    """
+    Selects a deterministic sample of rows by hashing their keys, so that both sides sample the same keys.
+    Rows are sampled by position if there are no key columns.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to sample.
+        key_columns (list[str]): The key columns, or an empty list to sample by position.
+        rate (float): The fraction of keys to sample, between 0 and 1.
+
+    Returns:
+        np.ndarray: Boolean values indicating the sampled rows.
+    """
+
+    if key_columns:
+        hashes = pd.util.hash_pandas_object(df[key_columns], index=False).to_numpy()
+    else:
+        hashes = pd.util.hash_array(np.arange(len(df)))
+
+    # A row is sampled if its hash falls in the first 'rate' fraction of the hash space
+    threshold = np.uint64(min(int(rate * 2 ** 64), 2 ** 64 - 1))
+    return hashes < threshold
+
+
+def z_score(confidence: float) -> float:
+    """
+    Returns the two-sided standard normal quantile of a confidence level, e.g. 1.96 for 0.95.
+
+    Args:
+        confidence (float): The confidence level, between 0 and 1.
+
+    Returns:
+        float: The z-score.
+    """
+
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def proportion_bounds(count: int, sample_size: int, confidence: float) -> tuple[float, float]:
+    """
+    Returns the Wilson score interval of a proportion observed in a sample, which stays meaningful when the count is 0.
+
+    Args:
+        count (int): The number of sampled rows with the property.
+        sample_size (int): The number of sampled rows.
+        confidence (float): The confidence level, between 0 and 1.
+
+    Returns:
+        tuple[float, float]: The lower and upper bounds of the proportion.
+    """
+
+    if sample_size == 0:
+        return 0.0, 1.0
+
+    z = z_score(confidence)
+    proportion = count / sample_size
+    center = (proportion + z ** 2 / (2 * sample_size)) / (1 + z ** 2 / sample_size)
+    margin = z * np.sqrt(proportion * (1 - proportion) / sample_size + z ** 2 / (4 * sample_size ** 2)) / (1 + z ** 2 / sample_size)
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def quantile_bounds(values: pd.Series, quantile: float, confidence: float) -> tuple:
+    """
+    Estimates a quantile from sampled values, with a distribution-free confidence interval between two order statistics.
+
+    Args:
+        values (pd.Series): The sampled values. Missing values are ignored.
+        quantile (float): The quantile to estimate, between 0 and 1.
+        confidence (float): The confidence level, between 0 and 1.
+
+    Returns:
+        tuple: The estimate and the lower and upper bounds, or (None, None, None) if there are no values.
+    """
+
+    ordered = values.dropna().sort_values().reset_index(drop=True)
+    size = len(ordered)
+    if size == 0:
+        return None, None, None
+
+    # The rank of the quantile in the sample is binomial, so bound it with the normal approximation
+    margin = z_score(confidence) * np.sqrt(size * quantile * (1 - quantile))
+    estimate = ordered.iloc[min(int(quantile * size), size - 1)]
+    lower = ordered.iloc[max(int(np.floor(quantile * size - margin)), 0)]
+    upper = ordered.iloc[min(int(np.ceil(quantile * size + margin)), size - 1)]
+    return estimate, lower, upper
+
+
+class HyperLogLog:
+    """
+    A HyperLogLog sketch estimating the number of distinct values of a column in one pass with fixed memory.
+
+    Attr:
+        precision (int): The number of hash bits selecting a register; the sketch has 2 ** precision registers.
+        registers (np.ndarray): The highest rank seen by each register.
+
+    Methods:
+        __init__(precision: int = 12): Initializes an empty sketch.
+        add(values: pd.Series): Adds the values of a column to the sketch.
+        count(): Returns the estimated number of distinct values.
+        relative_error(): Returns the relative standard error of the estimate.
+    """
+
+    def __init__(self, precision: int = 12) -> None:
+        """
+        Initializes an empty sketch.
+
+        Args:
+            precision (int, optional): The number of hash bits selecting a register, between 4 and 18. Defaults to 12.
+
+        Raises:
+            ValueError: If the precision is out of range.
+        """
+
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Unsupported HyperLogLog precision: {precision}")
+
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def add(self, values: pd.Series) -> None:
+        """
+        Adds the values of a column to the sketch. Missing values are ignored.
+
+        Args:
+            values (pd.Series): The values to add.
+        """
+
+        hashes = pd.util.hash_pandas_object(values.dropna(), index=False).to_numpy()
+        if len(hashes) == 0:
+            return
+
+        # The first bits select the register, and the rank is the position of the first set bit in the rest
+        register_bits = np.uint64(64 - self.precision)
+        indexes = (hashes >> register_bits).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        ranks = (64 - self.precision) - _bit_length(remainder) + 1
+        np.maximum.at(self.registers, indexes, ranks.astype(np.uint8))
+
+    def count(self) -> float:
+        """Returns the estimated number of distinct values."""
+
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size ** 2 / np.sum(np.exp2(-self.registers.astype(float)))
+
+        # Count the empty registers instead for small cardinalities, where the raw estimate is biased
+        empty_registers = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * size and empty_registers:
+            estimate = size * np.log(size / empty_registers)
+        return float(estimate)
+
+    def relative_error(self) -> float:
+        """Returns the relative standard error of the estimate."""
+
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """
+    Returns the number of bits needed to represent each of an array of unsigned 64-bit integers.
+
+    Args:
+        values (np.ndarray): The uint64 values.
+
+    Returns:
+        np.ndarray: The bit length of each value, 0 for 0.
+    """
+
+    # Split the values in 32-bit halves, which convert to floats exactly
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1]).astype(np.int64)
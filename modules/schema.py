@@ -0,0 +1,148 @@
+import pandas as pd
+import numpy as np
+import warnings
+from pandas.api.types import is_float_dtype, is_integer_dtype, is_object_dtype, is_string_dtype
+
+
+# The integer dtypes tried when downcasting, from the narrowest
+INTEGER_DTYPES = ('int8', 'int16', 'int32', 'int64')
+
+
+def infer_schema(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: list[str] = None, sample_size: int = 1000,
+                 category_max_ratio: float = 0.5, downcast: bool = True, date_format: str = None) -> dict:
+    """
+    Infers one shared schema for two DataFrames, so that both sides are compared with the same dtypes.
+
+    String columns whose sampled values all parse as dates, confirmed on every value, become dates, and string
+    columns with few distinct values become categories sharing the categories of both sides. Integer columns are
+    downcast to the narrowest dtype holding the values of both sides, and float columns to float32 when no value changes.
+    The profiles still sum and average the downcast floats in float64, so the statistics do not change.
+    Key columns are left unchanged, so rows are still joined on the loaded values.
+
+    Args:
+        df1 (pd.DataFrame): The first DataFrame.
+        df2 (pd.DataFrame): The second DataFrame.
+        key_columns (list[str], optional): The columns left unchanged. Defaults to None.
+        sample_size (int, optional): The number of values of each side parsed to detect dates. Defaults to 1000.
+        category_max_ratio (float, optional): The largest ratio of distinct values to the non-missing values of the larger side converted to a category. Defaults to 0.5.
+        downcast (bool, optional): Whether to downcast numeric columns. Defaults to True.
+        date_format (str, optional): The strftime format of the dates. Defaults to None (inferred).
+
+    Returns:
+        dict: The new dtype of each converted column present on both sides.
+    """
+
+    schema = {}
+    for col in df1.columns:
+        if col in (key_columns or []) or col not in df2.columns:
+            continue
+        source, target = df1[col], df2[col]
+
+        if _is_text(source) and _is_text(target):
+            # Parse a sample first, so only the likely date columns are parsed in full
+            if all(_looks_like_dates(values, sample_size, date_format) for values in (source, target)) \
+                    and all(_looks_like_dates(values, len(values), date_format) for values in (source, target)):
+                schema[col] = 'datetime64[ns]'
+                continue
+
+            # Share the categories of both sides, since categoricals with different categories cannot be compared
+            distinct = pd.concat([source.dropna(), target.dropna()], ignore_index=True).unique()
+            non_missing = max(source.count(), target.count())
+            if non_missing and len(distinct) <= category_max_ratio * non_missing:
+                schema[col] = pd.CategoricalDtype(distinct)
+
+        elif downcast and is_integer_dtype(source) and is_integer_dtype(target) and not source.empty and not target.empty:
+            low, high = min(source.min(), target.min()), max(source.max(), target.max())
+            dtype = next(dtype for dtype in INTEGER_DTYPES if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max)
+            if dtype != source.dtype or dtype != target.dtype:
+                schema[col] = dtype
+
+        elif downcast and is_float_dtype(source) and is_float_dtype(target) and source.dtype != np.float32:
+            if _fits_float32(source) and _fits_float32(target):
+                schema[col] = 'float32'
+
+    return schema
+
+
+def apply_schema(df: pd.DataFrame, schema: dict, date_format: str = None) -> pd.Series:
+    """
+    Converts the columns of a DataFrame in place to the dtypes of a schema.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to convert.
+        schema (dict): The new dtype of each column.
+        date_format (str, optional): The strftime format of the dates. Defaults to None (inferred).
+
+    Returns:
+        pd.Series: The number of bytes saved by each converted column, negative if it grew.
+    """
+
+    saved = {}
+    for col, dtype in schema.items():
+        before = df[col].memory_usage(index=False, deep=True)
+        if dtype == 'datetime64[ns]':
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                df[col] = pd.to_datetime(df[col], format=date_format)
+        else:
+            df[col] = df[col].astype(dtype)
+        saved[col] = before - df[col].memory_usage(index=False, deep=True)
+    return pd.Series(saved, dtype='int64')
+
+
+def _is_text(values: pd.Series) -> bool:
+    """
+    Checks whether a column holds strings, as loaded by the pandas or pyarrow readers.
+
+    Args:
+        values (pd.Series): The column to check.
+
+    Returns:
+        bool: True if the column holds strings.
+    """
+
+    return (is_object_dtype(values) or is_string_dtype(values)) and not isinstance(values.dtype, pd.CategoricalDtype)
+
+
+def _looks_like_dates(values: pd.Series, sample_size: int, date_format: str = None) -> bool:
+    """
+    Checks whether every sampled value of a string column parses as a date. Numbers are not treated as dates.
+
+    Args:
+        values (pd.Series): The column to check.
+        sample_size (int): The number of values parsed.
+        date_format (str, optional): The strftime format of the dates. Defaults to None (inferred).
+
+    Returns:
+        bool: True if the sample is not empty and every value in it is a date.
+    """
+
+    sample = values.dropna()
+    sample = sample.sample(sample_size, random_state=0) if len(sample) > sample_size else sample
+    if sample.empty or pd.to_numeric(sample, errors='coerce').notna().any():
+        return False
+
+    try:
+        with warnings.catch_warnings():
+            # Parsing without a format warns when it falls back to parsing each value separately
+            warnings.simplefilter('ignore', UserWarning)
+            return bool(pd.to_datetime(sample, format=date_format, errors='coerce').notna().all())
+    except (TypeError, ValueError):
+        return False
+
+
+def _fits_float32(values: pd.Series) -> bool:
+    """
+    Checks whether every value of a float column is unchanged in float32.
+
+    Args:
+        values (pd.Series): The column to check.
+
+    Returns:
+        bool: True if the column can be downcast without losing precision.
+    """
+
+    values = values.to_numpy()
+    with np.errstate(over='ignore'):
+        converted = values.astype(np.float32).astype(values.dtype)
+    return bool(((converted == values) | np.isnan(values)).all())
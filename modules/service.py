@@ -0,0 +1,476 @@
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from modules.logging_config import Logger, configure_logging
+from modules.pipeline import reconcile
+from modules.settings import Settings, apply_overrides
+
+
+logger = Logger()
+
+# The upper bounds of the job latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# The request fields that set the options of a job, as (section, option) overrides
+JOB_FIELDS = {
+    'source_file': ('INPUTS', 'SOURCE_FILE'),
+    'target_file': ('INPUTS', 'TARGET_FILE'),
+    'key_columns': ('RECONCILIATION', 'KEY_COLUMNS'),
+    'rules': ('COMPARISON', 'RULES'),
+}
+
+# The options a request may override: only how rows are compared, never paths, caching, engines or instrumentation,
+# since the service runs the jobs with its own permissions
+OVERRIDABLE_OPTIONS = {('RECONCILIATION', 'KEY_COLUMNS')}
+OVERRIDABLE_SECTIONS = ('COMPARISON', 'SAMPLING')
+
+
+class ReconciliationService:
+    """
+    A long-running service reconciling the jobs submitted to it on a pool of warm worker processes.
+
+    The workers are started once, with pandas and the reconciliation modules already imported, and reconcile
+    jobs back to back, so a job only pays for loading and comparing its files. The source profiles are cached
+    between jobs, so a job against an unchanged source skips profiling it again.
+
+    Attr:
+        settings (Settings): The settings shared by every job.
+        workers (int): The number of worker processes. Jobs run in the dispatcher thread if 1 or less.
+        output_dir (str): The directory each job saves its differences to, in a directory named after its ID.
+        max_jobs (int): The number of jobs kept, the oldest finished jobs are forgotten past it.
+        jobs (dict): The state of every submitted job, keyed by job ID, in submission order.
+
+    Methods:
+        __init__(settings: Settings, workers: int, output_dir: str, cache_profiles: bool = True, max_jobs: int = 1000): Initializes the service.
+        start(): Starts the worker processes and the dispatcher thread.
+        stop(): Stops accepting jobs, waits for the running jobs and stops the workers.
+        submit(request: dict): Queues a job and returns its state.
+        get(job_id: str, wait: float = None): Returns the state of a job, waiting for it to finish if requested.
+        list_jobs(): Returns the state of every job, without their results.
+        metrics(): Returns the queue depth, job counts and latencies in the Prometheus text format.
+        _dispatch(): Runs the queued jobs as workers become free.
+        _finish(job_id: str, outcome: dict): Records the outcome of a job.
+    """
+
+    def __init__(self, settings: Settings, workers: int, output_dir: str, cache_profiles: bool = True, max_jobs: int = 1000) -> None:
+        """
+        Initializes the ReconciliationService class.
+
+        Args:
+            settings (Settings): The settings shared by every job.
+            workers (int): The number of worker processes. Jobs run in the dispatcher thread if 1 or less.
+            output_dir (str): The directory each job saves its differences to.
+            cache_profiles (bool, optional): Whether to cache the source profiles between jobs. Defaults to True.
+            max_jobs (int, optional): The number of jobs kept, the oldest finished jobs are forgotten past it. Defaults to 1000.
+        """
+
+        # The workers already run jobs in parallel, so each job runs its checks serially unless it says otherwise
+        overrides = {('PERFORMANCE', 'WORKERS'): '1'} if workers > 1 else {}
+        if cache_profiles:
+            overrides[('CACHE', 'ENABLED')] = '1'
+        self.settings = apply_overrides(settings, overrides)
+        self.workers = workers
+        self.output_dir = output_dir
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._slots = threading.Semaphore(max(workers, 1))
+        self._executor = None
+        self._dispatcher = None
+        self._latencies = {'queue': [0.0, 0, [0] * len(LATENCY_BUCKETS)], 'run': [0.0, 0, [0] * len(LATENCY_BUCKETS)]}
+
+    def start(self) -> None:
+        """Starts the worker processes, warming them up before the first job, and the dispatcher thread."""
+
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.settings,))
+            for future in [self._executor.submit(_warm_up) for _ in range(self.workers)]:
+                future.result()
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name='dispatcher', daemon=True)
+        self._dispatcher.start()
+        logger.info(f"Reconciliation service started with {max(self.workers, 1)} workers.")
+
+    def stop(self) -> None:
+        """Stops accepting jobs, waits for the running jobs and stops the workers."""
+
+        self._queue.put(None)
+        self._dispatcher.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        logger.info("Reconciliation service stopped.")
+
+    def submit(self, request: dict) -> dict:
+        """
+        Queues a job reconciling a source and a target file.
+
+        Args:
+            request (dict): The 'source_file' and 'target_file' of the job, and optionally its 'name', its 'key_columns'
+                (a list or a comma-separated string), its comparison 'rules', and 'overrides' keyed by 'SECTION.OPTION'
+                of the 'RECONCILIATION.KEY_COLUMNS' option and the options of the [COMPARISON] and [SAMPLING] sections.
+
+        Returns:
+            dict: The state of the queued job.
+
+        Raises:
+            KeyError: If the request sets an unknown option.
+            ValueError: If the request has no source or target file, overrides an option it may not, or an option has an invalid value.
+        """
+
+        overrides = {}
+        for field, option in JOB_FIELDS.items():
+            value = request.get(field)
+            if isinstance(value, (list, tuple)):
+                value = ','.join(str(item) for item in value)
+            if value is not None:
+                overrides[option] = str(value)
+        for name, value in (request.get('overrides') or {}).items():
+            section, dot, option = name.partition('.')
+            if not dot:
+                raise ValueError(f"Invalid override, expected 'SECTION.OPTION': {name}")
+            section, option = section.strip().upper(), option.strip().upper()
+            if section not in OVERRIDABLE_SECTIONS and (section, option) not in OVERRIDABLE_OPTIONS:
+                raise ValueError(f"Option cannot be overridden by a job: {name}")
+            overrides[(section, option)] = str(value)
+        if not {JOB_FIELDS['source_file'], JOB_FIELDS['target_file']} <= set(overrides):
+            raise ValueError("A job needs a 'source_file' and a 'target_file'.")
+
+        # Save the run reports of each job in its output directory
+        job_id = uuid.uuid4().hex[:12]
+        directory = os.path.join(self.output_dir, job_id)
+        for option in ('REPORT_PATH', 'PROMETHEUS_PATH'):
+            path = getattr(self.settings.instrumentation, option.lower())
+            if path:
+                overrides[('INSTRUMENTATION', option)] = os.path.join(directory, os.path.basename(path))
+        job_settings = apply_overrides(self.settings, overrides)
+
+        job = {
+            'job_id': job_id,
+            'name': request.get('name') or job_id,
+            'status': 'queued',
+            'source_file': job_settings.inputs.source_file,
+            'target_file': job_settings.inputs.target_file,
+            'output_directory': directory,
+            'submitted': time.time(),
+            'started': None,
+            'finished': None,
+            'result': None,
+            'error': None,
+        }
+        with self._lock:
+            self.jobs[job_id] = job
+        self._queue.put((job_id, job_settings, os.path.join(directory, 'diff.html')))
+        logger.info(f"Queued job {job_id}: {job['source_file']} -> {job['target_file']}")
+        return dict(job)
+
+    def get(self, job_id: str, wait: float = None) -> dict:
+        """
+        Returns the state of a job.
+
+        Args:
+            job_id (str): The ID of the job.
+            wait (float, optional): The number of seconds to wait for the job to finish. Defaults to None (do not wait).
+
+        Returns:
+            dict: The state of the job, or None if there is no such job.
+        """
+
+        with self._finished:
+            if wait and job_id in self.jobs:
+                self._finished.wait_for(lambda: job_id not in self.jobs or self.jobs[job_id]['finished'] is not None, timeout=wait)
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list_jobs(self) -> list[dict]:
+        """
+        Returns the state of every job, without their results.
+
+        Returns:
+            list[dict]: The state of each job, in submission order.
+        """
+
+        with self._lock:
+            return [dict(job, result=None) for job in self.jobs.values()]
+
+    def metrics(self) -> str:
+        """
+        Returns the queue depth, the running and finished job counts and the job latencies in the Prometheus text format.
+
+        Returns:
+            str: The metrics.
+        """
+
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            latencies = {phase: (total, count, list(buckets)) for phase, (total, count, buckets) in self._latencies.items()}
+
+        lines = ['# HELP reconciliation_service_queue_depth Jobs waiting for a free worker.',
+                 '# TYPE reconciliation_service_queue_depth gauge',
+                 f'reconciliation_service_queue_depth {counts.get("queued", 0)}',
+                 '# HELP reconciliation_service_workers Worker processes reconciling the jobs.',
+                 '# TYPE reconciliation_service_workers gauge',
+                 f'reconciliation_service_workers {max(self.workers, 1)}',
+                 '# HELP reconciliation_service_jobs Submitted jobs by status.',
+                 '# TYPE reconciliation_service_jobs gauge']
+        lines += [f'reconciliation_service_jobs{{status="{status}"}} {counts.get(status, 0)}'
+                  for status in ('queued', 'running', 'passed', 'differences', 'failed')]
+
+        # The time jobs waited in the queue and the time they took to run, as cumulative histograms
+        for phase, (total, count, buckets) in latencies.items():
+            name = f'reconciliation_service_job_{phase}_seconds'
+            lines += [f'# HELP {name} Time the jobs spent {"waiting in the queue" if phase == "queue" else "running"} in seconds.',
+                      f'# TYPE {name} histogram']
+            lines += [f'{name}_bucket{{le="{bound}"}} {bucket}' for bound, bucket in zip(LATENCY_BUCKETS, buckets)]
+            lines += [f'{name}_bucket{{le="+Inf"}} {count}', f'{name}_sum {total:.6f}', f'{name}_count {count}']
+        return '\n'.join(lines) + '\n'
+
+    def _dispatch(self) -> None:
+        """Runs the queued jobs in order, each as soon as a worker is free, until the service is stopped."""
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            job_id, job_settings, output_path = item
+
+            self._slots.acquire()
+            with self._lock:
+                self.jobs[job_id]['status'] = 'running'
+                self.jobs[job_id]['started'] = time.time()
+
+            if self._executor is None:
+                self._finish(job_id, _run_job(job_settings, output_path))
+                continue
+
+            future = self._executor.submit(_run_job, job_settings, output_path)
+            future.add_done_callback(lambda future, job_id=job_id: self._finish(
+                job_id, future.result() if future.exception() is None else {'status': 'failed', 'error': repr(future.exception())}))
+
+        # Wait for the running jobs to finish
+        for _ in range(max(self.workers, 1)):
+            self._slots.acquire()
+
+    def _finish(self, job_id: str, outcome: dict) -> None:
+        """
+        Records the outcome of a job and frees its worker.
+
+        Args:
+            job_id (str): The ID of the job.
+            outcome (dict): The 'status', 'result' and 'error' of the job.
+        """
+
+        with self._finished:
+            job = self.jobs[job_id]
+            job.update(outcome, finished=time.time())
+            for phase, seconds in (('queue', job['started'] - job['submitted']), ('run', job['finished'] - job['started'])):
+                latency = self._latencies[phase]
+                latency[0] += seconds
+                latency[1] += 1
+                latency[2] = [bucket + (seconds <= bound) for bucket, bound in zip(latency[2], LATENCY_BUCKETS)]
+
+            # Forget the oldest finished jobs
+            finished_ids = [finished_id for finished_id, finished_job in self.jobs.items() if finished_job['finished'] is not None]
+            for finished_id in finished_ids[:max(len(self.jobs) - self.max_jobs, 0)]:
+                del self.jobs[finished_id]
+            self._finished.notify_all()
+        self._slots.release()
+        logger.info(f"Job {job_id} {job['status']} in {job['finished'] - job['started']:.3f}s.")
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the HTTP API of a ReconciliationService.
+
+    Endpoints:
+        POST /jobs: Submits a job, returning its ID. With "wait": <seconds> in the body, returns the finished job instead.
+        GET /jobs: Returns the state of every job.
+        GET /jobs/<job_id>[?wait=<seconds>]: Returns the state, result and output paths of a job.
+        GET /metrics: Returns the queue depth, job counts and latencies in the Prometheus text format.
+        GET /health: Returns 'ok'.
+
+    Methods:
+        do_GET(): Serves the GET endpoints.
+        do_POST(): Serves the POST endpoints.
+        log_message(format: str, *args): Logs a request at the debug level.
+        _send(status: int, body, content_type: str = 'application/json'): Sends a response.
+    """
+
+    # Set by serve() to the service the requests are sent to
+    service = None
+
+    def do_GET(self) -> None:
+        """Serves the GET endpoints."""
+
+        path, _, query = self.path.partition('?')
+        parts = [part for part in path.split('/') if part]
+        if parts == ['health']:
+            self._send(200, 'ok\n', 'text/plain')
+        elif parts == ['metrics']:
+            self._send(200, self.service.metrics(), 'text/plain; version=0.0.4')
+        elif parts == ['jobs']:
+            self._send(200, self.service.list_jobs())
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            wait = parse_qs(query).get('wait', [None])[0]
+            try:
+                job = self.service.get(parts[1], float(wait) if wait else None)
+            except ValueError:
+                return self._send(400, {'error': f"Invalid wait: {wait}"})
+
+            if job is None:
+                self._send(404, {'error': f"Unknown job: {parts[1]}"})
+            else:
+                self._send(200, job)
+        else:
+            self._send(404, {'error': f"Unknown endpoint: {path}"})
+
+    def do_POST(self) -> None:
+        """Serves the POST endpoints."""
+
+        if self.path.rstrip('/') != '/jobs':
+            return self._send(404, {'error': f"Unknown endpoint: {self.path}"})
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            job = self.service.submit(request)
+            wait = request.get('wait')
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return self._send(400, {'error': str(e.args[0]) if isinstance(e, KeyError) else str(e)})
+
+        if wait:
+            return self._send(200, self.service.get(job['job_id'], float(wait)))
+        self._send(202, job)
+
+    def log_message(self, format: str, *args) -> None:
+        """Logs a request at the debug level, instead of writing it to stderr."""
+
+        logger.debug(f"{self.command} {self.path}: {format % args}")
+
+    def _send(self, status: int, body, content_type: str = 'application/json') -> None:
+        """
+        Sends a response.
+
+        Args:
+            status (int): The HTTP status code.
+            body: The text of the response, or an object sent as JSON.
+            content_type (str, optional): The content type of the response. Defaults to 'application/json'.
+        """
+
+        data = (body if isinstance(body, str) else json.dumps(body, default=str)).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class UnixHTTPServer(ThreadingHTTPServer):
+    """An HTTP server listening on a Unix socket, reachable e.g. with curl --unix-socket."""
+
+    address_family = socket.AF_UNIX
+
+    def server_bind(self) -> None:
+        """Binds the socket, replacing a socket file left by a previous run."""
+
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        socketserver.TCPServer.server_bind(self)
+        self.server_name, self.server_port = 'localhost', 0
+
+    def get_request(self) -> tuple:
+        """Accepts a connection, with a placeholder client address for the request logs."""
+
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+def serve(service: ReconciliationService, host: str = '127.0.0.1', port: int = 8765, socket_path: str = None) -> None:
+    """
+    Serves the HTTP API of a service until interrupted or terminated, then stops the service after its running jobs.
+
+    Args:
+        service (ReconciliationService): The service to serve.
+        host (str, optional): The address to listen on. Defaults to '127.0.0.1' (local connections only).
+        port (int, optional): The port to listen on. Defaults to 8765.
+        socket_path (str, optional): The Unix socket to listen on instead of a TCP port. Defaults to None.
+    """
+
+    handler = type('BoundRequestHandler', (ServiceRequestHandler,), {'service': service})
+    server = UnixHTTPServer(socket_path, handler) if socket_path else ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    # Stop serving on SIGTERM as on Ctrl+C, shutting down from another thread since serve_forever blocks this one
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+
+    service.start()
+    logger.info(f"Listening on {socket_path or f'http://{host}:{server.server_port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Interrupted, stopping the service.")
+    finally:
+        server.server_close()
+        service.stop()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def _init_worker(settings: Settings) -> None:
+    """
+    Makes a worker process ignore Ctrl+C, so the service finishes its running jobs before stopping it,
+    and sets its logging up like the service, since workers started with 'spawn' import the modules again.
+
+    Args:
+        settings (Settings): The settings of the service.
+    """
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging(settings)
+
+
+def _warm_up() -> int:
+    """
+    Runs in each worker process when the service starts, so the first job does not pay for starting it.
+
+    Returns:
+        int: The process ID of the worker.
+    """
+
+    return os.getpid()
+
+
+def _run_job(settings: Settings, output_path: str) -> dict:
+    """
+    Reconciles one job, catching any failure so that the worker keeps serving jobs.
+
+    Args:
+        settings (Settings): The settings of the job.
+        output_path (str): The path to save the HTML file with differences.
+
+    Returns:
+        dict: The 'status' ('passed', 'differences' or 'failed'), 'result' and 'error' of the job.
+    """
+
+    try:
+        result = reconcile(settings, output_path=output_path)
+    except Exception as e:
+        logger.error(f"Job {os.path.basename(os.path.dirname(output_path))} failed: {e!r}")
+        return {'status': 'failed', 'result': None, 'error': repr(e)}
+
+    # Checks that could not run fail the job, while failed checks are differences between the files
+    errors = [f"{check.name}: {check.message}" for check in result.checks if check.status == 'error']
+    status = 'failed' if errors else 'passed' if result.passed else 'differences'
+    return {'status': status, 'result': result.to_dict(), 'error': '; '.join(errors) or None}
@@ -0,0 +1,368 @@
+import dataclasses
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from modules.get_config import CONFIG_FILE_PATH, read_config
+from modules.comparison import parse_rules
+from modules.readers import parse_dtypes, parse_filters
+
+
+# Environment variables named '<prefix><SECTION>_<OPTION>' override the configuration file, e.g. RECON_PERFORMANCE_WORKERS=4
+ENV_PREFIX = 'RECON_'
+
+# The values accepted for boolean options
+BOOLEAN_VALUES = {'1': True, 'true': True, 'yes': True, 'on': True,
+                  '0': False, 'false': False, 'no': False, 'off': False}
+
+
+@dataclass(frozen=True)
+class InputSettings:
+    """The [INPUTS] section: the files to compare and how they are loaded."""
+
+    source_file: str
+    target_file: str
+    format: str = ''
+    columns: tuple = ()
+    dtypes: tuple = field(default=(), metadata={'parse': lambda value: tuple(parse_dtypes(value).items())})
+    parse_dates: bool = True
+    date_format: str = ''
+    filters: tuple = field(default=(), metadata={'parse': lambda value: tuple(parse_filters(value))})
+
+
+@dataclass(frozen=True)
+class LoggingSettings:
+    """The [LOGGING] section."""
+
+    log_level: str = 'INFO'
+    format: str = field(default='text', metadata={'choices': ('text', 'json')})
+    queue: bool = False
+    rate_limit: int = 0
+    rate_interval: float = 60.0
+
+
+@dataclass(frozen=True)
+class ColumnTypeSettings:
+    """The [COLUMN_TYPES] section: the columns the numeric and date checks run on."""
+
+    auto_numeric_discover: bool = True
+    auto_date_discover: bool = False
+    numeric: tuple = ()
+    date: tuple = ()
+
+
+@dataclass(frozen=True)
+class SchemaSettings:
+    """The [SCHEMA] section: the shared schema inferred for both inputs before comparing them."""
+
+    enabled: bool = False
+    sample_size: int = 1000
+    category_max_ratio: float = 0.5
+    downcast: bool = True
+
+
+@dataclass(frozen=True)
+class ReconciliationSettings:
+    """The [RECONCILIATION] section: how rows are matched and compared."""
+
+    key_columns: tuple = ()
+    row_hash_prepass: bool = True
+    fail_fast: bool = False
+
+
+@dataclass(frozen=True)
+class ComparisonSettings:
+    """The [COMPARISON] section: how the values of each column are compared."""
+
+    null_equals_null: bool = True
+    rules: tuple = field(default=(), metadata={'parse': lambda value: tuple(parse_rules(value).items())})
+
+
+@dataclass(frozen=True)
+class StreamingSettings:
+    """The [STREAMING] section."""
+
+    enabled: bool = False
+    chunk_size: int = 100000
+    sorted_on_key: bool = False
+
+
+@dataclass(frozen=True)
+class PerformanceSettings:
+    """The [PERFORMANCE] section."""
+
+    workers: int = 1
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """The [CACHE] section."""
+
+    enabled: bool = False
+    directory: str = 'assets/cache'
+    max_size_mb: int = 512
+    verify_content: bool = False
+
+
+@dataclass(frozen=True)
+class IncrementalSettings:
+    """The [INCREMENTAL] section: reconciling only the keys that changed since the previous run."""
+
+    enabled: bool = False
+    directory: str = 'assets/state'
+
+
+@dataclass(frozen=True)
+class SamplingSettings:
+    """The [SAMPLING] section: the approximate pre-check run on a sample of the keys before the exact comparison."""
+
+    enabled: bool = False
+    rate: float = 0.01
+    confidence: float = 0.95
+    escalate: bool = True
+    hll_precision: int = 12
+
+
+@dataclass(frozen=True)
+class EngineSettings:
+    """The [ENGINE] section: whether the checks run in pandas or as SQL in an embedded database."""
+
+    backend: str = field(default='pandas', metadata={'choices': ('pandas', 'duckdb', 'sqlite')})
+    database: str = ''
+
+
+@dataclass(frozen=True)
+class ReportSettings:
+    """The [REPORT] section."""
+
+    format: str = field(default='csv', metadata={'choices': ('csv', 'parquet')})
+    html_max_rows: int = 1000
+    top_n: int = 20
+
+
+@dataclass(frozen=True)
+class InstrumentationSettings:
+    """The [INSTRUMENTATION] section."""
+
+    report_path: str = ''
+    prometheus_path: str = ''
+    cprofile: bool = False
+    tracemalloc: bool = False
+
+
+@dataclass(frozen=True)
+class BatchSettings:
+    """The [BATCH] section: how the pairs of a batch manifest are run."""
+
+    workers: int = 4
+    output_directory: str = 'assets/outputs/batch'
+
+
+@dataclass(frozen=True)
+class ServiceSettings:
+    """The [SERVICE] section: the long-running reconciliation service started by service.py."""
+
+    host: str = '127.0.0.1'
+    port: int = 8765
+    socket: str = ''
+    workers: int = 2
+    output_directory: str = 'assets/outputs/service'
+    cache_profiles: bool = True
+    max_jobs: int = 1000
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    The typed, immutable settings of a run, loaded once from the configuration file.
+
+    Every section of the configuration file is a nested settings object, e.g. settings.performance.workers.
+    Lists are stored as tuples, so the settings can be shared safely across threads and pickled to worker processes.
+    """
+
+    inputs: InputSettings
+    logging: LoggingSettings = LoggingSettings()
+    column_types: ColumnTypeSettings = ColumnTypeSettings()
+    schema: SchemaSettings = SchemaSettings()
+    reconciliation: ReconciliationSettings = ReconciliationSettings()
+    comparison: ComparisonSettings = ComparisonSettings()
+    streaming: StreamingSettings = StreamingSettings()
+    performance: PerformanceSettings = PerformanceSettings()
+    cache: CacheSettings = CacheSettings()
+    incremental: IncrementalSettings = IncrementalSettings()
+    sampling: SamplingSettings = SamplingSettings()
+    engine: EngineSettings = EngineSettings()
+    report: ReportSettings = ReportSettings()
+    instrumentation: InstrumentationSettings = InstrumentationSettings()
+    batch: BatchSettings = BatchSettings()
+    service: ServiceSettings = ServiceSettings()
+
+
+def load_settings(config_file: str = CONFIG_FILE_PATH, overrides: dict = None, environ: dict = None) -> Settings:
+    """
+    Loads the settings from the configuration file, then applies the environment variable and explicit overrides.
+
+    Args:
+        config_file (str, optional): The path to the configuration file. Defaults to 'config.ini'.
+        overrides (dict, optional): Values keyed by (section, option), e.g. {('PERFORMANCE', 'WORKERS'): '4'},
+            taking precedence over the environment variables. Defaults to None.
+        environ (dict, optional): The environment variables to read overrides from. Defaults to os.environ.
+
+    Returns:
+        Settings: The loaded settings.
+
+    Raises:
+        KeyError: If a required option is missing or an override names an unknown option.
+        ValueError: If a value cannot be converted to the type of its option.
+    """
+
+    config = read_config(config_file)
+    environ = os.environ if environ is None else environ
+    _check_overrides(overrides)
+    overrides = {(section.upper(), option.upper()): value for (section, option), value in (overrides or {}).items()}
+
+    sections = {}
+    for section_field in dataclasses.fields(Settings):
+        section = section_field.name.upper()
+        values = {}
+        for option_field in dataclasses.fields(section_field.type):
+            option = option_field.name.upper()
+
+            # Explicit overrides win over the environment, which wins over the configuration file
+            if (section, option) in overrides:
+                value = overrides[(section, option)]
+            elif f'{ENV_PREFIX}{section}_{option}' in environ:
+                value = environ[f'{ENV_PREFIX}{section}_{option}']
+            elif config.has_option(section, option):
+                value = config.get(section, option)
+            elif option_field.default is dataclasses.MISSING:
+                raise KeyError(f"The option, '{option}', does not exist in the section, '{section}'.")
+            else:
+                continue
+            values[option_field.name] = _convert(section, option_field, value)
+        sections[section_field.name] = section_field.type(**values)
+
+    return Settings(**sections)
+
+
+def apply_overrides(settings: Settings, overrides: dict) -> Settings:
+    """
+    Returns a copy of loaded settings with some options overridden, without reading the configuration file again.
+
+    Args:
+        settings (Settings): The settings to override.
+        overrides (dict): Values keyed by (section, option), e.g. {('PERFORMANCE', 'WORKERS'): '4'}.
+
+    Returns:
+        Settings: The overridden settings.
+
+    Raises:
+        KeyError: If an override names an unknown option.
+        ValueError: If a value cannot be converted to the type of its option.
+    """
+
+    _check_overrides(overrides)
+
+    sections = {}
+    for (section, option), value in overrides.items():
+        section_name, option_name = section.lower(), option.lower()
+        option_field = next(item for item in dataclasses.fields(getattr(settings, section_name)) if item.name == option_name)
+        sections.setdefault(section_name, {})[option_name] = _convert(section.upper(), option_field, value)
+
+    return dataclasses.replace(settings, **{section_name: dataclasses.replace(getattr(settings, section_name), **values)
+                                            for section_name, values in sections.items()})
+
+
+@lru_cache(maxsize=None)
+def get_settings(config_file: str = CONFIG_FILE_PATH) -> Settings:
+    """
+    Returns the settings of the configuration file, loading them on the first call only.
+
+    Args:
+        config_file (str, optional): The path to the configuration file. Defaults to 'config.ini'.
+
+    Returns:
+        Settings: The loaded settings.
+    """
+
+    return load_settings(config_file)
+
+
+def parse_overrides(items: list[str]) -> dict:
+    """
+    Parses overrides written as 'SECTION.OPTION=value', e.g. 'PERFORMANCE.WORKERS=4'.
+
+    Args:
+        items (list[str]): The overrides to parse.
+
+    Returns:
+        dict: The values keyed by (section, option).
+
+    Raises:
+        ValueError: If an override is not written as 'SECTION.OPTION=value'.
+    """
+
+    overrides = {}
+    for item in items or []:
+        name, separator, value = item.partition('=')
+        section, dot, option = name.strip().partition('.')
+        if not separator or not dot:
+            raise ValueError(f"Invalid override, expected 'SECTION.OPTION=value': {item}")
+        overrides[(section.strip(), option.strip())] = value.strip()
+    return overrides
+
+
+def _check_overrides(overrides: dict) -> None:
+    """
+    Checks that every override names a known option.
+
+    Args:
+        overrides (dict): Values keyed by (section, option).
+
+    Raises:
+        KeyError: If an override names an unknown option.
+    """
+
+    known_options = {(section_field.name.upper(), option_field.name.upper())
+                     for section_field in dataclasses.fields(Settings)
+                     for option_field in dataclasses.fields(section_field.type)}
+    unknown_overrides = {(section.upper(), option.upper()) for section, option in (overrides or {})} - known_options
+    if unknown_overrides:
+        raise KeyError(f"Unknown configuration options: {sorted(unknown_overrides)}")
+
+
+def _convert(section: str, option_field: dataclasses.Field, value: str):
+    """
+    Converts a configuration value to the type of its option.
+
+    Args:
+        section (str): The section of the option.
+        option_field (dataclasses.Field): The field of the option.
+        value (str): The configuration value.
+
+    Returns:
+        The converted value.
+
+    Raises:
+        ValueError: If the value cannot be converted.
+    """
+
+    name = f"{section}.{option_field.name.upper()}"
+    value = value.strip()
+    try:
+        if 'parse' in option_field.metadata:
+            return option_field.metadata['parse'](value)
+        if option_field.type is bool:
+            return BOOLEAN_VALUES[value.lower()]
+        if option_field.type is int:
+            return int(value)
+        if option_field.type is float:
+            return float(value)
+        if option_field.type is tuple:
+            return tuple(item.strip() for item in value.split(',') if item.strip())
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid value for '{name}' in the configuration: {value!r}") from None
+
+    choices = option_field.metadata.get('choices')
+    if choices and value not in choices:
+        raise ValueError(f"Invalid value for '{name}' in the configuration: {value!r}, expected one of {choices}")
+    return value
@@ -0,0 +1,483 @@
+import pandas as pd
+import importlib.util
+import os
+import shutil
+import sqlite3
+import tempfile
+from abc import ABC, abstractmethod
+from modules.logging_config import Logger
+from modules.readers import FORMATS_BY_EXTENSION, FILTER_OPERATORS
+
+
+logger = Logger()
+
+# The SQL engines, in order of preference
+SQL_ENGINES = ('duckdb', 'sqlite')
+
+# The numeric column types of both engines, without their precision, e.g. DECIMAL(18,3)
+NUMERIC_TYPES = {'TINYINT', 'SMALLINT', 'INT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT', 'UINTEGER',
+                 'UBIGINT', 'UHUGEINT', 'FLOAT', 'REAL', 'DOUBLE', 'DECIMAL', 'NUMERIC'}
+
+# The SQL types of the date columns, as stored by DuckDB and by pandas in SQLite
+DATE_TYPES = {'DATE', 'TIMESTAMP', 'TIMESTAMP_S', 'TIMESTAMP_MS', 'TIMESTAMP_NS', 'TIMESTAMP WITH TIME ZONE', 'TIMESTAMPTZ'}
+
+
+class SqlEngine(ABC):
+    """
+    An embedded SQL database the input files are loaded into, stored on disk so that tables larger than memory spill to it.
+    Each engine implements _connect, _insert and columns, and overrides the SQL expressions its dialect writes differently.
+
+    Attr:
+        name (str): The name of the engine.
+        database (str): The path to the database file.
+        connection: The DB-API connection to the database.
+        first_row_id (int): The rowid of the first row of a table.
+        distinct_operator (str): The operator comparing two values, treating missing values as equal to each other.
+        match_operator (str): The operator matching two key values, treating missing values as equal to each other.
+        greatest (str): The function returning the greatest of its arguments.
+
+    Methods:
+        __init__(database: str = None): Connects to a database file, or to a temporary one deleted on close().
+        load(table: str, path: str, file_format: str = None, columns: list[str] = None, dtypes: dict = None, date_columns: list[str] = None, date_format: str = None, filters: list[tuple] = None, chunk_size: int = 100000): Loads an input file into a table.
+        index(table: str, columns: list[str]): Prepares a table to be joined on some columns.
+        columns(table: str): Returns the columns of a table and their types.
+        scalar(sql: str, params: list = None): Returns the first value of a query.
+        fetch(sql: str, chunk_size: int = 100000): Yields the rows of a query as DataFrames.
+        median(table: str, column: str): Returns the SQL expression of the median of a column.
+        mode(table: str, column: str): Returns the SQL query of the mode of a column.
+        normalize_whitespace(expression: str): Returns the SQL expression of a string with its whitespace normalized.
+        parse_date(expression: str, date_format: str): Returns the SQL expression of a string parsed as a date.
+        literal(value): Returns the SQL literal of a number or string.
+        quote(name: str): Quotes an identifier.
+        close(): Closes the connection and deletes a temporary database.
+        _insert(table: str, chunk: pd.DataFrame, create: bool): Appends a DataFrame to a table.
+        _read_chunks(path: str, file_format: str, columns: list[str], dtypes: dict, chunk_size: int): Yields the rows of an input file as DataFrames.
+    """
+
+    name = None
+    first_row_id = 0
+    distinct_operator = 'IS DISTINCT FROM'
+    match_operator = 'IS NOT DISTINCT FROM'
+    greatest = 'GREATEST'
+
+    def __init__(self, database: str = None) -> None:
+        """
+        Connects to a database file, or to a temporary one deleted on close().
+
+        Args:
+            database (str, optional): The path to the database file. Defaults to None (a temporary file).
+        """
+
+        self._temporary_directory = None
+        if not database:
+            self._temporary_directory = tempfile.mkdtemp(prefix='reconciliation_')
+            database = os.path.join(self._temporary_directory, f'reconciliation.{self.name}')
+        else:
+            os.makedirs(os.path.dirname(database) or '.', exist_ok=True)
+        self.database = database
+        self.connection = self._connect(database)
+
+    @abstractmethod
+    def _connect(self, database: str):
+        """
+        Opens the DB-API connection to a database file.
+
+        Args:
+            database (str): The path to the database file.
+
+        Returns:
+            The connection.
+        """
+
+    def load(self, table: str, path: str, file_format: str = None, columns: list[str] = None, dtypes: dict = None,
+             date_columns: list[str] = None, date_format: str = None, filters: list[tuple] = None,
+             chunk_size: int = 100000) -> None:
+        """
+        Loads an input file into a table chunk by chunk, replacing any table of the same name.
+        Takes the same loading options as read_input.
+
+        Args:
+            table (str): The name of the table.
+            path (str): The path to the input file.
+            file_format (str, optional): 'csv', 'parquet' or 'feather'. Defaults to None (select by file extension).
+            columns (list[str], optional): The columns to load. Defaults to None (all columns).
+            dtypes (dict, optional): The dtypes of the columns, keyed by column. Defaults to None (inferred).
+            date_columns (list[str], optional): The columns to parse as dates. Defaults to None.
+            date_format (str, optional): The strftime format of the date columns. Defaults to None (inferred).
+            filters (list[tuple], optional): (column, operator, value) filters the rows must match. Defaults to None.
+            chunk_size (int, optional): The number of rows loaded at a time. Defaults to 100000.
+
+        Raises:
+            ValueError: If the file format is not supported.
+        """
+
+        if not file_format:
+            file_format = FORMATS_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+        if file_format not in FORMATS_BY_EXTENSION.values():
+            raise ValueError(f"Unsupported input format for {path}: {file_format}")
+
+        self.connection.execute(f'DROP TABLE IF EXISTS {self.quote(table)}')
+        date_columns = [col for col in (date_columns or []) if columns is None or col in columns]
+
+        # Load the columns the filters need, even when they are not selected
+        filter_columns = []
+        if filters and columns is not None:
+            filter_columns = [col for col in dict.fromkeys(col for col, _, _ in filters) if col not in columns]
+
+        create = True
+        read_columns = columns + filter_columns if columns is not None else None
+        for chunk in self._read_chunks(path, file_format, read_columns, dtypes or {}, chunk_size):
+            for col in date_columns:
+                chunk[col] = pd.to_datetime(chunk[col], format=date_format)
+
+            # Apply the filters to every chunk
+            if filters:
+                mask = pd.Series(True, index=chunk.index)
+                for col, op, value in filters:
+                    mask &= FILTER_OPERATORS[op](chunk[col], value)
+                chunk = chunk.loc[mask]
+            if filter_columns:
+                chunk = chunk.drop(columns=filter_columns)
+
+            self._insert(table, chunk, create)
+            create = False
+
+    def _read_chunks(self, path: str, file_format: str, columns: list[str], dtypes: dict, chunk_size: int):
+        """
+        Yields the rows of an input file as DataFrames of at most chunk_size rows.
+
+        Args:
+            path (str): The path to the input file.
+            file_format (str): 'csv', 'parquet' or 'feather'.
+            columns (list[str]): The columns to load, or None for all columns.
+            dtypes (dict): The dtypes of the columns, keyed by column.
+            chunk_size (int): The number of rows per chunk.
+
+        Yields:
+            pd.DataFrame: The rows of the next chunk.
+        """
+
+        if file_format == 'csv':
+            with pd.read_csv(path, usecols=columns, dtype=dtypes or None, chunksize=chunk_size) as reader:
+                yield from reader
+            return
+
+        import pyarrow.ipc
+        import pyarrow.parquet as pq
+
+        if file_format == 'parquet':
+            batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+        else:
+            reader = pyarrow.ipc.open_file(path)
+            batches = (reader.get_batch(index) for index in range(reader.num_record_batches))
+        for batch in batches:
+            chunk = batch.to_pandas()
+            yield (chunk[columns] if columns else chunk).astype(dtypes)
+
+    @abstractmethod
+    def _insert(self, table: str, chunk: pd.DataFrame, create: bool) -> None:
+        """
+        Appends a DataFrame to a table.
+
+        Args:
+            table (str): The name of the table.
+            chunk (pd.DataFrame): The rows to append.
+            create (bool): Whether the table must be created first.
+        """
+
+    def index(self, table: str, columns: list[str]) -> None:
+        """
+        Prepares a table to be joined on some columns. Engines with hash joins need nothing.
+
+        Args:
+            table (str): The name of the table.
+            columns (list[str]): The join columns.
+        """
+
+    @abstractmethod
+    def columns(self, table: str) -> dict:
+        """
+        Returns the columns of a table and their types.
+
+        Args:
+            table (str): The name of the table.
+
+        Returns:
+            dict: The upper-case SQL type of each column, in table order.
+        """
+
+    def scalar(self, sql: str, params: list = None):
+        """
+        Returns the first value of a query.
+
+        Args:
+            sql (str): The query.
+            params (list, optional): The query parameters. Defaults to None.
+
+        Returns:
+            The first value of the first row.
+        """
+
+        return self.connection.execute(sql, params or []).fetchone()[0]
+
+    def fetch(self, sql: str, chunk_size: int = 100000):
+        """
+        Yields the rows of a query as DataFrames, so that large results never have to fit in memory at once.
+
+        Args:
+            sql (str): The query.
+            chunk_size (int, optional): The number of rows per DataFrame. Defaults to 100000.
+
+        Yields:
+            pd.DataFrame: The next rows of the result.
+        """
+
+        cursor = self.connection.execute(sql)
+        names = [description[0] for description in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield pd.DataFrame.from_records(rows, columns=names)
+
+    def median(self, table: str, column: str) -> str:
+        """
+        Returns the SQL query of the median of a column, ignoring missing values.
+
+        Args:
+            table (str): The name of the table.
+            column (str): The name of the column.
+
+        Returns:
+            str: The query.
+        """
+
+        table, column = self.quote(table), self.quote(column)
+        count = f'(SELECT COUNT({column}) FROM {table})'
+        return (f'SELECT AVG({column}) FROM (SELECT {column} FROM {table} WHERE {column} IS NOT NULL '
+                f'ORDER BY {column} LIMIT 2 - {count} % 2 OFFSET ({count} - 1) / 2)')
+
+    def mode(self, table: str, column: str) -> str:
+        """
+        Returns the SQL query of the mode of a column: the smallest of its most frequent non-missing values.
+
+        Args:
+            table (str): The name of the table.
+            column (str): The name of the column.
+
+        Returns:
+            str: The query, returning NULL if the column has no values.
+        """
+
+        table, column = self.quote(table), self.quote(column)
+        return (f'SELECT (SELECT {column} FROM {table} WHERE {column} IS NOT NULL GROUP BY {column} '
+                f'ORDER BY COUNT(*) DESC, {column} LIMIT 1)')
+
+    def normalize_whitespace(self, expression: str) -> str:
+        """
+        Returns the SQL expression of a string without leading, trailing and repeated whitespace.
+
+        Args:
+            expression (str): The SQL expression of the string.
+
+        Returns:
+            str: The normalized expression.
+        """
+
+        return f'TRIM({expression})'
+
+    def parse_date(self, expression: str, date_format: str) -> str:
+        """
+        Returns the SQL expression of a string parsed as a date, or None if the engine cannot parse dates.
+
+        Args:
+            expression (str): The SQL expression of the string.
+            date_format (str): The strftime format of the string, or '' to infer it.
+
+        Returns:
+            str: The parsed expression, or None.
+        """
+
+        return None
+
+    @staticmethod
+    def literal(value) -> str:
+        """
+        Returns the SQL literal of a number or string, e.g. a file path or a filter value.
+
+        Args:
+            value: The number or string.
+
+        Returns:
+            str: The literal.
+        """
+
+        if isinstance(value, (int, float)):
+            return repr(value)
+        return "'" + str(value).replace("'", "''") + "'"
+
+    @staticmethod
+    def quote(name: str) -> str:
+        """
+        Quotes an identifier, e.g. a column name with spaces.
+
+        Args:
+            name (str): The identifier.
+
+        Returns:
+            str: The quoted identifier.
+        """
+
+        return '"' + str(name).replace('"', '""') + '"'
+
+    def close(self) -> None:
+        """Closes the connection and deletes a temporary database."""
+
+        self.connection.close()
+        if self._temporary_directory is not None:
+            shutil.rmtree(self._temporary_directory, ignore_errors=True)
+
+
+class DuckDBEngine(SqlEngine):
+    """A DuckDB database, which reads CSV and Parquet files natively and spills large joins and sorts to disk."""
+
+    name = 'duckdb'
+
+    def _connect(self, database: str):
+        import duckdb
+
+        return duckdb.connect(database)
+
+    def load(self, table: str, path: str, file_format: str = None, columns: list[str] = None, dtypes: dict = None,
+             date_columns: list[str] = None, date_format: str = None, filters: list[tuple] = None,
+             chunk_size: int = 100000) -> None:
+        if not file_format:
+            file_format = FORMATS_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+        if file_format not in ('csv', 'parquet') or dtypes:
+            # Let pandas read Feather files and apply explicit dtypes
+            super().load(table, path, file_format, columns, dtypes, date_columns, date_format, filters, chunk_size)
+            return
+
+        # Read the file with DuckDB itself, pushing the column selection and filters down to the reader
+        reader = 'read_csv_auto' if file_format == 'csv' else 'read_parquet'
+        selection = ', '.join(self.quote(col) for col in columns) if columns else '*'
+        conditions = ' AND '.join(f'{self.quote(col)} {op if op != "==" else "="} {self.literal(value)}'
+                                  for col, op, value in filters or [])
+        self.connection.execute(f'DROP TABLE IF EXISTS {self.quote(table)}')
+        self.connection.execute(f'CREATE TABLE {self.quote(table)} AS SELECT {selection} FROM {reader}({self.literal(path)})'
+                                + (f' WHERE {conditions}' if conditions else ''))
+
+        # Parse the date columns that were not detected as dates
+        types = self.columns(table)
+        for col in date_columns or []:
+            if col in types and types[col] in ('VARCHAR', 'TEXT'):
+                parsed = self.parse_date(self.quote(col), date_format or '')
+                self.connection.execute(f'ALTER TABLE {self.quote(table)} ALTER {self.quote(col)} TYPE TIMESTAMP '
+                                        f'USING {parsed}')
+
+    def _insert(self, table: str, chunk: pd.DataFrame, create: bool) -> None:
+        self.connection.register('_chunk', chunk)
+        if create:
+            self.connection.execute(f'CREATE TABLE {self.quote(table)} AS SELECT * FROM _chunk')
+        else:
+            self.connection.execute(f'INSERT INTO {self.quote(table)} SELECT * FROM _chunk')
+        self.connection.unregister('_chunk')
+
+    def columns(self, table: str) -> dict:
+        rows = self.connection.execute(f'DESCRIBE {self.quote(table)}').fetchall()
+        return {row[0]: str(row[1]).upper() for row in rows}
+
+    def median(self, table: str, column: str) -> str:
+        return f'SELECT MEDIAN({self.quote(column)}) FROM {self.quote(table)}'
+
+    def normalize_whitespace(self, expression: str) -> str:
+        return f"REGEXP_REPLACE(TRIM({expression}), '\\s+', ' ', 'g')"
+
+    def parse_date(self, expression: str, date_format: str) -> str:
+        if date_format:
+            return f'TRY_STRPTIME({expression}, {self.literal(date_format)})'
+        return f'TRY_CAST({expression} AS TIMESTAMP)'
+
+
+class SQLiteEngine(SqlEngine):
+    """
+    A SQLite database, used when DuckDB is not installed. The files are loaded through pandas chunk by chunk,
+    and dates are stored as ISO 8601 strings, so that they sort and compare chronologically.
+    """
+
+    name = 'sqlite'
+    first_row_id = 1
+    distinct_operator = 'IS NOT'
+    match_operator = 'IS'
+    greatest = 'MAX'
+
+    def _connect(self, database: str):
+        return sqlite3.connect(database)
+
+    def index(self, table: str, columns: list[str]) -> None:
+        # SQLite joins with nested loops, so look the keys up in an index
+        index_name = self.quote(f'{table}_keys')
+        self.connection.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {self.quote(table)} '
+                                f'({", ".join(self.quote(col) for col in columns)})')
+
+    def _insert(self, table: str, chunk: pd.DataFrame, create: bool) -> None:
+        chunk.to_sql(table, self.connection, if_exists='replace' if create else 'append', index=False)
+
+    def columns(self, table: str) -> dict:
+        rows = self.connection.execute(f'PRAGMA table_info({self.quote(table)})').fetchall()
+        return {row[1]: str(row[2]).upper() for row in rows}
+
+
+def connect_engine(name: str, database: str = None) -> SqlEngine:
+    """
+    Connects to an embedded SQL engine, falling back to SQLite when DuckDB is not installed.
+
+    Args:
+        name (str): 'duckdb' or 'sqlite'.
+        database (str, optional): The path to the database file. Defaults to None (a temporary file).
+
+    Returns:
+        SqlEngine: The connected engine.
+
+    Raises:
+        ValueError: If the engine is not supported.
+    """
+
+    if name not in SQL_ENGINES:
+        raise ValueError(f"Unsupported SQL engine: {name}")
+
+    if name == 'duckdb' and importlib.util.find_spec('duckdb') is None:
+        logger.warning("DuckDB is not installed (pip install duckdb); falling back to SQLite.")
+        name = 'sqlite'
+
+    engine = DuckDBEngine(database) if name == 'duckdb' else SQLiteEngine(database)
+    logger.info(f"Loading the files into the {engine.name} database {engine.database}")
+    return engine
+
+
+def is_numeric_type(sql_type: str) -> bool:
+    """
+    Returns whether a SQL column type is numeric.
+
+    Args:
+        sql_type (str): The upper-case SQL type.
+
+    Returns:
+        bool: Whether the type is numeric.
+    """
+
+    return sql_type.split('(')[0].strip() in NUMERIC_TYPES
+
+
+def is_date_type(sql_type: str) -> bool:
+    """
+    Returns whether a SQL column type is a date or timestamp.
+
+    Args:
+        sql_type (str): The upper-case SQL type.
+
+    Returns:
+        bool: Whether the type is a date or timestamp.
+    """
+
+    return sql_type.split('(')[0].strip() in DATE_TYPES
@@ -0,0 +1,562 @@
+import pandas as pd
+import math
+import os
+from modules.logging_config import Logger
+from modules.settings import Settings, get_settings
+from modules.comparison import ColumnRule
+from modules.report_writer import DiffReportWriter
+from modules.instrumentation import RunReport
+from modules.profiler import FLOAT_REL_TOL, FLOAT_STATISTICS
+from modules.result import ReconciliationResult
+from modules.sql_engine import connect_engine, is_date_type, is_numeric_type
+
+
+logger = Logger()
+
+# The column types compared as strings by the case and whitespace rules
+TEXT_TYPES = ('VARCHAR', 'TEXT', 'STRING', 'CHAR')
+
+
+class SqlValidator:
+    """
+    A class to run the reconciliation checks as SQL in an embedded DuckDB or SQLite database,
+    for files that do not fit in memory.
+
+    Both files are loaded into tables of an on-disk database, and the row count, column, min/max, median,
+    mode, profile and full outer join checks run as queries, so the engine spills to disk instead of holding the files
+    in memory. The checks are recorded in the same ReconciliationResult as the pandas validator.
+
+    Attr:
+        source_file (str): The path to the source file.
+        target_file (str): The path to the target file.
+        key_columns (list[str]): The columns used to join rows between the files. Rows are compared by position if empty.
+        settings (Settings): The settings of the run.
+        load_options (dict): The read_input options the files are loaded with.
+        engine (SqlEngine): The database the files are loaded into during a run.
+        types (dict): The SQL type of each column of the 'source' and 'target' tables.
+        diff_counts (dict): The number of changed, source-only and target-only rows.
+        run_report (RunReport): The timing and memory metrics of each validation stage of the last run.
+        result (ReconciliationResult): The status of each check of the last run.
+
+    Methods:
+        __init__(source_file: str, target_file: str, key_columns: list[str] = None, settings: Settings = None, load_options: dict = None): Initializes the SqlValidator.
+        validate(output_path: str = 'assets/outputs/diff.html', fail_fast: bool = None): Runs all validation checks on the files.
+        load(): Loads both files into the database.
+        row_count_validation(): Validates that both tables have the same number of rows.
+        column_validation(): Validates that both tables have the same columns.
+        data_validation(output_path: str): Joins both tables and saves the changed, source-only and target-only rows.
+        numeric_column_extra_validations(): Checks the min/max, median, mode and profile of the numeric columns.
+        date_column_extra_validations(): Checks the min/max and mode of the date columns.
+        min_max_check(datatype: str, columns: list[str]): Compares the minimum and maximum values of columns.
+        median_check(datatype: str, columns: list[str]): Compares the medians of columns.
+        mode_check(datatype: str, columns: list[str]): Compares the modes of columns.
+        profile_check(datatype: str, columns: list[str]): Compares the null count, distinct count, sum and mean of columns.
+        _join_condition(left: str, right: str): Returns the SQL condition matching the rows of two tables.
+        _difference(column: str): Returns the SQL expression indicating whether a cell differs.
+        _save_unmatched(output_path: str): Saves the rows that only exist in one table.
+    """
+
+    def __init__(self, source_file: str, target_file: str, key_columns: list[str] = None, settings: Settings = None,
+                 load_options: dict = None) -> None:
+        """
+        Initializes the SqlValidator class with two files.
+
+        Args:
+            source_file (str): The path to the source file.
+            target_file (str): The path to the target file.
+            key_columns (list[str], optional): The columns used to join rows between the files. Defaults to None (compare by position).
+            settings (Settings, optional): The settings of the run. Defaults to the settings of 'config.ini'.
+            load_options (dict, optional): The read_input options the files are loaded with. Defaults to None.
+        """
+
+        self.source_file = source_file
+        self.target_file = target_file
+        self.key_columns = list(key_columns) if key_columns else []
+        self.settings = settings or get_settings()
+        self.load_options = load_options or {}
+        self.engine = None
+        self.types = {}
+        self.diff_counts = {}
+        self.run_report = None
+        self.result = ReconciliationResult()
+
+    def validate(self, output_path: str = 'assets/outputs/diff.html', fail_fast: bool = None) -> ReconciliationResult:
+        """
+        Loads both files into the database and runs all validation checks on them.
+        The database is closed, and deleted if temporary, even if a check raises.
+
+        Args:
+            output_path (str, optional): The path to save the HTML summary of the differences. Defaults to 'assets/outputs/diff.html'.
+            fail_fast (bool, optional): Whether to skip the remaining checks after the first failed check.
+                Defaults to the 'FAIL_FAST' setting.
+
+        Returns:
+            ReconciliationResult: The status, metrics and saved differences of each check.
+        """
+
+        fail_fast = self.settings.reconciliation.fail_fast if fail_fast is None else fail_fast
+        self.result = ReconciliationResult()
+        self.diff_counts = {}
+        self.run_report = RunReport(profile=self.settings.instrumentation.cprofile,
+                                    trace_memory=self.settings.instrumentation.tracemalloc)
+
+        stages = [
+            ('load', self.load),
+            ('row_count_validation', self.row_count_validation),
+            ('column_validation', self.column_validation),
+            ('data_validation', lambda: self.data_validation(output_path)),
+            ('numeric_column_extra_validations', self.numeric_column_extra_validations),
+            ('date_column_extra_validations', self.date_column_extra_validations),
+        ]
+        self.engine = connect_engine(self.settings.engine.backend, self.settings.engine.database or None)
+        try:
+            for name, check in stages:
+                with self.run_report.stage(name) as stage:
+                    check()
+                    if name == 'data_validation':
+                        stage['diff_counts'] = self.diff_counts
+
+                if fail_fast and not self.result.passed:
+                    logger.error(f"Stopping after {name}, since a check failed.")
+                    self.result.stopped_early = True
+                    break
+        finally:
+            self.engine.close()
+            self.run_report.save(self.settings.instrumentation)
+            self.run_report.close()
+
+        self.result.diff_counts = self.diff_counts
+        self.result.run_report = self.run_report.to_dict()
+        return self.result
+
+    def load(self) -> None:
+        """Loads both files into the 'source' and 'target' tables, indexing the key columns."""
+
+        chunk_size = self.settings.streaming.chunk_size
+        for table, path in (('source', self.source_file), ('target', self.target_file)):
+            self.engine.load(table, path, chunk_size=chunk_size, **self.load_options)
+            self.types[table] = self.engine.columns(table)
+            if self.key_columns and all(col in self.types[table] for col in self.key_columns):
+                self.engine.index(table, self.key_columns)
+
+    def row_count_validation(self) -> None:
+        """Validates that both tables have the same number of rows."""
+
+        # Get the number of rows for each table
+        source_count = self.engine.scalar('SELECT COUNT(*) FROM source')
+        target_count = self.engine.scalar('SELECT COUNT(*) FROM target')
+
+        logger.info(f"Source record count: {source_count}")
+        logger.info(f"Target record count: {target_count}")
+
+        counts = {'source_rows': source_count, 'target_rows': target_count}
+        if source_count == target_count:
+            logger.info("Row counts are the same.")
+            self.result.add('row_count', 'passed', "Row counts are the same.", **counts)
+        elif self.key_columns:
+            # Unmatched rows are reported by the key-based data validation
+            logger.warning("Row counts are different.")
+            self.result.add('row_count', 'warning', "Row counts are different.", **counts)
+        else:
+            logger.error("Row counts are different.")
+            self.result.add('row_count', 'failed', "Row counts are different.", **counts)
+
+    def column_validation(self) -> None:
+        """Validates that both tables have the same columns and column counts."""
+
+        source_columns, target_columns = list(self.types['source']), list(self.types['target'])
+        logger.info(f"Source columns: {len(source_columns)}.")
+        logger.info(f"Target columns: {len(target_columns)}.")
+
+        # Obtain any missing columns
+        missing_source_columns = set(target_columns) - set(source_columns)
+        missing_target_columns = set(source_columns) - set(target_columns)
+
+        if missing_source_columns:
+            logger.error(f"Columns missing in the source table: {missing_source_columns}.")
+        if missing_target_columns:
+            logger.error(f"Columns missing in the target table: {missing_target_columns}.")
+
+        metrics = {'source_columns': len(source_columns), 'target_columns': len(target_columns),
+                   'missing_source_columns': sorted(map(str, missing_source_columns)),
+                   'missing_target_columns': sorted(map(str, missing_target_columns))}
+        if not missing_source_columns and not missing_target_columns:
+            logger.info("All column names match and there are no missing columns.")
+            self.result.add('columns', 'passed', "All column names match.", **metrics)
+        else:
+            self.result.add('columns', 'failed', "Columns are missing.", **metrics)
+
+    def data_validation(self, output_path: str) -> None:
+        """
+        Join both tables, on the key columns or by position, and compare the matched rows cell by cell in SQL.
+        The differing cells are streamed to a long-format file summarized in the HTML file at the output path,
+        and unmatched rows are saved to CSV files next to it.
+
+        Args:
+            output_path (str): The path to save the HTML summary of the differences.
+        """
+
+        # Check if the columns in both tables are the same, skip the comparison if not
+        columns = list(self.types['source'])
+        if set(columns) != set(self.types['target']):
+            logger.warning("Tables do not have the same columns.")
+            self.result.add('data', 'error', "Tables do not have the same columns.")
+            return
+
+        missing_key_columns = [col for col in self.key_columns if col not in columns]
+        if missing_key_columns:
+            logger.error(f"Key columns missing in the tables: {missing_key_columns}.")
+            self.result.add('data', 'error', f"Key columns missing in the tables: {missing_key_columns}.")
+            return
+
+        # Duplicate keys match many-to-many, so flag them up front
+        quote = self.engine.quote
+        metrics = {}
+        if self.key_columns:
+            keys = ', '.join(quote(col) for col in self.key_columns)
+            for table in ('source', 'target'):
+                duplicate_key_count = int(self.engine.scalar(
+                    f'SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM {table} GROUP BY {keys} HAVING COUNT(*) > 1)'))
+                metrics[f'{table}_duplicate_keys'] = duplicate_key_count
+                if duplicate_key_count:
+                    logger.warning(f"{table.capitalize()} has {duplicate_key_count} rows with duplicate keys on {self.key_columns}.")
+
+        join_condition = self._join_condition('s', 't')
+        matched_count = int(self.engine.scalar(f'SELECT COUNT(*) FROM source s JOIN target t ON {join_condition}'))
+
+        # Compare the matched rows, fetching only the rows with differences
+        writer = DiffReportWriter(output_path, file_format=self.settings.report.format, top_n=self.settings.report.top_n)
+        value_columns = [col for col in columns if col not in self.key_columns]
+        if value_columns:
+            if self.key_columns:
+                key_selection = [f's.{quote(col)} AS _k{index}' for index, col in enumerate(self.key_columns)]
+            else:
+                key_selection = [f's.rowid - {self.engine.first_row_id} AS _k0']
+            selection = key_selection + [expression for index, col in enumerate(value_columns)
+                                         for expression in (f's.{quote(col)} AS _s{index}', f't.{quote(col)} AS _t{index}',
+                                                            f'{self._difference(col)} AS _d{index}')]
+            differing = ' OR '.join(f'_d{index}' for index in range(len(value_columns)))
+            order = ', '.join(f'_k{index}' for index in range(len(key_selection)))
+            sql = (f'SELECT * FROM (SELECT {", ".join(selection)} FROM source s JOIN target t ON {join_condition}) '
+                   f'WHERE {differing} ORDER BY {order}')
+
+            for chunk in self.engine.fetch(sql, self.settings.streaming.chunk_size):
+                keys = chunk[[f'_k{index}' for index in range(len(key_selection))]].set_axis(self.key_columns or ['row'], axis=1)
+                source = chunk[[f'_s{index}' for index in range(len(value_columns))]].set_axis(value_columns, axis=1)
+                target = chunk[[f'_t{index}' for index in range(len(value_columns))]].set_axis(value_columns, axis=1)
+                differences = chunk[[f'_d{index}' for index in range(len(value_columns))]].astype(bool).set_axis(value_columns, axis=1)
+                writer.write(keys, source, target, differences)
+
+        self.diff_counts = {'changed': writer.row_count}
+        unmatched_paths = self._save_unmatched(output_path)
+        writer.close(write_summary=writer.row_count > 0)
+
+        logger.info(f"Matched rows: {matched_count}.")
+        logger.info(f"Source-only rows: {self.diff_counts['source_only']}.")
+        logger.info(f"Target-only rows: {self.diff_counts['target_only']}.")
+        logger.info(f"Changed rows: {self.diff_counts['changed']}.")
+
+        metrics = {**self.diff_counts, 'matched': matched_count, **metrics}
+        if not any(self.diff_counts.values()):
+            logger.info("There are no differences between the datasets.")
+            self.result.add('data', 'passed', "There are no differences between the datasets.", **metrics)
+            return
+        else:
+            logger.warning("There are differences between the datasets.")
+            self.result.add('data', 'failed', "There are differences between the datasets.", **metrics)
+
+        if self.diff_counts['changed']:
+            self.result.outputs.update({'cells': writer.cells_path, 'html': output_path})
+            logger.info(f"{sum(writer.cell_counts.values())} differing cells saved to {writer.cells_path}, "
+                        f"and summarized in {output_path}")
+        for name, path in unmatched_paths.items():
+            self.result.outputs[name] = path
+            logger.info(f"{self.diff_counts[name]} {name.replace('_', '-')} rows saved to {path}")
+
+    def _join_condition(self, left: str, right: str) -> str:
+        """
+        Returns the SQL condition matching the rows of two tables, on the key columns or by position.
+        Missing key values match each other, like in the pandas join.
+
+        Args:
+            left (str): The alias of the first table.
+            right (str): The alias of the second table.
+
+        Returns:
+            str: The join condition.
+        """
+
+        if not self.key_columns:
+            return f'{left}.rowid = {right}.rowid'
+        return ' AND '.join(f'{left}.{self.engine.quote(col)} {self.engine.match_operator} {right}.{self.engine.quote(col)}'
+                            for col in self.key_columns)
+
+    def _difference(self, column: str) -> str:
+        """
+        Returns the SQL expression indicating whether a cell differs between the joined 's' and 't' tables,
+        applying the comparison rule of its column like compare_columns.
+
+        Args:
+            column (str): The name of the column.
+
+        Returns:
+            str: The boolean expression.
+        """
+
+        rules = dict(self.settings.comparison.rules)
+        rule = rules.get(column, rules.get('*')) or ColumnRule()
+        sql_type = self.types['source'][column]
+        source, target = f's.{self.engine.quote(column)}', f't.{self.engine.quote(column)}'
+
+        # Normalize both sides of string columns before comparing them
+        if sql_type.startswith(TEXT_TYPES):
+            if rule.date_format is not None:
+                if self.engine.parse_date(source, rule.date_format) is None:
+                    logger.warning(f"The {self.engine.name} engine cannot parse dates; comparing {column} as strings.")
+                else:
+                    source, target = (self.engine.parse_date(value, rule.date_format) for value in (source, target))
+            else:
+                if rule.ignore_whitespace:
+                    source, target = (self.engine.normalize_whitespace(value) for value in (source, target))
+                if rule.ignore_case:
+                    source, target = f'LOWER({source})', f'LOWER({target})'
+
+        if (rule.abs_tol or rule.rel_tol) and is_numeric_type(sql_type):
+            tolerance = f'{rule.abs_tol!r} + {rule.rel_tol!r} * {self.engine.greatest}(ABS({source}), ABS({target}))'
+            different = f'NOT (ABS({source} - {target}) <= {tolerance})'
+        else:
+            different = f'{source} <> {target}'
+
+        # A missing value differs from any value, and from another missing value unless nulls are equal
+        both_null = 'FALSE' if self.settings.comparison.null_equals_null else 'TRUE'
+        return (f'CASE WHEN {source} IS NULL AND {target} IS NULL THEN {both_null} '
+                f'WHEN {source} IS NULL OR {target} IS NULL THEN TRUE ELSE {different} END')
+
+    def _save_unmatched(self, output_path: str) -> dict:
+        """
+        Saves the rows that only exist in one table to CSV files next to the output path, chunk by chunk.
+
+        Args:
+            output_path (str): The path to save the HTML summary of the differences.
+
+        Returns:
+            dict: The paths of the saved files, keyed by 'source_only' and 'target_only'.
+        """
+
+        output_root = os.path.splitext(output_path)[0]
+        paths = {}
+        for name, table, other in (('source_only', 'source', 'target'), ('target_only', 'target', 'source')):
+            path = f'{output_root}_{name}.csv'
+            if os.path.exists(path):
+                os.remove(path)
+
+            # Rows compared by position are identified by their position, like in the pandas validator
+            position = '' if self.key_columns else f'x.rowid - {self.engine.first_row_id} AS _row, '
+            sql = (f'SELECT {position}x.* FROM {table} x '
+                   f'WHERE NOT EXISTS (SELECT 1 FROM {other} y WHERE {self._join_condition("x", "y")}) ORDER BY x.rowid')
+
+            self.diff_counts[name] = 0
+            for chunk in self.engine.fetch(sql, self.settings.streaming.chunk_size):
+                if not self.key_columns:
+                    chunk = chunk.set_index('_row').rename_axis(None)
+                chunk.to_csv(path, mode='a', header=not os.path.exists(path), index=not self.key_columns)
+                self.diff_counts[name] += len(chunk)
+            if self.diff_counts[name]:
+                paths[name] = path
+        return paths
+
+    def numeric_column_extra_validations(self) -> None:
+        """
+        Retrieves numeric-type columns based on the configuration settings, and checks their min/max, median,
+        mode and profile, like the pandas validator.
+        """
+
+        try:
+            if self.settings.column_types.auto_numeric_discover:
+                numeric_columns = [col for col, sql_type in self.types['source'].items() if is_numeric_type(sql_type)]
+            else:
+                numeric_columns = list(self.settings.column_types.numeric)
+
+            self.min_max_check(datatype='Numeric', columns=numeric_columns)
+            self.median_check(datatype='Numeric', columns=numeric_columns)
+            self.mode_check(datatype='Numeric', columns=numeric_columns)
+            self.profile_check(datatype='Numeric', columns=numeric_columns)
+        except Exception as e:
+            logger.error(f"Error while retrieving the numeric-type columns: {e}")
+            self.result.add('numeric_columns', 'error', f"Error while retrieving the numeric-type columns: {e}")
+
+    def date_column_extra_validations(self) -> None:
+        """
+        Retrieves date-type columns, every column stored as a date if 'AUTO_DATE_DISCOVER' is enabled like the pandas validator,
+        otherwise from the configuration settings, and checks their min/max and mode.
+        """
+
+        try:
+            if self.settings.column_types.auto_date_discover:
+                date_columns = [col for col, sql_type in self.types['source'].items() if is_date_type(sql_type)]
+            else:
+                date_columns = list(self.settings.column_types.date)
+            self.min_max_check(datatype='Date', columns=date_columns)
+            self.mode_check(datatype='Date', columns=date_columns)
+        except Exception as e:
+            logger.error(f"Error while retrieving the date-type columns: {e}")
+            self.result.add('date_columns', 'error', f"Error while retrieving the date-type columns: {e}")
+
+    def min_max_check(self, datatype: str, columns: list[str]) -> None:
+        """
+        Checks the minimum and maximum values of specified columns in both tables, in one query per table.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            columns (list): The list of columns to check for minimum and maximum values.
+        """
+
+        logger.info(f"Checking the MIN and MAX values for these {datatype} columns: {list(columns)}")
+        if not columns:
+            self.result.add_mismatches(f'{datatype.lower()}_min_max', pd.Series(dtype=bool))
+            return
+
+        aggregates = ', '.join(f'MIN({self.engine.quote(col)}), MAX({self.engine.quote(col)})' for col in columns)
+        source_values = self.engine.connection.execute(f'SELECT {aggregates} FROM source').fetchone()
+        target_values = self.engine.connection.execute(f'SELECT {aggregates} FROM target').fetchone()
+
+        mismatches = pd.Series(False, index=columns)
+        for index, col in enumerate(columns):
+            min1, max1 = source_values[2 * index:2 * index + 2]
+            min2, max2 = target_values[2 * index:2 * index + 2]
+
+            # Check if the min and max values match between the two tables
+            if (min1, max1) != (min2, max2):
+                mismatches[col] = True
+                logger.warning(f"Value range mismatch in column {col}: "
+                               f"Source: (min: {min1}, max: {max1}), "
+                               f"Target: (min: {min2}, max: {max2})")
+            else:
+                logger.info(f"The min and max values match between both datasets for the column: {col}: "
+                            f"Source: (min: {min1}, max: {max1}), "
+                            f"Target: (min: {min2}, max: {max2})")
+
+        self.result.add_mismatches(f'{datatype.lower()}_min_max', mismatches)
+
+    def median_check(self, datatype: str, columns: list[str]) -> None:
+        """
+        Checks the median values for specified columns in both tables and logs any discrepancies.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            columns (list): The list of columns to check for the median value.
+        """
+
+        try:
+            logger.info(f"Checking the median values for these columns: {list(columns)}")
+            mismatches = pd.Series(False, index=columns)
+            for col in columns:
+                med1 = self.engine.scalar(self.engine.median('source', col))
+                med2 = self.engine.scalar(self.engine.median('target', col))
+
+                # Check if the median values match between the two tables
+                if med1 != med2:
+                    mismatches[col] = True
+                    logger.warning(f"Median mismatch in column {col}: "
+                                   f"Dataset1 (median: {med1}), "
+                                   f"Dataset2 (median: {med2})")
+                else:
+                    logger.info(f"The median values matched between both datasets for the column: {col}: "
+                                f"Dataset1 (median: {med1}), "
+                                f"Dataset2 (median: {med2})")
+
+            self.result.add_mismatches(f'{datatype.lower()}_median', mismatches)
+        except Exception as e:
+            logger.error(f"Error during median check: {e}")
+            self.result.add(f'{datatype.lower()}_median', 'error', f"Error during median check: {e}")
+
+    def mode_check(self, datatype: str, columns: list[str]) -> None:
+        """
+        Checks the mode values for specified columns in both tables and logs any discrepancies.
+        Like the pandas validator, the mode is the smallest of the most frequent non-missing values.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            columns (list): The list of columns to check for the mode value.
+        """
+
+        try:
+            logger.info(f"Checking the mode values for these columns: {list(columns)}")
+            mismatches = pd.Series(False, index=columns)
+            for col in columns:
+                mode1 = self.engine.scalar(self.engine.mode('source', col))
+                mode2 = self.engine.scalar(self.engine.mode('target', col))
+
+                # Check if the mode values match between the two tables
+                if mode1 != mode2:
+                    mismatches[col] = True
+                    logger.warning(f"Mode mismatch in column {col}: "
+                                   f"Dataset1 (mode: {mode1}), "
+                                   f"Dataset2 (mode: {mode2})")
+                else:
+                    logger.info(f"The mode values matched between both datasets for the column: {col}: "
+                                f"Dataset1 (mode: {mode1}), "
+                                f"Dataset2 (mode: {mode2})")
+
+            self.result.add_mismatches(f'{datatype.lower()}_mode', mismatches)
+        except Exception as e:
+            logger.error(f"Error during mode check: {e}")
+            self.result.add(f'{datatype.lower()}_mode', 'error', f"Error during mode check: {e}")
+
+    def profile_check(self, datatype: str, columns: list[str]) -> None:
+        """
+        Checks the null count, distinct count, sum and mean of specified columns in both tables, in one query per table.
+
+        Args:
+            datatype (str): The datatype of the columns being checked.
+            columns (list): The list of columns to check.
+        """
+
+        logger.info(f"Checking the null count, distinct count, sum and mean for these {datatype} columns: {list(columns)}")
+        statistics = ['nulls', 'distinct', 'sum', 'mean']
+        if not columns:
+            self.result.add_mismatches(f'{datatype.lower()}_profile', pd.Series(dtype=bool))
+            return
+
+        aggregates = ', '.join(f'COUNT(*) - COUNT({col}), COUNT(DISTINCT {col}), SUM({col}), AVG({col})'
+                               for col in map(self.engine.quote, columns))
+        source_values = self.engine.connection.execute(f'SELECT {aggregates} FROM source').fetchone()
+        target_values = self.engine.connection.execute(f'SELECT {aggregates} FROM target').fetchone()
+
+        mismatches = pd.Series(False, index=columns)
+        for index, col in enumerate(columns):
+            profile1 = dict(zip(statistics, source_values[4 * index:4 * index + 4]))
+            profile2 = dict(zip(statistics, target_values[4 * index:4 * index + 4]))
+            summary = ", ".join(f"{statistic}: {profile1[statistic]} / {profile2[statistic]}" for statistic in statistics)
+
+            # Check if the profiles match between the two tables, the float sum and mean within a relative tolerance
+            # since the database may add the rows in any order
+            differences = [statistic for statistic in statistics if not _statistics_match(profile1[statistic], profile2[statistic],
+                                                                                          statistic in FLOAT_STATISTICS)]
+            if differences:
+                mismatches[col] = True
+                logger.warning(f"Profile mismatch in column {col} (Source / Target): {summary}")
+            else:
+                logger.info(f"The profile matched between both datasets for the column: {col} (Source / Target): {summary}")
+
+        self.result.add_mismatches(f'{datatype.lower()}_profile', mismatches)
+
+
+def _statistics_match(value1, value2, is_float: bool) -> bool:
+    """
+    Returns whether two statistics of a column are equal, treating missing values on both sides as equal.
+
+    Args:
+        value1: The statistic of the source table.
+        value2: The statistic of the target table.
+        is_float (bool): Whether the statistic is accumulated with float additions, and compared within FLOAT_REL_TOL.
+
+    Returns:
+        bool: Whether the statistics are equal.
+    """
+
+    if value1 is None or value2 is None:
+        return value1 is None and value2 is None
+    if is_float:
+        return math.isclose(value1, value2, rel_tol=FLOAT_REL_TOL)
+    return value1 == value2
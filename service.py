@@ -0,0 +1,25 @@
+import argparse
+from modules.get_config import CONFIG_FILE_PATH
+from modules.settings import load_settings, parse_overrides
+from modules.logging_config import configure_logging
+from modules.service import ReconciliationService, serve
+
+
+def main(argv: list[str] = None):
+    # Load the settings once, applying any command-line overrides
+    parser = argparse.ArgumentParser(description="Serve reconciliation jobs over a local HTTP API.")
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help="The path to the configuration file shared by every job.")
+    parser.add_argument('--set', action='append', default=[], metavar='SECTION.OPTION=VALUE',
+                        help="Override a configuration option for every job, e.g. SERVICE.PORT=9000. Can be repeated.")
+    args = parser.parse_args(argv)
+    settings = load_settings(args.config, overrides=parse_overrides(args.set))
+    configure_logging(settings)
+
+    # Serve the jobs on warm workers until interrupted
+    service = ReconciliationService(settings, settings.service.workers, settings.service.output_directory,
+                                    cache_profiles=settings.service.cache_profiles, max_jobs=settings.service.max_jobs)
+    serve(service, settings.service.host, settings.service.port, settings.service.socket or None)
+
+
+if __name__ == ("__main__"):
+    main()
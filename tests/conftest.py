@@ -0,0 +1,5 @@
+from modules.logging_config import Logger
+
+# Set the root logger up before the modules under test do, so the tests only log to the console
+# instead of leaving an app.log in the repository
+Logger(log_to_file=False)
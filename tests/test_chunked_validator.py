@@ -0,0 +1,142 @@
+import pandas as pd
+import pytest
+from modules.chunked_validator import ChunkedValidator
+from modules.settings import ColumnTypeSettings, InputSettings, Settings
+
+
+def make_settings(numeric: tuple = (), auto_numeric_discover: bool = True, date: tuple = (), date_format: str = '') -> Settings:
+    """Returns default settings with the given numeric and date columns."""
+
+    return Settings(inputs=InputSettings(source_file='', target_file='', date_format=date_format),
+                    column_types=ColumnTypeSettings(auto_numeric_discover=auto_numeric_discover, numeric=numeric, date=date))
+
+
+def write_csv(path, rows: dict) -> str:
+    """Writes the rows to a CSV file and returns its path."""
+
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_key_range_chunks_align_keys_across_chunks(tmp_path):
+    # The target has extra keys, so the row ranges of both files drift apart
+    source = write_csv(tmp_path / 'source.csv', {'id': [10, 20, 30, 40, 50, 60], 'value': [1, 2, 3, 4, 5, 6]})
+    target = write_csv(tmp_path / 'target.csv', {'id': [10, 20, 25, 30, 35, 40, 50, 60], 'value': [1, 2, 0, 3, 0, 41, 5, 6]})
+
+    validator = ChunkedValidator(source, target, chunk_size=2, key_columns=['id'], settings=make_settings())
+    result = validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+    assert validator.diff_counts == {'changed': 1, 'source_only': 0, 'target_only': 2}
+    assert validator.row_counts == {'source': 6, 'target': 8}
+    assert pd.read_csv(tmp_path / 'diff_cells.csv')['id'].tolist() == [40]
+    assert not result.passed
+
+
+def test_key_range_chunks_match_whole_file_comparison(tmp_path):
+    source = write_csv(tmp_path / 'source.csv', {'id': range(100), 'value': range(100)})
+    target = write_csv(tmp_path / 'target.csv', {'id': range(0, 200, 2), 'value': range(0, 200, 2)})
+
+    validator = ChunkedValidator(source, target, chunk_size=7, key_columns=['id'], settings=make_settings())
+    validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+    # Keys 0, 2, ..., 98 exist on both sides with equal values
+    assert validator.diff_counts == {'changed': 0, 'source_only': 50, 'target_only': 50}
+
+
+def test_unsorted_file_is_reported_as_error(tmp_path):
+    source = write_csv(tmp_path / 'source.csv', {'id': [1, 2, 3, 4], 'value': [1, 2, 3, 4]})
+    target = write_csv(tmp_path / 'target.csv', {'id': [1, 3, 2, 4], 'value': [1, 3, 2, 4]})
+
+    validator = ChunkedValidator(source, target, chunk_size=2, key_columns=['id'], settings=make_settings())
+    result = validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+    data_check = next(check for check in result.checks if check.name == 'data')
+    assert data_check.status == 'error'
+    assert 'target file is not sorted' in data_check.message
+    assert result.stopped_early
+
+
+def test_unsorted_file_is_detected_across_chunk_boundaries(tmp_path):
+    # Each chunk is sorted, but the second chunk starts before the end of the first one
+    source = write_csv(tmp_path / 'source.csv', {'id': [3, 4, 1, 2], 'value': [1, 2, 3, 4]})
+    target = write_csv(tmp_path / 'target.csv', {'id': [1, 2, 3, 4], 'value': [1, 2, 3, 4]})
+
+    validator = ChunkedValidator(source, target, chunk_size=2, key_columns=['id'], settings=make_settings())
+    result = validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+    assert next(check for check in result.checks if check.name == 'data').status == 'error'
+
+
+@pytest.mark.parametrize('target_sum, status', [(0.1 + 0.2 + 0.3, 'passed'), (0.7, 'failed')])
+def test_sums_accumulated_in_different_groupings_match(target_sum, status):
+    # (0.1 + 0.2) + 0.3 and 0.1 + (0.2 + 0.3) differ in the last bit
+    validator = ChunkedValidator('source.csv', 'target.csv', chunk_size=2, settings=make_settings())
+    stats = {'datatype': 'Numeric', 'min': 0.1, 'max': 0.3, 'nulls': 0}
+    validator.stats = {'source': {'value': {**stats, 'sum': 0.1 + (0.2 + 0.3)}},
+                       'target': {'value': {**stats, 'sum': target_sum}}}
+    validator.stats_validation()
+
+    assert next(check for check in validator.result.checks if check.name == 'stats').status == status
+
+
+def test_missing_configured_stat_column_fails_column_check(tmp_path):
+    source = write_csv(tmp_path / 'source.csv', {'id': [1, 2], 'value': [1, 2]})
+    target = write_csv(tmp_path / 'target.csv', {'id': [1, 2], 'value': [1, 2]})
+
+    settings = make_settings(numeric=('value', 'missing'), auto_numeric_discover=False)
+    validator = ChunkedValidator(source, target, chunk_size=1, key_columns=['id'], settings=settings)
+    result = validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+    column_check = next(check for check in result.checks if check.name == 'columns')
+    assert column_check.status == 'failed'
+    assert column_check.metrics['missing_stat_columns'] == ['missing']
+    assert result.stopped_early
+
+
+@pytest.mark.parametrize('key_columns', [[], ['id']])
+def test_identical_files_pass(tmp_path, key_columns):
+    rows = {'id': range(10), 'value': [i * 0.1 for i in range(10)]}
+    source = write_csv(tmp_path / 'source.csv', rows)
+    target = write_csv(tmp_path / 'target.csv', rows)
+
+    validator = ChunkedValidator(source, target, chunk_size=3, key_columns=key_columns, settings=make_settings())
+    result = validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+    assert result.passed
+    assert validator.diff_counts == {'changed': 0, 'source_only': 0, 'target_only': 0}
+
+
+def test_date_statistics_are_chronological(tmp_path):
+    days = ['05-Jan-24', '20-Mar-23', '11-Feb-24', '30-Dec-23']
+    source = write_csv(tmp_path / 'source.csv', {'id': [1, 2, 3, 4], 'day': days})
+    target = write_csv(tmp_path / 'target.csv', {'id': [1, 2, 3, 4], 'day': days})
+
+    validator = ChunkedValidator(source, target, chunk_size=2, settings=make_settings(date=('day',), date_format='%d-%b-%y'))
+    validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+    assert validator.stats['source']['day']['min'] == pd.Timestamp('2023-03-20')
+    assert validator.stats['source']['day']['max'] == pd.Timestamp('2024-02-11')
+
+
+def test_other_errors_are_not_reported_as_unsorted_files(tmp_path, monkeypatch):
+    source = write_csv(tmp_path / 'source.csv', {'id': [1, 2], 'value': [1, 2]})
+    target = write_csv(tmp_path / 'target.csv', {'id': [1, 2], 'value': [1, 2]})
+
+    def failing_compare(*args, **kwargs):
+        raise ValueError('comparison failed')
+
+    monkeypatch.setattr('modules.chunked_validator.compare_on_keys', failing_compare)
+    validator = ChunkedValidator(source, target, chunk_size=2, key_columns=['id'], settings=make_settings())
+    with pytest.raises(ValueError, match='comparison failed'):
+        validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+
+def test_discovered_numeric_column_with_text_in_a_later_chunk_is_skipped(tmp_path):
+    source = write_csv(tmp_path / 'source.csv', {'id': [1, 2, 3, 4], 'code': ['1', '2', 'A3', '4']})
+    target = write_csv(tmp_path / 'target.csv', {'id': [1, 2, 3, 4], 'code': ['1', '2', 'A3', '4']})
+
+    validator = ChunkedValidator(source, target, chunk_size=2, settings=make_settings())
+    result = validator.validate(output_path=str(tmp_path / 'diff.html'))
+
+    assert set(validator.stats['source']) == set(validator.stats['target']) == {'id'}
+    assert result.passed
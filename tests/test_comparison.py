@@ -0,0 +1,102 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from modules.comparison import ColumnRule, compare_columns, compare_on_keys, compare_positional, parse_rules
+
+
+def differences(source: list, target: list, rule: ColumnRule = None, null_equals_null: bool = True) -> list[bool]:
+    """Compares two lists of values and returns the differences as a list."""
+
+    return compare_columns(pd.Series(source), pd.Series(target), rule, null_equals_null).tolist()
+
+
+def test_exact_comparison_by_default():
+    assert differences([1.0, 2.0, 3.0], [1.0, 2.000001, 4.0]) == [False, True, True]
+
+
+@pytest.mark.parametrize('rule, expected', [
+    (ColumnRule(abs_tol=0.01), [False, False, True]),
+    (ColumnRule(rel_tol=0.001), [True, True, False]),
+    (ColumnRule(abs_tol=0.01, rel_tol=0.001), [False, False, False]),
+])
+def test_numeric_tolerances(rule, expected):
+    assert differences([1.0, 0.5, 1000.0], [1.005, 0.509, 1000.5], rule) == expected
+
+
+def test_tolerance_is_inclusive():
+    assert differences([1.0], [1.5], ColumnRule(abs_tol=0.5)) == [False]
+
+
+def test_tolerances_only_apply_to_numbers():
+    assert differences(['a', 'b'], ['a', 'c'], ColumnRule(abs_tol=1.0)) == [False, True]
+
+
+@pytest.mark.parametrize('null_equals_null, expected', [(True, [False, True, True, False]), (False, [True, True, True, False])])
+def test_missing_values(null_equals_null, expected):
+    assert differences([None, None, 1.0, 2.0], [None, 1.0, None, 2.0], null_equals_null=null_equals_null) == expected
+
+
+def test_missing_values_with_a_tolerance():
+    assert differences([np.nan, np.nan, 1.0], [np.nan, 1.0, 1.0], ColumnRule(abs_tol=10.0)) == [False, True, False]
+
+
+def test_strings_ignoring_case_and_whitespace():
+    rule = ColumnRule(ignore_case=True, ignore_whitespace=True)
+    assert differences(['First  Bank ', 'A', None, 5], ['first bank', 'b', None, 5], rule) == [False, True, False, False]
+
+
+def test_dates_parsed_with_a_format():
+    rule = ColumnRule(date_format='%d-%b-%y')
+    source = ['01-Jan-20', '02-Jan-20']
+    target = pd.to_datetime(['2020-01-01', '2020-01-03']).to_series().reset_index(drop=True)
+    assert compare_columns(pd.Series(source), target, rule).tolist() == [False, True]
+
+
+def test_dates_inferred_per_value_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert differences(['2020-01-02', '01/02/2020'], ['Jan 2 2020', '2020-01-02'], ColumnRule(date_format='')) == [False, False]
+
+
+def test_values_that_are_not_dates_are_compared_as_they_are():
+    rule = ColumnRule(date_format='')
+    source = ['N/A', '2020-01-01', 'garbage', 'N/A', 'not a date']
+    target = ['pending', '2020-01-01', None, 'N/A', '2020-01-01']
+    assert differences(source, target, rule) == [True, False, True, False, True]
+
+
+def test_unparsed_values_keep_the_string_rules():
+    rule = ColumnRule(date_format='', ignore_case=True)
+    assert differences(['N/A', 'n/a'], ['n/a', 'pending'], rule) == [False, True]
+
+
+@pytest.mark.parametrize('comparison', ['positional', 'keys'])
+def test_row_hash_prepass_respects_missing_values(comparison):
+    df = pd.DataFrame({'id': [1, 2], 'value': [1.0, np.nan]})
+    if comparison == 'positional':
+        _, rows_with_differences = compare_positional(df, df.copy(), use_row_hash=True, null_equals_null=False)
+        assert rows_with_differences.tolist() == [False, True]
+    else:
+        result = compare_on_keys(df, df.copy(), ['id'], use_row_hash=True, null_equals_null=False)
+        assert result.rows_with_differences.tolist() == [False, True]
+
+
+def test_rules_apply_per_column_with_a_default():
+    rules = parse_rules('Fund: abs=0.5; *: ignore_case')
+    df1 = pd.DataFrame({'Fund': [1.0, 2.0], 'Name': ['A', 'B']})
+    df2 = pd.DataFrame({'Fund': [1.4, 3.0], 'Name': ['a', 'c']})
+
+    diffs, _ = compare_positional(df1, df2, use_row_hash=False, rules=rules)
+
+    assert diffs.to_dict('list') == {'Fund': [False, True], 'Name': [False, True]}
+
+
+def test_parse_rules():
+    rules = parse_rules('Fund: abs=0.01, rel=1e-9; Bank Name: ignore_case, ignore_whitespace; Closing Date: date=%d-%b-%y')
+
+    assert rules == {'Fund': ColumnRule(abs_tol=0.01, rel_tol=1e-9),
+                     'Bank Name': ColumnRule(ignore_case=True, ignore_whitespace=True),
+                     'Closing Date': ColumnRule(date_format='%d-%b-%y')}
+    with pytest.raises(ValueError):
+        parse_rules('Fund: approx')
@@ -0,0 +1,79 @@
+import tracemalloc
+import modules.instrumentation
+from modules.instrumentation import RunReport
+
+
+def test_stage_records_parent_and_worker_cpu():
+    report = RunReport()
+    with report.stage('check', rows=10, columns=2) as stage:
+        stage['diff_counts'] = {'changed': 1}
+
+    record = report.stages[0]
+    assert record['stage'] == 'check'
+    assert record['cpu_seconds'] >= 0
+    assert record['children_cpu_seconds'] >= 0
+    assert record['diff_counts'] == {'changed': 1}
+
+
+def test_close_stops_the_tracing_it_started():
+    report = RunReport(trace_memory=True)
+    with report.stage('check'):
+        list(range(1000))
+
+    assert tracemalloc.is_tracing()
+    assert report.stages[0]['traced_peak_mb'] >= 0
+    report.close()
+    assert not tracemalloc.is_tracing()
+
+
+def test_close_leaves_tracing_started_elsewhere():
+    tracemalloc.start()
+    try:
+        report = RunReport(trace_memory=True)
+        with report.stage('check'):
+            pass
+        report.close()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_report_without_the_resource_module(monkeypatch, tmp_path):
+    # As on Windows without psutil
+    monkeypatch.setattr(modules.instrumentation, 'resource', None)
+    monkeypatch.setattr(modules.instrumentation, 'psutil', None, raising=False)
+
+    report = RunReport()
+    with report.stage('check'):
+        pass
+
+    assert report.stages[0]['peak_rss_delta_mb'] is None
+    assert 'children_cpu_seconds' not in report.stages[0]
+    assert report.to_dict()['peak_rss_mb'] is None
+    assert report.summary().startswith('Validation finished')
+    report.write_prometheus(str(tmp_path / 'metrics.prom'))
+
+
+def after_report_write():
+    """Runs after a nested stage, to check that the enclosing stage is still profiled."""
+
+
+def test_nested_stage_is_recorded_with_its_parent_and_not_counted_twice():
+    report = RunReport(profile=True, trace_memory=True)
+    with report.stage('data_validation'):
+        data = [0] * 1_000_000
+        del data
+        with report.stage('report_write'):
+            pass
+        # Still profiled after the nested stage ends
+        after_report_write()
+    report.close()
+
+    inner, outer = report.stages
+    assert inner['stage'] == 'report_write' and inner['parent'] == 'data_validation'
+    assert 'parent' not in outer
+    assert report.to_dict()['wall_seconds'] == outer['wall_seconds']
+    assert outer['traced_peak_mb'] >= 7
+    assert inner['traced_peak_mb'] < 1
+    report.profiler.create_stats()
+    assert any(function == 'after_report_write' for _, _, function in report.profiler.stats)
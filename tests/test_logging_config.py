@@ -0,0 +1,59 @@
+import atexit
+import json
+import logging
+import pytest
+import modules.logging_config
+from modules.logging_config import Logger, configure_logging
+from modules.settings import InputSettings, LoggingSettings, Settings
+
+
+@pytest.fixture
+def restore_logging():
+    """Sets the loggers up with the settings they had before the test."""
+
+    previous = modules.logging_config._SETTINGS['logging']
+    yield
+    configure_logging(Settings(inputs=InputSettings(source_file='', target_file=''), logging=previous))
+
+
+def test_configure_logging_applies_the_loaded_settings(tmp_path, restore_logging):
+    log_path = tmp_path / 'test.log'
+    logger = Logger('configure_logging_test', log_filename=str(log_path))
+    logger.info("Before configuring.")
+
+    configure_logging(Settings(inputs=InputSettings(source_file='', target_file=''),
+                               logging=LoggingSettings(log_level='WARNING', format='json')))
+    logger.info("Dropped by the level.")
+    logger.warning("After configuring.")
+
+    lines = log_path.read_text().splitlines()
+    assert 'Before configuring.' in lines[0]
+    assert len(lines) == 2
+    assert json.loads(lines[1])['message'] == "After configuring."
+    assert logging.getLogger('configure_logging_test').level == logging.WARNING
+
+
+def test_configure_logging_keeps_one_set_of_handlers(tmp_path, restore_logging):
+    Logger('configure_logging_handlers_test', log_filename=str(tmp_path / 'test.log'))
+    settings = Settings(inputs=InputSettings(source_file='', target_file=''), logging=LoggingSettings(queue=True))
+
+    configure_logging(settings)
+    configure_logging(settings)
+
+    assert len(logging.getLogger('configure_logging_handlers_test').handlers) == 1
+
+
+def test_configure_logging_does_not_register_exit_handlers(tmp_path, restore_logging, caplog):
+    logger = Logger('configure_logging_rate_limit_test', log_filename=str(tmp_path / 'test.log'))
+    callbacks = atexit._ncallbacks()
+
+    for interval in (60.0, 61.0, 62.0):
+        configure_logging(Settings(inputs=InputSettings(source_file='', target_file=''),
+                                   logging=LoggingSettings(rate_limit=1, rate_interval=interval)))
+    assert atexit._ncallbacks() == callbacks
+
+    for _ in range(3):
+        logger.info("Repeated.")
+    with caplog.at_level(logging.WARNING):
+        modules.logging_config._flush_rate_limits()
+    assert "2 similar messages suppressed" in caplog.text
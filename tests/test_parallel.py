@@ -0,0 +1,54 @@
+import multiprocessing
+import threading
+import pandas as pd
+import modules.parallel
+from modules.comparison import compare_positional
+from modules.parallel import merge_differences, run_partitioned
+
+
+def make_frames() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Returns two DataFrames differing in one cell of each of their columns."""
+
+    df1 = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z'], 'c': [1.0, 2.0, 3.0]})
+    df2 = pd.DataFrame({'a': [1, 0, 3], 'b': ['x', 'y', 'q'], 'c': [0.0, 2.0, 3.0]})
+    return df1, df2
+
+
+def record_start_methods(monkeypatch) -> list:
+    """Records the start methods the process pools are created with."""
+
+    methods = []
+    get_context = multiprocessing.get_context
+
+    def recording_get_context(method=None):
+        methods.append(method)
+        return get_context(method)
+
+    monkeypatch.setattr(modules.parallel.multiprocessing, 'get_context', recording_get_context)
+    return methods
+
+
+def test_single_threaded_process_forks_the_workers(monkeypatch):
+    methods = record_start_methods(monkeypatch)
+    df1, df2 = make_frames()
+
+    results = run_partitioned(compare_positional, df1, df2, df1.columns, workers=2)
+
+    assert methods == ['fork']
+    assert merge_differences(results, df1.columns)[1].tolist() == [True, True, True]
+
+
+def test_threaded_process_does_not_fork_the_workers(monkeypatch):
+    methods = record_start_methods(monkeypatch)
+    df1, df2 = make_frames()
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        results = run_partitioned(compare_positional, df1, df2, df1.columns, workers=2)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert methods and 'fork' not in methods
+    assert merge_differences(results, df1.columns)[1].tolist() == [True, True, True]
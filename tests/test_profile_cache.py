@@ -0,0 +1,118 @@
+import os
+import pandas as pd
+import pytest
+import modules.pipeline
+from modules.pipeline import reconcile
+from modules.profile_cache import ProfileCache
+from modules.settings import CacheSettings, InputSettings, ReconciliationSettings, SchemaSettings, Settings
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Writes a source and two targets, one equal to the source and one with a changed row."""
+
+    rows = {'id': [1, 2, 3], 'value': [1.5, 2.5, 3.5]}
+    paths = {name: str(tmp_path / f'{name}.csv') for name in ('source', 'same', 'changed')}
+    pd.DataFrame(rows).to_csv(paths['source'], index=False)
+    pd.DataFrame(rows).to_csv(paths['same'], index=False)
+    pd.DataFrame({**rows, 'value': [1.5, 2.0, 3.5]}).to_csv(paths['changed'], index=False)
+    return paths
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Records the paths read by the pipeline."""
+
+    paths = []
+    read_input = modules.pipeline.read_input
+
+    def recording_read_input(path, **options):
+        paths.append(path)
+        return read_input(path, **options)
+
+    monkeypatch.setattr(modules.pipeline, 'read_input', recording_read_input)
+    return paths
+
+
+def run(tmp_path, source: str, target: str, schema: SchemaSettings = SchemaSettings()):
+    """Reconciles the files on their keys with the cache enabled."""
+
+    settings = Settings(inputs=InputSettings(source_file=source, target_file=target),
+                        reconciliation=ReconciliationSettings(key_columns=('id',)), schema=schema,
+                        cache=CacheSettings(enabled=True, directory=str(tmp_path / 'cache')))
+    return reconcile(settings, output_path=str(tmp_path / 'outputs' / 'diff.html'))
+
+
+def test_repeat_run_only_reads_the_target(tmp_path, files, loads):
+    run(tmp_path, files['source'], files['changed'])
+    assert loads == [files['changed'], files['source']]
+
+    loads.clear()
+    result = run(tmp_path, files['source'], files['changed'])
+    assert loads == [files['changed']]
+    assert result.diff_counts['changed'] == 1
+
+
+def test_target_matching_the_snapshot_skips_the_row_comparison(tmp_path, files, loads):
+    run(tmp_path, files['source'], files['changed'])
+    full_result = run(tmp_path, files['same'], files['source'])
+
+    loads.clear()
+    result = run(tmp_path, files['source'], files['same'])
+    assert loads == [files['same']]
+    assert [check.name for check in result.checks] == [check.name for check in full_result.checks]
+    assert next(check for check in result.checks if check.name == 'data').message == \
+        "The target matches the cached snapshot of the source."
+    assert result.diff_counts == {'changed': 0, 'source_only': 0, 'target_only': 0}
+    assert 'data_validation' in {stage['stage'] for stage in result.run_report['stages']}
+    assert result.passed
+
+
+def test_schema_settings_are_part_of_the_cache_key(tmp_path, files, loads):
+    run(tmp_path, files['source'], files['changed'])
+
+    loads.clear()
+    run(tmp_path, files['source'], files['changed'], schema=SchemaSettings(enabled=True))
+    assert loads == [files['changed'], files['source']]
+
+
+def test_rewritten_source_misses_the_cache(tmp_path, files, loads):
+    run(tmp_path, files['source'], files['changed'])
+
+    # A rewrite with the same contents still changes the modification time
+    stat = os.stat(files['source'])
+    os.utime(files['source'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    loads.clear()
+    run(tmp_path, files['source'], files['changed'])
+    assert loads == [files['changed'], files['source']]
+
+
+def test_content_is_only_hashed_when_verified(tmp_path, files, monkeypatch):
+    opened = []
+    real_open = open
+
+    def recording_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', recording_open)
+    ProfileCache(str(tmp_path / 'cache'), 1 << 20).get(files['source'])
+    assert files['source'] not in opened
+
+    ProfileCache(str(tmp_path / 'cache'), 1 << 20, verify_content=True).get(files['source'])
+    assert files['source'] in opened
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, files):
+    directory = str(tmp_path / 'cache')
+    ProfileCache(directory, 1 << 20).put(files['source'], {'profile': 'source'})
+    entry_bytes = sum(entry.stat().st_size for entry in os.scandir(directory))
+
+    # Room for one entry only, so the older one is evicted
+    cache = ProfileCache(directory, max_bytes=int(entry_bytes * 1.5))
+    os.utime(os.path.join(directory, os.listdir(directory)[0]), ns=(0, 0))
+    cache.put(files['same'], {'profile': 'same'})
+
+    assert cache.get(files['source']) is None
+    assert cache.get(files['same']) == {'profile': 'same'}
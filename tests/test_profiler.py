@@ -0,0 +1,20 @@
+import pandas as pd
+from modules.profiler import profile_columns, profile_mismatches
+
+
+def test_float_statistics_of_reordered_rows_match():
+    values = [0.1, 0.2, 0.3]
+    profile1 = profile_columns(pd.DataFrame({'amount': values}), ['amount'])
+    profile2 = profile_columns(pd.DataFrame({'amount': values[::-1]}), ['amount'])
+
+    assert profile1.at['amount', 'sum'] != profile2.at['amount', 'sum']
+    assert not profile_mismatches(profile1, profile2, 'sum').any()
+    assert not profile_mismatches(profile1, profile2, 'mean').any()
+
+
+def test_float_statistics_beyond_the_tolerance_mismatch():
+    profile1 = profile_columns(pd.DataFrame({'amount': [1.0, 2.0], 'name': ['a', 'b']}), ['amount', 'name'])
+    profile2 = profile_columns(pd.DataFrame({'amount': [1.0, 2.0001], 'name': ['a', 'c']}), ['amount', 'name'])
+
+    assert profile_mismatches(profile1, profile2, 'sum').tolist() == [True, False]
+    assert profile_mismatches(profile1, profile2, 'max').tolist() == [True, True]
@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+from modules.comparison import compare_positional
+from modules.readers import parse_filters, read_input, unify_categories
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet', 'feather'])
+def test_filter_columns_outside_the_projection(tmp_path, file_format):
+    df = pd.DataFrame({'id': [1, 2, 3], 'State': ['CA', 'NY', 'CA'], 'Fund': [10, 20, 30]})
+    path = str(tmp_path / f'input.{file_format}')
+    getattr(df, f'to_{file_format}')(path, **({'index': False} if file_format == 'csv' else {}))
+
+    loaded = read_input(path, columns=['id', 'Fund'], filters=parse_filters('State == CA'))
+
+    assert list(loaded.columns) == ['id', 'Fund']
+    assert loaded['id'].tolist() == [1, 3]
+
+
+def test_category_dtypes_share_their_categories(tmp_path):
+    source_path, target_path = str(tmp_path / 'source.csv'), str(tmp_path / 'target.csv')
+    pd.DataFrame({'State': ['CA', 'NY', 'CA']}).to_csv(source_path, index=False)
+    pd.DataFrame({'State': ['CA', 'TX', 'CA']}).to_csv(target_path, index=False)
+    source, target = (read_input(path, dtypes={'State': 'category'}) for path in (source_path, target_path))
+
+    unify_categories(source, target)
+
+    assert source['State'].dtype == target['State'].dtype
+    assert list(source['State'].cat.categories) == ['CA', 'NY', 'TX']
+    differences, rows_with_differences = compare_positional(source, target)
+    assert rows_with_differences.index[rows_with_differences].tolist() == [1]
+
+
+def test_categoricals_with_different_categories_compare_by_value():
+    source = pd.DataFrame({'State': pd.Series(['CA', 'NY'], dtype='category')})
+    target = pd.DataFrame({'State': pd.Series(['TX', 'NY'], dtype='category')})
+
+    differences, _ = compare_positional(source, target, use_row_hash=False)
+
+    assert differences['State'].tolist() == [True, False]
@@ -0,0 +1,36 @@
+import pandas as pd
+from modules.dataframe_validator import DataFrameValidator
+from modules.settings import InputSettings, SchemaSettings, Settings
+
+
+def make_settings(date_format: str = '', downcast: bool = True) -> Settings:
+    """Returns default settings with the schema inference enabled."""
+
+    return Settings(inputs=InputSettings(source_file='', target_file='', date_format=date_format),
+                    schema=SchemaSettings(enabled=True, downcast=downcast))
+
+
+def test_schema_inference_parses_dates_with_the_configured_format():
+    days = ['01/02/2024', '03/02/2024', '13/02/2024']
+    validator = DataFrameValidator(pd.DataFrame({'day': days}), pd.DataFrame({'day': days}),
+                                   settings=make_settings(date_format='%d/%m/%Y'))
+
+    validator.schema_inference()
+
+    assert validator.schema == {'day': 'datetime64[ns]'}
+    assert validator.df1['day'].tolist() == [pd.Timestamp('2024-02-01'), pd.Timestamp('2024-02-03'), pd.Timestamp('2024-02-13')]
+
+
+def test_float32_downcast_keeps_the_profiled_statistics():
+    amounts = [1 / 3 + i for i in range(1000)]
+    df = pd.DataFrame({'amount': pd.Series(amounts).astype('float32').astype('float64')})
+    loaded = DataFrameValidator(df.copy(), df.copy(), settings=make_settings(downcast=False))
+    downcast = DataFrameValidator(df.copy(), df.copy(), settings=make_settings())
+
+    for validator in (loaded, downcast):
+        validator.schema_inference()
+        validator.numeric_column_extra_validations()
+
+    assert downcast.schema == {'amount': 'float32'}
+    for statistic in ('sum', 'mean', 'median'):
+        assert downcast.source_profile.at['amount', statistic] == loaded.source_profile.at['amount', statistic]
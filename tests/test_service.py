@@ -0,0 +1,34 @@
+import pytest
+from modules.service import ReconciliationService
+from modules.settings import InputSettings, InstrumentationSettings, Settings
+
+
+def make_service(tmp_path) -> ReconciliationService:
+    """Returns a service saving its run reports, without starting it."""
+
+    settings = Settings(inputs=InputSettings(source_file='', target_file=''),
+                        instrumentation=InstrumentationSettings(report_path='run_report.json'))
+    return ReconciliationService(settings, workers=1, output_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize('name', ['CACHE.DIRECTORY', 'INSTRUMENTATION.REPORT_PATH', 'ENGINE.DATABASE',
+                                  'inputs.source_file', 'RECONCILIATION.FAIL_FAST'])
+def test_submit_rejects_overrides_outside_the_allow_list(tmp_path, name):
+    service = make_service(tmp_path)
+
+    with pytest.raises(ValueError, match='cannot be overridden'):
+        service.submit({'source_file': 'source.csv', 'target_file': 'target.csv', 'overrides': {name: '/tmp/elsewhere'}})
+    assert service.jobs == {}
+
+
+def test_submit_accepts_comparison_overrides(tmp_path):
+    service = make_service(tmp_path)
+
+    job = service.submit({'source_file': 'source.csv', 'target_file': 'target.csv', 'key_columns': ['id'],
+                          'overrides': {'comparison.null_equals_null': '0', 'SAMPLING.RATE': '0.5'}})
+
+    _, job_settings, _ = service._queue.get_nowait()
+    assert job_settings.comparison.null_equals_null is False
+    assert job_settings.sampling.rate == 0.5
+    assert job_settings.reconciliation.key_columns == ('id',)
+    assert job_settings.instrumentation.report_path == str(tmp_path / job['job_id'] / 'run_report.json')
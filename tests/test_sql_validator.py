@@ -0,0 +1,121 @@
+import pandas as pd
+import pytest
+from modules.dataframe_validator import DataFrameValidator
+from modules.readers import parse_filters, read_input
+from modules.settings import ColumnTypeSettings, EngineSettings, InputSettings, Settings
+from modules.sql_engine import connect_engine
+from modules.sql_validator import SqlValidator
+
+BACKENDS = ['duckdb', 'sqlite']
+
+
+def make_settings(backend: str, auto_date_discover: bool = False) -> Settings:
+    """Returns default settings with one numeric and one date column, run on the given backend."""
+
+    column_types = ColumnTypeSettings(auto_numeric_discover=False, numeric=('amount',),
+                                      auto_date_discover=auto_date_discover, date=() if auto_date_discover else ('day',))
+    return Settings(inputs=InputSettings(source_file='', target_file=''), column_types=column_types,
+                    engine=EngineSettings(backend=backend))
+
+
+def write_csv(path, rows: dict) -> str:
+    """Writes the rows to a CSV file and returns its path."""
+
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def run_both(tmp_path, source: dict, target: dict, key_columns: list[str], backend: str,
+             auto_date_discover: bool = False) -> tuple:
+    """Runs the SQL and pandas validators on the same files and returns both validators and results."""
+
+    source_file = write_csv(tmp_path / 'source.csv', source)
+    target_file = write_csv(tmp_path / 'target.csv', target)
+    settings = make_settings(backend, auto_date_discover)
+    load_options = {'date_columns': ['day']} if auto_date_discover else {}
+
+    sql_validator = SqlValidator(source_file, target_file, key_columns, settings=settings, load_options=load_options)
+    sql_result = sql_validator.validate(output_path=str(tmp_path / 'sql' / 'diff.html'))
+    assert sql_validator.engine.name == backend
+    pandas_validator = DataFrameValidator(read_input(source_file, **load_options), read_input(target_file, **load_options),
+                                          key_columns, settings=settings)
+    pandas_result = pandas_validator.validate(workers=1, output_path=str(tmp_path / 'pandas' / 'diff.html'))
+    return sql_validator, sql_result, pandas_validator, pandas_result
+
+
+def statuses(result) -> dict:
+    """Returns the status of each check of a result."""
+
+    return {check.name: check.status for check in result.checks}
+
+
+def metrics(result, name: str) -> dict:
+    """Returns the metrics of the named check of a result."""
+
+    return next(check.metrics for check in result.checks if check.name == name)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('key_columns', [[], ['id']])
+def test_sql_and_pandas_agree_on_differences(tmp_path, backend, key_columns):
+    source = {'id': [1, 2, 3, 4], 'amount': [1.5, 2.5, 2.5, None],
+              'day': ['2024-01-01', '2024-01-02', '2024-01-02', '2024-01-03']}
+    target = {'id': [1, 2, 3, 5], 'amount': [1.5, 3.5, 3.5, 4.0],
+              'day': ['2024-01-01', '2024-01-02', '2024-01-05', '2024-01-05']}
+
+    sql_validator, sql_result, pandas_validator, pandas_result = run_both(tmp_path, source, target, key_columns, backend)
+
+    assert statuses(sql_result) == statuses(pandas_result)
+    assert {'numeric_mode', 'numeric_profile', 'date_mode'} <= statuses(sql_result).keys()
+    assert sql_validator.diff_counts == pandas_validator.diff_counts
+    for name in ('numeric_mode', 'numeric_profile', 'date_mode'):
+        assert metrics(sql_result, name) == metrics(pandas_result, name)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_sql_and_pandas_discover_the_same_date_columns(tmp_path, backend):
+    source = {'id': [1, 2], 'amount': [1.0, 2.0], 'day': ['2024-01-01', '2024-01-02']}
+    target = {'id': [1, 2], 'amount': [1.0, 2.0], 'day': ['2024-01-01', '2024-01-03']}
+
+    _, sql_result, _, pandas_result = run_both(tmp_path, source, target, ['id'], backend, auto_date_discover=True)
+
+    assert statuses(sql_result) == statuses(pandas_result)
+    assert metrics(sql_result, 'date_min_max') == metrics(pandas_result, 'date_min_max') == {'mismatched_columns': ['day']}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_sql_and_pandas_agree_on_matching_files(tmp_path, backend):
+    rows = {'id': [1, 2, 3], 'amount': [1.0, None, 1.0], 'day': ['2024-01-01', '2024-01-03', '2024-01-03']}
+
+    sql_validator, sql_result, pandas_validator, pandas_result = run_both(tmp_path, rows, rows, ['id'], backend)
+
+    assert statuses(sql_result) == statuses(pandas_result)
+    assert set(statuses(sql_result).values()) == {'passed'}
+    assert sql_validator.diff_counts == pandas_validator.diff_counts == {'changed': 0, 'source_only': 0, 'target_only': 0}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_float_sums_of_reordered_rows_match(tmp_path, backend):
+    source = {'id': range(30), 'amount': [0.1, 0.2, 0.3] * 10, 'day': ['2024-01-01'] * 30}
+    target = {'id': range(29, -1, -1), 'amount': [0.3, 0.2, 0.1] * 10, 'day': ['2024-01-01'] * 30}
+
+    _, sql_result, _, pandas_result = run_both(tmp_path, source, target, ['id'], backend)
+
+    assert statuses(sql_result)['numeric_profile'] == statuses(pandas_result)['numeric_profile'] == 'passed'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('file_format', ['csv', 'parquet', 'feather'])
+def test_load_filters_on_columns_outside_the_projection(tmp_path, backend, file_format):
+    df = pd.DataFrame({'id': [1, 2, 3], 'State': ['CA', 'NY', 'CA'], 'Fund': [10, 20, 30]})
+    path = str(tmp_path / f'input.{file_format}')
+    getattr(df, f'to_{file_format}')(path, **({'index': False} if file_format == 'csv' else {}))
+
+    engine = connect_engine(backend, str(tmp_path / 'reconciliation.db'))
+    try:
+        assert engine.name == backend
+        engine.load('source', path, columns=['id', 'Fund'], filters=parse_filters('State == CA'))
+        assert list(engine.columns('source')) == ['id', 'Fund']
+        assert engine.scalar('SELECT SUM("id") FROM "source"') == 4
+    finally:
+        engine.close()